@@ -10,6 +10,7 @@ OUTPUT_DIR="${1:-output/fulltexts/methods_sections}"
 VALIDATOR="code/extract_text/check_methods_processing.py"
 FAILED_LIST="failed_preprocessing_checks.txt"
 PASSED_LIST="passed_preprocessing_checks.txt"
+RESULTS_FILE="preprocessing_check_results.csv"
 
 # Colors for output
 RED='\033[0;31m'
@@ -17,15 +18,6 @@ GREEN='\033[0;32m'
 YELLOW='\033[1;33m'
 NC='\033[0m' # No Color
 
-# Initialize counters
-TOTAL=0
-PASSED=0
-FAILED=0
-
-# Clear previous results
-> "$FAILED_LIST"
-> "$PASSED_LIST"
-
 echo "=================================================="
 echo "BATCH PREPROCESSING VALIDATION"
 echo "=================================================="
@@ -46,11 +38,13 @@ if [ ! -d "$OUTPUT_DIR" ]; then
     exit 1
 fi
 
-# Find all .txt files
-FILES=("$OUTPUT_DIR"/*.txt)
+# Find all methods text files (not the extractor's file lists in the folder)
+shopt -s nullglob
+FILES=("$OUTPUT_DIR"/*_methods.txt "$OUTPUT_DIR"/*_methods_main.txt "$OUTPUT_DIR"/*_methods_supp.txt)
+shopt -u nullglob
 
-if [ ! -e "${FILES[0]}" ]; then
-    echo -e "${YELLOW}WARNING: No .txt files found in $OUTPUT_DIR${NC}"
+if [ ${#FILES[@]} -eq 0 ]; then
+    echo -e "${YELLOW}WARNING: No *_methods.txt files found in $OUTPUT_DIR${NC}"
     exit 0
 fi
 
@@ -58,34 +52,17 @@ echo "Found ${#FILES[@]} files to validate"
 echo "=================================================="
 echo ""
 
-# Process each file
-for filepath in "${FILES[@]}"; do
-    filename=$(basename "$filepath")
-    TOTAL=$((TOTAL + 1))
-
-    # Run validator (suppress output, just check exit code)
-    if python3 "$VALIDATOR" "$filepath" > /dev/null 2>&1; then
-        echo -e "${GREEN}✓${NC} $filename"
-        PASSED=$((PASSED + 1))
-        echo "$filename" >> "$PASSED_LIST"
-    else
-        echo -e "${RED}✗${NC} $filename"
-        FAILED=$((FAILED + 1))
-        echo "$filename" >> "$FAILED_LIST"
-    fi
-done
-
-echo ""
-echo "=================================================="
-echo "SUMMARY"
-echo "=================================================="
-echo "Total files:   $TOTAL"
-echo -e "Passed:        ${GREEN}$PASSED${NC}"
-echo -e "Failed:        ${RED}$FAILED${NC}"
-echo ""
-
-if [ $FAILED -gt 0 ]; then
-    echo -e "${YELLOW}Failed files saved to: $FAILED_LIST${NC}"
+# Validate all files in one python3 process (with a worker pool); it prints
+# a pass/fail line per file, writes the passed/failed lists and every
+# file's check results to $RESULTS_FILE (CSV)
+if python3 "$VALIDATOR" --dir "$OUTPUT_DIR" \
+        --failed-list "$FAILED_LIST" --passed-list "$PASSED_LIST" --results "$RESULTS_FILE"; then
+    echo ""
+    echo -e "${GREEN}All files passed validation!${NC}"
+    echo "Issue prevalence by format and publisher:"
+    echo "  python3 code/extract_text/check_results.py $RESULTS_FILE"
+    exit 0
+else
     echo ""
     echo "To see detailed errors for failed files:"
     echo "  while read file; do"
@@ -93,11 +70,10 @@ if [ $FAILED -gt 0 ]; then
     echo "    python3 $VALIDATOR \"$OUTPUT_DIR/\$file\""
     echo "  done < $FAILED_LIST"
     echo ""
+    echo "To repair failing files with the extractor's cleaning rules (no re-extraction):"
+    echo "  python3 $VALIDATOR --dir \"$OUTPUT_DIR\" --repair"
+    echo ""
+    echo "Issue prevalence by format and publisher:"
+    echo "  python3 code/extract_text/check_results.py $RESULTS_FILE"
     exit 1
-else
-    echo -e "${GREEN}All files passed validation!${NC}"
-    rm -f "$FAILED_LIST"  # Clean up since nothing failed
-    exit 0
 fi
-
-python3 code/extract_text/check_methods_processing.py
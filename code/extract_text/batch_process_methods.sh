@@ -1,123 +1,63 @@
 #!/bin/bash
 # Batch process all XML files in a folder using extract_methods.py
-# Usage: ./batch_process.sh input_folder output_folder
+# Usage: ./batch_process.sh input_folder output_folder [workers] [extract_methods.py options]
+#
+# The input may also be a .tar / .tar.gz / .tgz / .zip archive (e.g. a PMC OA
+# package): its .xml / .nxml members are read without unpacking, and outputs
+# are named after each article's PMCID / PMID.
+#
+# All files are extracted in a single Python process pool (see
+# extract_methods.py --input-dir), rather than one interpreter per file.
+# Runs are incremental: files unchanged since the last run into the same
+# output folder are skipped (pass --force to re-extract everything).
+# With --validate, each methods text is checked (check_methods_processing.py)
+# in memory before it is written, and --quarantine DIR sends the outputs of
+# texts that fail to DIR, so no separate batch_check_methods.sh pass is needed.
 
 if [ $# -lt 2 ]; then
-    echo "Usage: $0 <input_folder> <output_folder>"
+    echo "Usage: $0 <input_folder|archive> <output_folder> [workers] [extract_methods.py options]"
     echo ""
     echo "Example:"
     echo "  $0 ./xml_files ./output_texts"
+    echo "  $0 ./xml_files ./output_texts 8"
+    echo "  $0 ./xml_files ./output_texts 8 --force"
+    echo "  $0 ./xml_files ./output_texts --force"
+    echo "  $0 ./oa_comm_xml.PMC000xxxxxx.tar.gz ./output_texts 8"
+    echo "  $0 ./xml_files ./output_texts 8 --supplement-dir output/supplement"
+    echo "  $0 ./xml_files ./output_texts 8 --quarantine ./quarantined_texts"
     exit 1
 fi
 
 INPUT_FOLDER="$1"
 OUTPUT_FOLDER="$2"
+shift 2
+# The optional third argument is the worker count only if it is a number;
+# anything else (e.g. --force) is an extract_methods.py option
+WORKERS=""
+if [[ "${1:-}" =~ ^[0-9]+$ ]]; then
+    WORKERS="$1"
+    shift
+fi
 
-# Check if input folder exists
-if [ ! -d "$INPUT_FOLDER" ]; then
+# Check if input folder (or archive) exists
+if [ -d "$INPUT_FOLDER" ]; then
+    INPUT_OPTION=--input-dir
+elif [ -f "$INPUT_FOLDER" ]; then
+    INPUT_OPTION=--input-archive
+else
     echo "Error: Input folder '$INPUT_FOLDER' does not exist"
     exit 1
 fi
 
-# Create output folder if it doesn't exist
-mkdir -p "$OUTPUT_FOLDER"
-
 # Get the directory where this script is located
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-# Count files
-TOTAL=0
-SUCCESS=0
-FAILED=0
-NO_METHODS=0
-ONLINE_ONLY=0
-
-# Arrays to store filenames
-FAILED_FILES=()
-NO_METHODS_FILES=()
-ONLINE_ONLY_FILES=()
-
-echo "Processing XML files in: $INPUT_FOLDER"
-echo "Output will be saved to: $OUTPUT_FOLDER"
-echo ""
-
-# Process each XML file
-for xml_file in "$INPUT_FOLDER"/*.xml; do
-    # Check if any XML files exist
-    if [ ! -e "$xml_file" ]; then
-        echo "No XML files found in $INPUT_FOLDER"
-        exit 1
-    fi
-
-    TOTAL=$((TOTAL + 1))
-
-    # Get filename without path and extension
-    filename=$(basename "$xml_file" .xml)
-
-    # Normalise .pdf.tei suffix to _pdf_tei so GROBID output files get
-    # predictable names like {pmid}_pdf_tei_methods.txt. Must match the
-    # filename the Python extractor writes to.
-    output_name="${filename/.pdf.tei/_pdf_tei}"
-
-    # Output file name
-    output_file="$OUTPUT_FOLDER/${output_name}_methods.txt"
-
-    echo -n "Processing: $(basename "$xml_file")... "
-
-    # Run the extraction script
-    if python3 "$SCRIPT_DIR/extract_methods.py" "$xml_file" -o "$output_file" 2>/dev/null; then
-        if [ -s "$output_file" ]; then
-            # Check if it's an online-only methods file
-            if head -n 1 "$output_file" | grep -q "NOTE: Methods are only available online"; then
-                echo "⚠ ONLINE ONLY"
-                ONLINE_ONLY=$((ONLINE_ONLY + 1))
-                ONLINE_ONLY_FILES+=("$(basename "$xml_file")")
-            else
-                echo "✓ SUCCESS"
-                SUCCESS=$((SUCCESS + 1))
-            fi
-        else
-            echo "⚠ NO METHODS SECTION"
-            NO_METHODS=$((NO_METHODS + 1))
-            NO_METHODS_FILES+=("$(basename "$xml_file")")
-            rm -f "$output_file"  # Remove empty file
-        fi
-    else
-        echo "✗ FAILED"
-        FAILED=$((FAILED + 1))
-        FAILED_FILES+=("$(basename "$xml_file")")
-    fi
-done
-
-# Print summary
-echo ""
-echo "=================================================="
-echo "SUMMARY"
-echo "=================================================="
-echo "Successfully processed: $SUCCESS"
-echo "Online only:            $ONLINE_ONLY"
-echo "No methods section:     $NO_METHODS"
-echo "Failed:                 $FAILED"
-echo "Total files:            $TOTAL"
-echo ""
-echo "Output files saved to: $OUTPUT_FOLDER"
-
-# Save failed files list
-if [ ${#FAILED_FILES[@]} -gt 0 ]; then
-    FAILED_LIST="$OUTPUT_FOLDER/failed_files.txt"
-    printf "%s\n" "${FAILED_FILES[@]/#/$INPUT_FOLDER/}" >> "$FAILED_LIST"
-    echo ""
-    echo "Failed files list saved to: $FAILED_LIST"
-    echo "Failed files:"
-    for file in "$INPUT_FOLDER/${FAILED_FILES[@]}"; do
-        echo "  - $file"
-    done
-fi
-
-# Save no methods files list
-if [ ${#NO_METHODS_FILES[@]} -gt 0 ]; then
-    NO_METHODS_LIST="$OUTPUT_FOLDER/no_methods_files.txt"
-    printf "%s\n" "$INPUT_FOLDER$/{NO_METHODS_FILES[@]}" >> "$NO_METHODS_LIST"
-    echo ""
-    echo "No methods section list saved to: $NO_METHODS_LIST"
-fi
+# Output naming ({name}_methods.txt, {name}_methods_main.txt,
+# {name}_methods_supp.txt with --supplement-dir, and
+# .pdf.tei -> _pdf_tei), the per-file progress lines, the summary and the
+# failed / no-methods file lists are all produced by the Python batch mode.
+python3 "$SCRIPT_DIR/extract_methods.py" \
+    "$INPUT_OPTION" "$INPUT_FOLDER" \
+    --output-dir "$OUTPUT_FOLDER" \
+    ${WORKERS:+--workers "$WORKERS"} \
+    "$@"
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass scanner of check_methods_processing.py.
+
+Reports MB/s of scan_counts(), of one re.findall per pattern
+(findall_counts()) and of the whole check (check_result: counts, word
+count, verdict) over methods texts: the *_methods.txt files in --texts,
+or the texts extracted from a synthetic corpus (synthetic_corpus.py, or
+an existing one via --corpus), the best of --repeat passes.  That the
+two give the same counts is tested in tests/test_check_methods_processing.py.
+
+The run fails (exit status 1) if the scanner is slower than the
+per-pattern findall.
+
+Usage:
+  python3 benchmark_checks.py [--texts DIR | --corpus DIR | --n 20 --size medium]
+      [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import check_methods_processing as checks  # noqa: E402
+
+
+def extracted_texts(corpus_dir):
+    """Methods texts extracted from every file of a synthetic corpus."""
+    import benchmark_extractor
+    import extract_methods
+
+    texts = []
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        for entries in benchmark_extractor.load_corpus(corpus_dir).values():
+            for entry in entries:
+                text = extract_methods.extract_methods_section(entry['path'])['text']
+                if text:
+                    texts.append((entry['file'], text))
+    return texts
+
+
+def mb_per_s(func, texts, repeat=1):
+    """
+    Best throughput of func(text) over the texts, in MB of UTF-8 per
+    second, after one untimed warm-up pass.
+    """
+    n_bytes = sum(len(text.encode('utf-8')) for _, text in texts)
+    for _, text in texts:
+        func(text)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, text in texts:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return n_bytes / 1e6 / best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report MB/s of scan_counts() against per-pattern findall'
+    )
+    parser.add_argument('--texts', help='Folder of methods text files (*_methods.txt) to use')
+    parser.add_argument('--corpus', help='Existing synthetic corpus folder (with corpus.json); '
+                                         'default: generate one in a temporary folder')
+    parser.add_argument('--n', type=int, default=20,
+                        help='Documents per kind when generating (default: 20)')
+    parser.add_argument('--size', default='medium',
+                        help='Document size preset when generating (default: medium)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed when generating')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timed passes; the best is reported (default: 5)')
+    args = parser.parse_args()
+
+    if args.texts:
+        texts = [(p.name, p.read_text(encoding='utf-8'))
+                 for p in sorted(Path(args.texts).glob('*.txt'))
+                 if p.name.endswith(checks.METHODS_TEXT_SUFFIXES)]
+    elif args.corpus:
+        texts = extracted_texts(args.corpus)
+    else:
+        import synthetic_corpus
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            synthetic_corpus.generate_corpus(corpus_dir, args.n, args.size, args.seed)
+            texts = extracted_texts(corpus_dir)
+    if not texts:
+        sys.exit("No methods texts to check.")
+
+    mb = sum(len(text.encode('utf-8')) for _, text in texts) / 1e6
+    scan = mb_per_s(checks.scan_counts, texts, args.repeat)
+    findall = mb_per_s(checks.findall_counts, texts, args.repeat)
+    full = mb_per_s(checks.check_result, texts, args.repeat)
+
+    print(f"Methods texts: {len(texts)} ({mb:.2f} MB)")
+    print(f"scan_counts:    {scan:8.1f} MB/s")
+    print(f"findall_counts: {findall:8.1f} MB/s  (scanner speedup {scan / findall:.2f}x)")
+    print(f"full check:     {full:8.1f} MB/s")
+
+    if scan < findall:
+        print("\nFAILED: the scanner is slower than one findall per pattern", file=sys.stderr)
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == '__main__':
+    main()
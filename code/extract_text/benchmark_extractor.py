@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark extract_methods_section per input format on a synthetic corpus.
+
+Generates a corpus with synthetic_corpus.py (or uses an existing one via
+--corpus) and reports the throughput for JATS, TEI and BioC: files/s and
+MB/s, the best of --repeat timed passes.  Which status and text each
+document gives, and its peak memory, are checked by the pytest tests
+(tests/test_synthetic_corpus.py).
+
+The run fails (exit status 1) if a format is below the min_files_per_s
+given in the thresholds file, or, with --ref, if a format is more than
+--max-slowdown times slower than extract_methods.py at that git revision.
+
+Usage:
+  python3 benchmark_extractor.py [--corpus DIR] [--n 20] [--size medium]
+      [--repeat 3] [--thresholds benchmark_thresholds.json]
+      [--ref REF --max-slowdown 1.2]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import extract_methods  # noqa: E402
+import synthetic_corpus  # noqa: E402
+
+DEFAULT_THRESHOLDS = SCRIPT_DIR / 'benchmark_thresholds.json'
+
+
+def load_corpus(corpus_dir):
+    """corpus.json entries with 'path' set, grouped by format."""
+    with open(Path(corpus_dir) / 'corpus.json', encoding='utf-8') as f:
+        entries = json.load(f)['files']
+    by_format = {}
+    for entry in entries:
+        entry['path'] = str(Path(corpus_dir) / entry['file'])
+        by_format.setdefault(entry['format'], []).append(entry)
+    return by_format
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Drop the extractor's per-file messages while benchmarking."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def time_pass(extract, entries, repeat=1):
+    """Best wall time over `repeat` passes of extract() over the entries."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with _quiet():
+            for entry in entries:
+                extract(entry['path'])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(by_format, repeat=1, reference=None):
+    """Per-format results: files, MB, seconds, files/s, MB/s."""
+    results = {}
+    for fmt, entries in sorted(by_format.items()):
+        n_bytes = sum(Path(e['path']).stat().st_size for e in entries)
+        seconds = time_pass(extract_methods.extract_methods_section, entries, repeat)
+        res = {
+            'files': len(entries),
+            'mb': n_bytes / 1e6,
+            'seconds': seconds,
+            'files_per_s': len(entries) / seconds,
+            'mb_per_s': n_bytes / 1e6 / seconds,
+        }
+        if reference is not None:
+            res['ref_seconds'] = time_pass(reference.extract_methods_section, entries, repeat)
+        results[fmt] = res
+    return results
+
+
+def failures(results, thresholds=None, max_slowdown=None):
+    """Messages for every check the results fail."""
+    messages = []
+    for fmt, res in results.items():
+        limits = (thresholds or {}).get(fmt, {})
+        if 'min_files_per_s' in limits and res['files_per_s'] < limits['min_files_per_s']:
+            messages.append(f"{fmt}: {res['files_per_s']:.1f} files/s is below the "
+                            f"minimum of {limits['min_files_per_s']}")
+        if max_slowdown and 'ref_seconds' in res:
+            slowdown = res['seconds'] / res['ref_seconds']
+            if slowdown > max_slowdown:
+                messages.append(f"{fmt}: {slowdown:.2f}x the reference time "
+                                f"(maximum {max_slowdown}x)")
+    return messages
+
+
+def report_lines(results):
+    lines = [f"{'Format':<6} {'Files':>6} {'MB':>7} {'Seconds':>8} {'Files/s':>8} "
+             f"{'MB/s':>7}  Reference"]
+    for fmt, res in results.items():
+        ref = ''
+        if 'ref_seconds' in res:
+            ref = f"{res['ref_seconds']:.3f} s (speedup {res['ref_seconds'] / res['seconds']:.2f}x)"
+        lines.append(f"{fmt:<6} {res['files']:>6} {res['mb']:>7.2f} {res['seconds']:>8.3f} "
+                     f"{res['files_per_s']:>8.1f} {res['mb_per_s']:>7.2f}  {ref}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark extract_methods.py per input format on a synthetic corpus'
+    )
+    parser.add_argument('--corpus', help='Existing corpus folder (with corpus.json); '
+                                         'default: generate one in a temporary folder')
+    parser.add_argument('--n', type=int, default=20,
+                        help='Documents per kind when generating (default: 20)')
+    parser.add_argument('--size', choices=sorted(synthetic_corpus.SIZES), default='medium',
+                        help='Document size preset when generating (default: medium)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed when generating')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed passes per format; the best is reported (default: 3)')
+    parser.add_argument('--thresholds', default=str(DEFAULT_THRESHOLDS),
+                        help='JSON file of per-format min_files_per_s '
+                             '(default: %(default)s; "none" to skip)')
+    parser.add_argument('--ref', help='Also time extract_methods.py at this git revision')
+    parser.add_argument('--max-slowdown', type=float, default=1.2,
+                        help='With --ref: fail if a format is more than this many times '
+                             'slower than the reference (default: 1.2)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    thresholds = None
+    if args.thresholds != 'none':
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds = json.load(f)
+
+    reference = None
+    if args.ref:
+        import compare_extractor_versions
+        reference = compare_extractor_versions.load_reference(args.ref)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = tmp_dir
+            synthetic_corpus.generate_corpus(corpus_dir, args.n, args.size, args.seed)
+            print(f"Generated corpus: {args.n} documents per kind, size {args.size}, "
+                  f"seed {args.seed}")
+        results = benchmark(load_corpus(corpus_dir), args.repeat, reference)
+
+    print("\n".join(report_lines(results)))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+
+    messages = failures(results, thresholds, args.max_slowdown if reference else None)
+    if messages:
+        print("\nFAILED:", file=sys.stderr)
+        for message in messages:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,119 +2,240 @@
 """
 Validate preprocessing quality of extracted methods text.
 Quick checks to ensure text is ready for NLP/sentence tokenization.
+
+Checks one *_methods.txt file; with --dir every methods text file the
+extractor wrote to a folder (METHODS_TEXT_SUFFIXES),
+in a pool of worker processes (see check_dir); or with --dataset every
+article with text in a Parquet methods dataset written by
+extract_methods.py --dataset (see methods_dataset.py), printing a
+pass/fail line per article.  check_result() returns every count, issue
+and warning and the verdict for a text; --dir and --results write them
+for every text, for the corpus report of check_results.py.
+
+With --dir --repair, files that fail are run through the extractor's
+cleaning (text_cleaning.py) again and rewritten if that makes them pass,
+without re-extracting anything from the XML.
 """
 
+import argparse
+import os
 import sys
 import re
+from functools import partial
+from pathlib import Path
 from collections import Counter
 
+import text_cleaning
+
 def check_file(filepath):
-    """Run all validation checks on a file."""
+    """Run all validation checks on a file; returns the check_result() dict."""
     
     with open(filepath, 'r', encoding='utf-8') as f:
         text = f.read()
+    return check_text(text, filepath)
+
+
+# Every check, in report order: name -> pattern, counted like re.findall
+# (non-overlapping matches, left to right).  This is the specification;
+# scan_counts() computes the same counts in one pass over the text.
+CHECK_PATTERNS = {
+    # 1. Citation artifacts
+    'empty_brackets': r'\[\s*\]',
+    'empty_parens': r'\(\s*\)',
+    'et_al_cites': r'\([A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)',
+    'number_brackets': r'\[\s*\d+\s*(?:,\s*\d+\s*)*\]',
+    # 2. Spacing issues
+    'space_period': r' \.',
+    'space_comma': r' ,',
+    'space_semicolon': r' ;',
+    'double_space': r'  +',
+    'space_in_parens': r'\(\s+|\s+\)',
+    # 3. Punctuation issues
+    'double_period': r'\.\.+',
+    'double_comma': r',,+',
+    'dash_comma': r'[–—\-]\s*,',
+    # 4. LaTeX/markup noise
+    'usepackage': r'\\usepackage',
+    'documentclass': r'\\documentclass',
+    'begin_doc': r'\\begin\{document\}',
+    # 5. Section numbers
+    'section_nums': r'(?:^|\. )(\d+\.)+\d*\s+[A-Z]',
+    # 6. Sentence ends, for the statistics
+    'sentence_count': r'[.!?]+\s+',
+}
+
+# CHECK_PATTERNS split into (name, first character, rest), so one scanner
+# can try every pattern that starts at a character after a single fast
+# search for the characters any of them can start with.  The '^' branch
+# of section_nums is matched separately at the start of the text.
+_SCAN_PARTS = (
+    ('empty_brackets', r'\[', r'\s*\]'),
+    ('number_brackets', r'\[', r'\s*\d+\s*(?:,\s*\d+\s*)*\]'),
+    ('empty_parens', r'\(', r'\s*\)'),
+    ('et_al_cites', r'\(', r'[A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)'),
+    ('space_in_parens', r'\(', r'\s+'),
+    ('space_in_parens', r'\s', r'\s*\)'),
+    ('space_period', ' ', r'\.'),
+    ('space_comma', ' ', ','),
+    ('space_semicolon', ' ', ';'),
+    ('double_space', ' ', ' +'),
+    ('double_period', r'\.', r'\.+'),
+    ('section_nums', r'\.', r' (?:\d+\.)+\d*\s+[A-Z]'),
+    ('sentence_count', r'[.!?]', r'[.!?]*\s+'),
+    ('double_comma', ',', ',+'),
+    ('dash_comma', r'[–—\-]', r'\s*,'),
+    ('usepackage', r'\\', 'usepackage'),
+    ('documentclass', r'\\', 'documentclass'),
+    ('begin_doc', r'\\', r'begin\{document\}'),
+)
+# Whitespace only starts a match when followed by whitespace, ')', '.', ','
+# or ';'; leaving the rest out keeps the scanner off every word boundary.
+_SCANNER = re.compile(
+    r'(?:[\[(.,!?\-–—\\]|\s(?=[\s).,;]))'
+    + ''.join(f'(?:(?<={first})(?=({rest})))?' for _, first, rest in _SCAN_PARTS)
+)
+_SCAN_NAMES = tuple(name for name, _, _ in _SCAN_PARTS)
+_SECTION_NUM_AT_START_RE = re.compile(r'(?:\d+\.)+\d*\s+[A-Z]')
+_SENTENCE_END_RE = re.compile(CHECK_PATTERNS['sentence_count'])
+
+
+def scan_counts(text):
+    """
+    The count of every CHECK_PATTERNS pattern in `text`, from one scan.
+
+    At each candidate character the scanner reports every pattern that
+    matches there; a match is counted only if it starts at or after the
+    end of the last counted match of the same pattern, as re.findall does.
+    """
+    counts = dict.fromkeys(CHECK_PATTERNS, 0)
+    free = dict.fromkeys(CHECK_PATTERNS, 0)
+    m = _SECTION_NUM_AT_START_RE.match(text)
+    if m:
+        counts['section_nums'] = 1
+        free['section_nums'] = m.end()
+    for m in _SCANNER.finditer(text):
+        pos = m.start()
+        for name, rest in zip(_SCAN_NAMES, m.groups()):
+            if rest is not None and pos >= free[name]:
+                counts[name] += 1
+                free[name] = pos + 1 + len(rest)
+    return counts
+
+
+def findall_counts(text):
+    """The same counts as scan_counts(), with one re.findall per pattern."""
+    return {name: len(re.findall(pattern, text)) for name, pattern in CHECK_PATTERNS.items()}
+
+
+# When a check makes the text fail (issue) or only deserves a look
+# (warning): check -> (severity, count it must exceed, message)
+RULES = {
+    'empty_brackets': ('issue', 0, 'empty brackets'),
+    'empty_parens': ('issue', 0, 'empty parentheses'),
+    'et_al_cites': ('issue', 0, 'et al citations'),
+    'number_brackets': ('warning', 0, 'numbered citations'),
+    'space_period': ('issue', 0, 'spaces before periods'),
+    'space_comma': ('issue', 0, 'spaces before commas'),
+    'space_semicolon': ('issue', 0, 'spaces before semicolons'),
+    'double_space': ('warning', 50, 'double spaces (unusual)'),
+    'space_in_parens': ('issue', 0, 'extra spaces in parentheses'),
+    'double_period': ('issue', 0, 'double periods'),
+    'double_comma': ('issue', 0, 'double commas'),
+    'dash_comma': ('issue', 0, 'dash-comma artifacts'),
+    'usepackage': ('issue', 0, 'LaTeX usepackage commands'),
+    'documentclass': ('issue', 0, 'LaTeX documentclass'),
+    'begin_doc': ('issue', 0, 'LaTeX begin commands'),
+    'section_nums': ('warning', 0, 'section numbers found'),
+}
+
+
+def check_result(text):
+    """
+    Run every check on `text` without printing.  Returns a dict:
+      - 'counts':   the count of every check, then 'word_count' and
+                    'sentence_count', in report order
+      - 'issues':   messages for the RULES issues found (the text fails)
+      - 'warnings': messages for the RULES warnings found
+      - 'verdict':  'fail' if there are issues, else 'warn' if there are
+                    warnings, else 'pass'
+      - 'passed':   True unless the verdict is 'fail'
+    """
+    found = scan_counts(text)
+    counts = {name: found[name] for name in CHECK_PATTERNS if name != 'sentence_count'}
+    counts['word_count'] = len(text.split())
+    counts['sentence_count'] = found['sentence_count']
+
+    issues = []
+    warnings = []
+    for name, (severity, limit, message) in RULES.items():
+        if counts[name] > limit:
+            (issues if severity == 'issue' else warnings).append(f"{counts[name]} {message}")
+    verdict = 'fail' if issues else 'warn' if warnings else 'pass'
+    return {'counts': counts, 'issues': issues, 'warnings': warnings,
+            'verdict': verdict, 'passed': not issues}
+
+
+def check_text(text, label):
+    """
+    Run all validation checks on extracted text and print the report;
+    `label` names the text in it.  Returns the check_result() dict.
+    """
     
+    result = check_result(text)
+    c = result['counts']
+
     print("="*60)
-    print(f"PREPROCESSING VALIDATION: {filepath}")
+    print(f"PREPROCESSING VALIDATION: {label}")
     print("="*60)
     print()
     
-    # Track issues
-    issues = []
-    warnings = []
-    
     # 1. Citation artifacts
     print("📚 CITATION CLEANUP:")
-    empty_brackets = len(re.findall(r'\[\s*\]', text))
-    empty_parens = len(re.findall(r'\(\s*\)', text))
-    et_al_cites = len(re.findall(r'\([A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)', text))
-    number_brackets = len(re.findall(r'\[\s*\d+\s*(?:,\s*\d+\s*)*\]', text))
-    
-    print(f"   Empty brackets []: {empty_brackets}")
-    print(f"   Empty parens (): {empty_parens}")
-    print(f"   'et al' citations: {et_al_cites}")
-    print(f"   Number brackets [1,2]: {number_brackets}")
-    
-    if empty_brackets > 0: issues.append(f"{empty_brackets} empty brackets")
-    if empty_parens > 0: issues.append(f"{empty_parens} empty parentheses")
-    if et_al_cites > 0: issues.append(f"{et_al_cites} et al citations")
-    if number_brackets > 0: warnings.append(f"{number_brackets} numbered citations")
+    print(f"   Empty brackets []: {c['empty_brackets']}")
+    print(f"   Empty parens (): {c['empty_parens']}")
+    print(f"   'et al' citations: {c['et_al_cites']}")
+    print(f"   Number brackets [1,2]: {c['number_brackets']}")
     print()
     
     # 2. Spacing issues
     print("📏 SPACING:")
-    space_period = len(re.findall(r' \.', text))
-    space_comma = len(re.findall(r' ,', text))
-    space_semicolon = len(re.findall(r' ;', text))
-    double_space = len(re.findall(r'  +', text))
-    space_in_parens = len(re.findall(r'\(\s+|\s+\)', text))
-    
-    print(f"   Space before period ' .': {space_period}")
-    print(f"   Space before comma ' ,': {space_comma}")
-    print(f"   Space before semicolon ' ;': {space_semicolon}")
-    print(f"   Multiple spaces: {double_space}")
-    print(f"   Extra space in parens: {space_in_parens}")
-    
-    if space_period > 0: issues.append(f"{space_period} spaces before periods")
-    if space_comma > 0: issues.append(f"{space_comma} spaces before commas")
-    if space_semicolon > 0: issues.append(f"{space_semicolon} spaces before semicolons")
-    if double_space > 50: warnings.append(f"{double_space} double spaces (unusual)")
-    if space_in_parens > 0: issues.append(f"{space_in_parens} extra spaces in parentheses")
+    print(f"   Space before period ' .': {c['space_period']}")
+    print(f"   Space before comma ' ,': {c['space_comma']}")
+    print(f"   Space before semicolon ' ;': {c['space_semicolon']}")
+    print(f"   Multiple spaces: {c['double_space']}")
+    print(f"   Extra space in parens: {c['space_in_parens']}")
     print()
     
     # 3. Punctuation issues
     print("🔤 PUNCTUATION:")
-    double_period = len(re.findall(r'\.\.+', text))
-    double_comma = len(re.findall(r',,+', text))
-    dash_comma = len(re.findall(r'[–—\-]\s*,', text))
-    
-    print(f"   Double periods '..': {double_period}")
-    print(f"   Double commas ',,': {double_comma}")
-    print(f"   Dash-comma '–,': {dash_comma}")
-    
-    if double_period > 0: issues.append(f"{double_period} double periods")
-    if double_comma > 0: issues.append(f"{double_comma} double commas")
-    if dash_comma > 0: issues.append(f"{dash_comma} dash-comma artifacts")
+    print(f"   Double periods '..': {c['double_period']}")
+    print(f"   Double commas ',,': {c['double_comma']}")
+    print(f"   Dash-comma '–,': {c['dash_comma']}")
     print()
     
     # 4. LaTeX/markup noise
     print("🧹 LaTeX/MARKUP CLEANUP:")
-    usepackage = len(re.findall(r'\\usepackage', text))
-    documentclass = len(re.findall(r'\\documentclass', text))
-    begin_doc = len(re.findall(r'\\begin\{document\}', text))
-    
-    print(f"   \\usepackage commands: {usepackage}")
-    print(f"   \\documentclass: {documentclass}")
-    print(f"   \\begin{{document}}: {begin_doc}")
-    
-    if usepackage > 0: issues.append(f"{usepackage} LaTeX usepackage commands")
-    if documentclass > 0: issues.append(f"{documentclass} LaTeX documentclass")
-    if begin_doc > 0: issues.append(f"{begin_doc} LaTeX begin commands")
+    print(f"   \\usepackage commands: {c['usepackage']}")
+    print(f"   \\documentclass: {c['documentclass']}")
+    print(f"   \\begin{{document}}: {c['begin_doc']}")
     print()
     
     # 5. Section numbers
     print("🔢 SECTION NUMBERING:")
-    section_nums = len(re.findall(r'(?:^|\. )(\d+\.)+\d*\s+[A-Z]', text))
-    
-    print(f"   Section numbers (e.g., '2.1 Methods'): {section_nums}")
-    
-    if section_nums > 0: warnings.append(f"{section_nums} section numbers found")
+    print(f"   Section numbers (e.g., '2.1 Methods'): {c['section_nums']}")
     print()
     
     # 6. Text statistics
     print("📊 STATISTICS:")
-    word_count = len(text.split())
-    sentence_count = len(re.findall(r'[.!?]+\s+', text))
-    avg_sentence_len = word_count / max(sentence_count, 1)
-    
-    print(f"   Total words: {word_count:,}")
-    print(f"   Estimated sentences: {sentence_count:,}")
+    avg_sentence_len = c['word_count'] / max(c['sentence_count'], 1)
+    print(f"   Total words: {c['word_count']:,}")
+    print(f"   Estimated sentences: {c['sentence_count']:,}")
     print(f"   Avg words/sentence: {avg_sentence_len:.1f}")
     print()
     
     # 7. Sample sentences
     print("📝 SAMPLE (first 3 sentences):")
-    sentences = re.split(r'[.!?]+\s+', text)[:3]
+    sentences = _SENTENCE_END_RE.split(text, maxsplit=3)[:3]
     for i, sent in enumerate(sentences, 1):
         preview = sent[:100] + "..." if len(sent) > 100 else sent
         print(f"   {i}. {preview}")
@@ -125,27 +246,222 @@ def check_file(filepath):
     print("🏁 VERDICT:")
     print("="*60)
     
-    if issues:
+    if result['issues']:
         print("❌ ISSUES FOUND:")
-        for issue in issues:
+        for issue in result['issues']:
             print(f"   • {issue}")
         print("\n⚠️  Text needs additional cleaning!")
-        return False
-    elif warnings:
+    elif result['warnings']:
         print("⚠️  WARNINGS:")
-        for warning in warnings:
+        for warning in result['warnings']:
             print(f"   • {warning}")
         print("\n✅ Text is acceptable but check warnings")
-        return True
     else:
         print("✅ PASSED - Text is clean and ready for NLP!")
-        return True
+    return result
+
+def check_dataset(dataset_dir, results_path=None):
+    """
+    Check every article with text in a methods dataset, printing one
+    pass/fail line per article (run on its own text for the details).
+    With `results_path`, also write every article's check results there
+    (see check_results.py).  Returns the ids of the articles that failed.
+    """
+    import check_results
+    import methods_dataset
+
+    failed = []
+    rows = []
+    n = 0
+    for row in methods_dataset.iter_rows(dataset_dir, columns=['id', 'input', 'format', 'text',
+                                                              'extractor_version']):
+        if row['text'] is None:
+            continue
+        n += 1
+        result = check_result(row['text'])
+        print(f"{'✓' if result['passed'] else '✗'} {row['id']}")
+        if not result['passed']:
+            failed.append(row['id'])
+        if results_path:
+            rows.append(check_results.result_row(row['id'], result, row))
+    if results_path:
+        check_results.write_results(rows, results_path)
+    print("")
+    print(f"Total articles: {n}")
+    print(f"Passed:         {n - len(failed)}")
+    print(f"Failed:         {len(failed)}")
+    return failed
+
+
+# Methods text files written by extract_methods.py: {name}_methods.txt, and
+# {name}_methods_main.txt / {name}_methods_supp.txt.  --dir checks only
+# these, never the extractor's file lists (failed_files.txt, ...) in the
+# same folder, whose paths --repair would otherwise "clean".
+METHODS_TEXT_SUFFIXES = ('_methods.txt', '_methods_main.txt', '_methods_supp.txt')
+
+FAILED_LIST = 'failed_preprocessing_checks.txt'
+PASSED_LIST = 'passed_preprocessing_checks.txt'
+RESULTS_FILE = 'preprocessing_check_results.csv'
+
+
+def repair_text(text):
+    """
+    `text` cleaned again with the extractor's cleaning rules
+    (text_cleaning.clean_extracted_text, then clean_element_text), one
+    blank-line separated block at a time so the paragraphs layout keeps
+    its paragraphs.
+    """
+    blocks = (text_cleaning.clean_element_text(text_cleaning.clean_extracted_text(block))
+              for block in text.split('\n\n'))
+    repaired = '\n\n'.join(block for block in blocks if block)
+    return repaired + '\n' if text.endswith('\n') else repaired
+
+
+def repair_file(path, text=None):
+    """
+    Repair the text file `path` (content `text`, if already read) with
+    repair_text and check the result in memory.  The file is rewritten
+    (atomically) only if the repaired text passes.  Returns the
+    check_result() of the repaired text, with 'repaired' True if the file
+    was rewritten.
+    """
+    path = Path(path)
+    if text is None:
+        text = path.read_text(encoding='utf-8')
+    repaired = repair_text(text)
+    result = check_result(repaired)
+    result['repaired'] = result['passed'] and repaired != text
+    if result['repaired']:
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(repaired, encoding='utf-8')
+        os.replace(tmp_path, path)
+    return result
+
+
+def _check_path(path, repair=False):
+    """
+    (file name, check_result()) for one text file, repairing it first if it
+    fails and `repair` is set (see repair_file); runs in the worker processes.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    result = check_result(text)
+    if repair and not result['passed']:
+        repaired = repair_file(path, text)
+        if repaired['repaired']:
+            result = repaired
+    return Path(path).name, result
+
+
+def check_dir(text_dir, workers=None, failed_list=FAILED_LIST, passed_list=PASSED_LIST,
+              results_path=RESULTS_FILE, run_report=None, repair=False):
+    """
+    Check every methods text file in `text_dir` (names ending in one of
+    METHODS_TEXT_SUFFIXES) and print one pass/fail line per file, as
+    batch_check_methods.sh used to do with one python3 process per file.
+
+    The names of the passing and failing files go to `passed_list` and
+    `failed_list`, one per line in file name order; the failed list is
+    removed if nothing failed.  Every file's check results go to
+    `results_path` (CSV, or Parquet for a .parquet path; see
+    check_results.py), with the source format and publisher of each file
+    from the extraction run report `run_report` (default:
+    text_dir/extraction_report.jsonl, if there is one).  `workers`
+    processes share the files (default: one per CPU; 1 = no pool).
+
+    With `repair`, every failing file is repaired (repair_file) and
+    rewritten if that makes it pass; the lines, lists and results are
+    then about the repaired text.  Returns the names of the files that
+    (still) failed.
+    """
+    import check_results
+
+    paths = sorted(path for path in Path(text_dir).glob('*.txt')
+                   if path.name.endswith(METHODS_TEXT_SUFFIXES))
+    if run_report is None and (Path(text_dir) / 'extraction_report.jsonl').exists():
+        run_report = Path(text_dir) / 'extraction_report.jsonl'
+    sources = check_results.load_sources(run_report) if run_report else {}
+
+    check_path = partial(_check_path, repair=repair)
+    if workers == 1 or len(paths) < 2:
+        results = map(check_path, paths)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        n_workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+        chunksize = max(1, min(64, len(paths) // (n_workers * 4)))
+        results = pool.map(check_path, paths, chunksize=chunksize)
+
+    passed, failed, rows = [], [], []
+    n_repaired = 0
+    try:
+        for name, result in results:
+            repaired = ' (repaired)' if result.get('repaired') else ''
+            n_repaired += bool(repaired)
+            print(f"{'✓' if result['passed'] else '✗'} {name}{repaired}")
+            (passed if result['passed'] else failed).append(name)
+            rows.append(check_results.result_row(name, result, sources.get(name)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for list_path, names in ((passed_list, passed), (failed_list, failed)):
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{name}\n" for name in names)
+    if not failed:
+        os.remove(failed_list)
+    check_results.write_results(rows, results_path)
+
+    print("")
+    print(f"Total files:   {len(paths)}")
+    print(f"Passed:        {len(passed)}")
+    print(f"Failed:        {len(failed)}")
+    if repair:
+        print(f"Repaired:      {n_repaired} (rewritten; counted as passed)")
+    print(f"Results:       {results_path}")
+    if failed:
+        print(f"Failed files saved to: {failed_list}")
+    return failed
+
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python validate_preprocessing.py <methods_file.txt>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Validate preprocessing of extracted methods text')
+    parser.add_argument('filepath', nargs='?', help='Extracted methods text file (*_methods.txt)')
+    parser.add_argument('--dir', help='Check every methods text file (*_methods.txt, *_methods_main.txt, '
+                             '*_methods_supp.txt) in this folder')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Worker processes with --dir (default: one per CPU; 1 = no pool)')
+    parser.add_argument('--failed-list', default=FAILED_LIST,
+                        help='With --dir: file for the names of failing files (default: %(default)s)')
+    parser.add_argument('--passed-list', default=PASSED_LIST,
+                        help='With --dir: file for the names of passing files (default: %(default)s)')
+    parser.add_argument('--results', default=None,
+                        help='File for every text\'s check results, CSV or .parquet '
+                             f'(default with --dir: {RESULTS_FILE}; see check_results.py)')
+    parser.add_argument('--run-report', default=None,
+                        help='With --dir: extraction run report giving each file\'s source format '
+                             'and publisher (default: extraction_report.jsonl in the folder)')
+    parser.add_argument('--repair', action='store_true',
+                        help='With --dir: clean failing files again with the extractor\'s cleaning '
+                             'rules and rewrite those that then pass')
+    parser.add_argument('--dataset', help='Check every article in this Parquet methods dataset')
+    args = parser.parse_args()
+
+    if args.results and args.results.endswith('.parquet'):
+        import check_results
+        if check_results.pa is None:
+            print("Error: .parquet results require pyarrow (pip install pyarrow)", file=sys.stderr)
+            sys.exit(1)
+    if args.dir:
+        if not os.path.isdir(args.dir):
+            parser.error(f'directory not found: {args.dir}')
+        sys.exit(1 if check_dir(args.dir, args.workers, args.failed_list, args.passed_list,
+                                args.results or RESULTS_FILE, args.run_report,
+                                args.repair) else 0)
+    if args.dataset:
+        sys.exit(1 if check_dataset(args.dataset, args.results) else 0)
+    if not args.filepath:
+        parser.error('a methods text file, --dir or --dataset is required')
     
-    filepath = sys.argv[1]
-    success = check_file(filepath)
-    sys.exit(0 if success else 1)
+    sys.exit(0 if check_file(args.filepath)['passed'] else 1)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Machine-readable preprocessing check results and a corpus-level report.
+
+check_methods_processing.py --dir (or --dataset with --results) writes one
+row per checked text, as CSV, or as Parquet if the path ends in .parquet
+(requires pyarrow).  Columns:
+  - file:      checked text file (article id for a dataset)
+  - input, format, publisher, extractor_version: where the text came
+               from, from the extraction run report (extraction_report.jsonl)
+               or the dataset row; empty when unknown
+  - verdict:   'pass', 'warn' or 'fail'
+  - passed:    the verdict is not 'fail'
+  - repaired:  the file was rewritten by check_methods_processing.py --repair
+  - one column per check count (check_methods_processing.CHECK_PATTERNS),
+    then word_count and sentence_count
+  - issues, warnings: the messages, '; '-separated
+
+An extraction run with extract_methods.py --validate already holds the
+same results in its run report (extraction_report.jsonl), checked on the
+text in memory; this module reads such a report as a results file too.
+
+Run on one or more results files, this module reports for each source
+format and each publisher (or the columns given with --by) the share of
+texts that failed or got warnings and how often each check fired, so a
+cleaning rule that regressed shows up without re-validating anything.
+With several results files (e.g. runs of different extractor versions),
+--by run compares them side by side; --csv writes the full table.
+
+Usage:
+  python3 check_results.py results.csv [more.csv | extraction_report.jsonl ...]
+      [--by format publisher] [--csv OUT]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for .parquet results
+    pa = pq = None
+
+import check_methods_processing
+
+SOURCE_COLUMNS = ('input', 'format', 'publisher', 'extractor_version')
+STAT_COLUMNS = ('word_count', 'sentence_count')
+MESSAGE_SEPARATOR = '; '
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet check results require pyarrow (pip install pyarrow)")
+
+
+def result_row(name, result, source=None):
+    """
+    Results row for one check_result() dict; `source` holds any of
+    SOURCE_COLUMNS.
+    """
+    source = source or {}
+    row = {'file': name}
+    row.update({col: source.get(col) for col in SOURCE_COLUMNS})
+    row['verdict'] = result['verdict']
+    row['passed'] = result['passed']
+    row['repaired'] = result.get('repaired', False)
+    row.update(result['counts'])
+    row['issues'] = MESSAGE_SEPARATOR.join(result['issues'])
+    row['warnings'] = MESSAGE_SEPARATOR.join(result['warnings'])
+    return row
+
+
+def _report_records(report_path):
+    with open(report_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _record_source(record):
+    return {
+        'input': record.get('input'),
+        'format': record.get('format'),
+        'publisher': (record.get('parse') or {}).get('publisher'),
+        'extractor_version': record.get('extractor_version'),
+    }
+
+
+def load_sources(report_path):
+    """
+    Output file name -> SOURCE_COLUMNS values, from an extraction run
+    report (JSONL written by extract_methods.py batch mode).
+    """
+    sources = {}
+    for record in _report_records(report_path):
+        source = _record_source(record)
+        for output in record.get('outputs', []):
+            sources[Path(output).name] = source
+    return sources
+
+
+def rows_from_report(report_path, validator='preprocessing'):
+    """
+    Results rows from the `validator` results in an extraction run report
+    (extract_methods.py --validate), one per input whose text was checked,
+    named after its first output file.
+    """
+    rows = []
+    for record in _report_records(report_path):
+        result = record.get('validation', {}).get(validator)
+        if result is None:
+            continue
+        outputs = record.get('outputs') or [record['input']]
+        rows.append(result_row(Path(outputs[0]).name, result, _record_source(record)))
+    return rows
+
+
+def write_results(rows, path):
+    """Write results rows to `path` (Parquet if it ends in .parquet, else CSV)."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if path.suffix == '.parquet':
+        _require_pyarrow()
+        pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+    else:
+        columns = list(rows[0]) if rows else ['file', *SOURCE_COLUMNS, 'verdict', 'passed',
+                                              'repaired']
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def read_results(path):
+    """Results rows from a file written by write_results, or from a run report (.jsonl)."""
+    if Path(path).suffix == '.jsonl':
+        return rows_from_report(path)
+    if Path(path).suffix == '.parquet':
+        _require_pyarrow()
+        return pq.read_table(path).to_pylist()
+    numeric = set(check_methods_processing.RULES) | set(STAT_COLUMNS)
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for col, value in row.items():
+                if col in numeric:
+                    row[col] = int(value)
+                elif col in ('passed', 'repaired'):
+                    row[col] = value == 'True'
+                elif value == '':
+                    row[col] = None
+            rows.append(row)
+    return rows
+
+
+def fired_checks(row):
+    """The RULES checks whose count in `row` raises an issue or warning."""
+    return [name for name, (_, limit, _) in check_methods_processing.RULES.items()
+            if row.get(name, 0) > limit]
+
+
+def prevalence(rows, by):
+    """
+    Per value of the `by` column: files, verdict counts and, per check,
+    the number of files it fired on.  Returns a list of (value, stats)
+    sorted by failure rate, highest first.
+    """
+    groups = {}
+    for row in rows:
+        value = row.get(by) or 'unknown'
+        stats = groups.setdefault(value, {'files': 0, 'verdicts': Counter(), 'fired': Counter()})
+        stats['files'] += 1
+        stats['verdicts'][row['verdict']] += 1
+        stats['fired'].update(fired_checks(row))
+
+    def fail_rate(item):
+        stats = item[1]
+        return -stats['verdicts']['fail'] / stats['files'], str(item[0])
+
+    return sorted(groups.items(), key=fail_rate)
+
+
+def report_lines(rows, by, top=4):
+    """Prevalence table for the `by` column, with each group's `top` most frequent checks."""
+    lines = [f"{by.capitalize():<30} {'Files':>6} {'Fail %':>7} {'Warn %':>7}  Most frequent checks",
+             "-" * 100]
+    for value, stats in prevalence(rows, by):
+        n = stats['files']
+        checks = ', '.join(f"{name} {100 * k / n:.1f}%"
+                           for name, k in stats['fired'].most_common(top))
+        lines.append(f"{str(value)[:30]:<30} {n:>6} "
+                     f"{100 * stats['verdicts']['fail'] / n:>6.1f}% "
+                     f"{100 * stats['verdicts']['warn'] / n:>6.1f}%  {checks or '-'}")
+    return lines
+
+
+def write_prevalence_csv(rows, by_columns, path):
+    """
+    The full prevalence table as CSV: one line per (by, value), with the
+    file and verdict counts and the share of files each check fired on.
+    """
+    checks = list(check_methods_processing.RULES)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['by', 'value', 'files', 'fail', 'warn', 'pass'] + checks)
+        for by in by_columns:
+            for value, stats in prevalence(rows, by):
+                n = stats['files']
+                writer.writerow([by, value, n] +
+                                [stats['verdicts'][v] for v in ('fail', 'warn', 'pass')] +
+                                [round(stats['fired'][name] / n, 4) for name in checks])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report issue prevalence from preprocessing check results'
+    )
+    parser.add_argument('results', nargs='+',
+                        help='Results files written by check_methods_processing.py (CSV or '
+                             '.parquet), or run reports of extract_methods.py --validate (.jsonl)')
+    parser.add_argument('--by', nargs='+', default=['format', 'publisher'],
+                        help='Columns to group by, each in its own table; "run" is the results '
+                             'file (default: format publisher)')
+    parser.add_argument('--top', type=int, default=4,
+                        help='Most frequent checks listed per group (default: 4)')
+    parser.add_argument('--csv', help='Also write the full prevalence table to this CSV file')
+    args = parser.parse_args()
+
+    rows = []
+    for path in args.results:
+        if not Path(path).exists():
+            print(f"Error: results file '{path}' does not exist", file=sys.stderr)
+            sys.exit(1)
+        for row in read_results(path):
+            row['run'] = Path(path).stem
+            rows.append(row)
+    if not rows:
+        print("No check results.")
+        return
+
+    verdicts = Counter(row['verdict'] for row in rows)
+    print(f"Texts checked: {len(rows)} (pass {verdicts['pass']}, warn {verdicts['warn']}, "
+          f"fail {verdicts['fail']})")
+    for by in args.by:
+        print("")
+        print("\n".join(report_lines(rows, by, args.top)))
+    if args.csv:
+        write_prevalence_csv(rows, args.by, args.csv)
+        print(f"\nPrevalence table: {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Compare the working-tree extract_methods.py against an earlier git revision.
+
+Used as a regression check when rewriting extractor internals for speed:
+the older revision is loaded straight from git (no checkout needed) and
+both versions are run over the same folder of XML files.  Any difference
+in output is reported, together with the time each version took.  The
+golden outputs in tests/test_extract_methods.py run the same checks under
+pytest (against EXTRACTOR_REF, if set).
+
+Usage:
+  python3 compare_extractor_versions.py locator <xml_dir> [--ref REF]
+  python3 compare_extractor_versions.py outputs <xml_dir> [--ref REF]
+  python3 compare_extractor_versions.py text <xml_dir> [--ref REF] [--repeat N]
+  python3 compare_extractor_versions.py cleaning <xml_dir> [--ref REF] [--fuzz N]
+"""
+
+import argparse
+import importlib.util
+import random
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import extract_methods as current  # noqa: E402
+import text_cleaning  # noqa: E402
+
+# Revision checked against by default: the last commit, so uncommitted
+# changes to the extractor are compared with what they replace
+DEFAULT_REF = 'HEAD'
+
+
+def load_reference(ref, module='extract_methods'):
+    """
+    Import `module` (a sibling of this script) as it was at git revision `ref`.
+
+    Any sibling modules the reference imports are resolved from the working
+    tree.
+    """
+    repo_root = subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'],
+        cwd=SCRIPT_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    rel_path = (SCRIPT_DIR / f'{module}.py').relative_to(repo_root).as_posix()
+    source = subprocess.run(
+        ['git', 'show', f'{ref}:{rel_path}'],
+        cwd=repo_root, capture_output=True, text=True, check=True,
+    ).stdout
+
+    spec = importlib.util.spec_from_loader(f'{module}_at_{ref}', loader=None)
+    mod = importlib.util.module_from_spec(spec)
+    mod.__file__ = f'{ref}:{rel_path}'
+    exec(compile(source, mod.__file__, 'exec'), mod.__dict__)
+    return mod
+
+
+def xml_files_in(xml_dir):
+    return sorted(str(f) for f in Path(xml_dir).glob('*.xml'))
+
+
+def compare_locator(reference, xml_files):
+    """
+    Compare find_all_methods_sections between versions on identical trees.
+
+    Candidates are compared by element identity, so both the selection and
+    the section_priority ordering must agree.
+    """
+    mismatches = []
+    t_ref = t_cur = 0.0
+    n = 0
+    for xml_file in xml_files:
+        try:
+            root = ET.parse(xml_file).getroot()
+        except ET.ParseError:
+            continue
+        if current.detect_xml_format(root) not in ('jats', 'unknown'):
+            continue
+        n += 1
+
+        t0 = time.perf_counter()
+        ref_secs = reference.find_all_methods_sections(root)
+        t1 = time.perf_counter()
+        cur_secs = current.find_all_methods_sections(root)
+        t2 = time.perf_counter()
+        t_ref += t1 - t0
+        t_cur += t2 - t1
+
+        if len(ref_secs) != len(cur_secs) or any(
+            a is not b for a, b in zip(ref_secs, cur_secs)
+        ):
+            mismatches.append(xml_file)
+
+    return n, mismatches, t_ref, t_cur
+
+
+def compare_outputs(reference, xml_files):
+    """Compare the full extract_methods_section text between versions."""
+    mismatches = []
+    t_ref = t_cur = 0.0
+    for xml_file in xml_files:
+        t0 = time.perf_counter()
+        ref_result = reference.extract_methods_section(xml_file)
+        t1 = time.perf_counter()
+        cur_result = current.extract_methods_section(xml_file)
+        t2 = time.perf_counter()
+        t_ref += t1 - t0
+        t_cur += t2 - t1
+
+        if (ref_result['text'] != cur_result['text'] or
+                ref_result['is_main'] != cur_result['is_main']):
+            mismatches.append(xml_file)
+
+    return len(xml_files), mismatches, t_ref, t_cur
+
+
+def compare_text(reference, xml_files, repeat=1):
+    """
+    Compare extract_text_from_element between versions on every JATS
+    <body> and located methods section (benchmark for the serializer on
+    large articles).  Each element is serialised `repeat` times per version.
+    """
+    elements = []
+    for xml_file in xml_files:
+        try:
+            root = ET.parse(xml_file).getroot()
+        except ET.ParseError:
+            continue
+        if current.detect_xml_format(root) not in ('jats', 'unknown'):
+            continue
+        body = root.find('.//{*}body')
+        if body is not None:
+            elements.append((xml_file, body))
+        elements += [(xml_file, sec) for sec in current.find_all_methods_sections(root)]
+
+    mismatches = []
+    t_ref = t_cur = 0.0
+    for xml_file, elem in elements:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            ref_text = reference.extract_text_from_element(elem)
+        t1 = time.perf_counter()
+        for _ in range(repeat):
+            cur_text = current.extract_text_from_element(elem)
+        t2 = time.perf_counter()
+        t_ref += t1 - t0
+        t_cur += t2 - t1
+        if ref_text != cur_text and xml_file not in mismatches:
+            mismatches.append(xml_file)
+
+    return len(elements), mismatches, t_ref, t_cur
+
+
+def corpus_paragraphs(xml_files):
+    """Raw paragraph / passage strings from every parseable file."""
+    paragraphs = []
+    for xml_file in xml_files:
+        try:
+            root = ET.parse(xml_file).getroot()
+        except ET.ParseError:
+            continue
+        for elem in root.iter():
+            if not isinstance(elem.tag, str):
+                continue
+            tag = elem.tag.split('}')[-1]
+            if tag == 'p' or (tag == 'text' and elem.text):
+                text = ' '.join(t.strip() for t in elem.itertext())
+                if text.strip():
+                    paragraphs.append(text)
+    return paragraphs
+
+
+def fuzz_strings(n, seed=0):
+    """Random short strings dense in the characters the cleaners act on."""
+    rng = random.Random(seed)
+    alphabet = (
+        list(' .,;:!?()[]-–—&\xa0\t') +
+        ['et al', 'et al.', 'n.d.', 'Smith', ' & ', '2019', '2.1 ', '&amp;',
+         'ﬁ', 'word', 'A', 'x']
+    )
+    return [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        for _ in range(n)
+    ]
+
+
+def _reference_element_cleaner(reference):
+    """
+    The reference version has the element-level pass inline in
+    extract_text_from_element; run it through a childless element.
+    """
+    def clean(text):
+        elem = ET.Element('named-content')
+        elem.text = text
+        return reference.extract_text_from_element(elem)
+    return clean
+
+
+def compare_cleaning(reference, xml_files, fuzz=0):
+    """
+    Golden-output and throughput check of the text cleaning functions.
+
+    Paragraph cleaning is compared on every paragraph in the corpus plus
+    `fuzz` random strings; the element-level pass on the random strings.
+    Times are for paragraph cleaning over the corpus paragraphs.
+    """
+    paragraphs = corpus_paragraphs(xml_files)
+    mismatches = []
+
+    def timed(func, texts):
+        t0 = time.perf_counter()
+        out = [func(t) for t in texts]
+        return out, time.perf_counter() - t0
+
+    ref_out, t_ref = timed(reference.clean_extracted_text, paragraphs)
+    cur_out, t_cur = timed(text_cleaning.clean_extracted_text, paragraphs)
+    mismatches += [repr(p) for p, a, b in zip(paragraphs, ref_out, cur_out) if a != b]
+
+    fuzzed = fuzz_strings(fuzz)
+    for text in fuzzed:
+        if reference.clean_extracted_text(text) != text_cleaning.clean_extracted_text(text):
+            mismatches.append(f'paragraph: {text!r}')
+
+    ref_element = _reference_element_cleaner(reference)
+    for text in fuzzed:
+        if ref_element(text) != text_cleaning.clean_element_text(text.strip()):
+            mismatches.append(f'element: {text!r}')
+
+    if paragraphs and t_ref > 0 and t_cur > 0:
+        print(f"Paragraphs/s at ref: {len(paragraphs) / t_ref:,.0f}")
+        print(f"Paragraphs/s now:    {len(paragraphs) / t_cur:,.0f}")
+    return len(paragraphs) + 2 * len(fuzzed), mismatches, t_ref, t_cur
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare extract_methods.py against an earlier git revision'
+    )
+    parser.add_argument('check', choices=['locator', 'outputs', 'cleaning', 'text'],
+                        help='What to compare')
+    parser.add_argument('xml_dir', help='Folder of XML files to compare on')
+    parser.add_argument('--ref', default=DEFAULT_REF,
+                        help=f'Git revision to compare against (default: {DEFAULT_REF})')
+    parser.add_argument('--fuzz', type=int, default=0,
+                        help='cleaning: also compare on N random punctuation-heavy strings')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='text: serialise each element N times per version')
+    args = parser.parse_args()
+
+    reference = load_reference(args.ref)
+    xml_files = xml_files_in(args.xml_dir)
+    if not xml_files:
+        print(f"No XML files found in {args.xml_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.check == 'locator':
+        n, mismatches, t_ref, t_cur = compare_locator(reference, xml_files)
+    elif args.check == 'outputs':
+        n, mismatches, t_ref, t_cur = compare_outputs(reference, xml_files)
+    elif args.check == 'text':
+        n, mismatches, t_ref, t_cur = compare_text(reference, xml_files, args.repeat)
+    else:
+        n, mismatches, t_ref, t_cur = compare_cleaning(reference, xml_files, args.fuzz)
+
+    print(f"Items compared:   {n}")
+    print(f"Time at {args.ref}:  {t_ref:.3f}s")
+    print(f"Time now:         {t_cur:.3f}s")
+    if t_cur > 0:
+        print(f"Speed-up:         {t_ref / t_cur:.2f}x")
+    print(f"Mismatches:       {len(mismatches)}")
+    for xml_file in mismatches:
+        print(f"  - {xml_file}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
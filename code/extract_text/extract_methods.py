@@ -11,12 +11,44 @@ Supported formats:
 
 import xml.etree.ElementTree as ET
 import argparse
+import os
 import sys
 import re
-import unicodedata
-import html as htmlmod
+import time
+import json
+import tarfile
+import zipfile
+from collections import Counter
+from functools import partial
 from pathlib import Path
 
+import extraction_manifest
+import methods_dataset
+import parse_cache
+import profiling
+import source_resolver
+import text_cleaning
+from text_cleaning import clean_element_text, clean_extracted_text, strip_section_number
+
+try:
+    from lxml import etree as LET
+except ImportError:  # lxml is optional; ElementTree (+ repair) is used instead
+    LET = None
+
+
+# Version of the extraction logic (locator, text cleaning, output naming).
+# Bump it whenever a change alters extracted text: batch runs re-extract every
+# file whose manifest entry was written by another version.
+EXTRACTOR_VERSION = '1'
+
+
+def _local_name(tag):
+    """
+    Tag name without its '{namespace}', or without an undeclared 'prefix:'
+    (lxml's recovering parser keeps e.g. 'oasis:table' as the tag).
+    """
+    return tag.rpartition('}')[2].rpartition(':')[2]
+
 
 # ---------------------------------------------------------------------------
 # Format detection
@@ -59,12 +91,136 @@ def detect_xml_format(root):
     return 'unknown'
   
     return False
+
+
+# Number of leading bytes read when sniffing a file's format
+SNIFF_BYTES = 8192
+
+# Prolog constructs that can precede the root element
+_XML_PROLOG_RE = re.compile(
+    r'\s*(?:<\?.*?\?>|<!--.*?-->|<!DOCTYPE(?:[^\[>]|\[.*?\])*>)',
+    re.DOTALL,
+)
+_ROOT_TAG_RE = re.compile(r'\s*<([A-Za-z_][\w.-]*(?::[A-Za-z_][\w.-]*)?)([^>]*)')
+_DOCTYPE_RE = re.compile(r'<!DOCTYPE\s+([^>\[]*)', re.IGNORECASE)
+
+
+def sniff_xml_format(xml_file, head=None):
+    """
+    Classify an XML file as 'jats', 'tei', 'bioc' or 'unknown' from its
+    first few KB only (no XML parse).
+
+    Looks at the root tag, the DOCTYPE and the TEI namespace; if the root
+    tag is not within the first SNIFF_BYTES bytes, falls back to the file
+    name (.pdf.tei.xml -> TEI, _bioc.xml -> BioC).  Classification by root
+    tag agrees with detect_xml_format.  `head` may be passed if the leading
+    bytes have already been read.
+    """
+    if head is None:
+        with open(xml_file, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+    text = head[:SNIFF_BYTES].decode('utf-8', errors='replace').lstrip('\ufeff')
+
+    # Skip the XML declaration, comments, processing instructions and DOCTYPE
+    pos = 0
+    while True:
+        m = _XML_PROLOG_RE.match(text, pos)
+        if not m:
+            break
+        pos = m.end()
+
+    doctype = _DOCTYPE_RE.search(text, 0, pos)
+    doctype = doctype.group(1) if doctype else ''
+
+    root = _ROOT_TAG_RE.match(text, pos)
+    if root:
+        qname, attrs = root.group(1), root.group(2)
+        local = qname.split(':')[-1]
+        if local == 'TEI':
+            return 'tei'
+        if qname == 'collection' and 'xmlns=' not in attrs:
+            return 'bioc'
+        if local == 'article':
+            return 'jats'
+        if 'http://www.tei-c.org/ns/1.0' in text:
+            return 'tei'
+        if re.search(r'JATS|NLM|archivearticle|journalpublishing', doctype):
+            return 'jats'
+        return 'unknown'
+
+    name = Path(str(xml_file)).name
+    if name.endswith('.pdf.tei.xml'):
+        return 'tei'
+    if name.endswith('_bioc.xml'):
+        return 'bioc'
+    if 'http://www.tei-c.org/ns/1.0' in text:
+        return 'tei'
+    if re.search(r'JATS|NLM|archivearticle|journalpublishing', doctype):
+        return 'jats'
+    return 'unknown'
+
+
+# Number of leading bytes searched for the publisher name; front matter
+# (<journal-meta>, TEI <publicationStmt>) comes before the body.
+PUBLISHER_SNIFF_BYTES = 65536
+
+_PUBLISHER_RES = [
+    re.compile(rf'<(?:[\w.-]+:)?{tag}\b[^>]*>(.*?)</(?:[\w.-]+:)?{tag}\s*>', re.DOTALL)
+    for tag in ('publisher-name', 'publisher', 'journal-title')
+]
+_MARKUP_RE = re.compile(r'<[^>]*>')
+
+
+def sniff_publisher(head):
+    """
+    Publisher of an XML file from its leading bytes: JATS <publisher-name>,
+    TEI <publisher>, else the journal title.  None if not found.
+    """
+    text = head[:PUBLISHER_SNIFF_BYTES].decode('utf-8', errors='replace')
+    for pattern in _PUBLISHER_RES:
+        m = pattern.search(text)
+        if m:
+            name = ' '.join(_MARKUP_RE.sub(' ', m.group(1)).split())
+            if name:
+                return name
+    return None
+
+
+_ARTICLE_ID_RE = re.compile(
+    r'<(?:[\w.-]+:)?article-id\b[^>]*\bpub-id-type\s*=\s*["\'](pmcid|pmc|pmid)["\'][^>]*>'
+    r'\s*([\w.-]+)\s*<'
+)
+
+
+def sniff_article_id(head):
+    """
+    PMCID (e.g. 'PMC1234567') of a JATS file from its leading bytes, else
+    its PMID.  None if the front matter has neither.
+    """
+    text = head[:PUBLISHER_SNIFF_BYTES].decode('utf-8', errors='replace')
+    ids = {}
+    for id_type, value in _ARTICLE_ID_RE.findall(text):
+        if id_type in ('pmcid', 'pmc'):
+            id_type, value = 'pmcid', 'PMC' + value.upper().removeprefix('PMC')
+        ids.setdefault(id_type, value)
+    return ids.get('pmcid') or ids.get('pmid')
+
+
+def bucket_by_format(xml_files):
+    """Group files by sniff_xml_format without parsing any of them."""
+    buckets = {}
+    for xml_file in xml_files:
+        buckets.setdefault(sniff_xml_format(xml_file), []).append(xml_file)
+    return buckets
   
 # -----------------------------------------------------------------------------
 # Detect if this is a journal format without methods sections
 # -----------------------------------------------------------------------------
-def _is_main_journal(root):
-    journal = root.find('.//{*}journal-title')
+def _is_main_journal(root, facts=None):
+    if facts is not None:
+        journal = facts['journal_title']
+    else:
+        journal = root.find('.//{*}journal-title')
 
     main_journals = {
         'nature genetics',
@@ -84,17 +240,35 @@ def _is_main_journal(root):
 # -----------------------------------------------------------------------------
 # Detect if this article is a letter to the editor (which often has no methods section)
 # -----------------------------------------------------------------------------
-import re
+_LETTER_TO_EDITOR_RE = re.compile(r'^\s*(to the editor|dear editor)\b', re.IGNORECASE)
+
+
+def _paragraph_prefix(p, length=16):
+    """
+    Leading text of a paragraph: enough of ''.join(p.itertext()) to hold
+    `length` non-space characters (or all of it, if shorter).
+    """
+    parts = []
+    n = 0
+    for text in p.itertext():
+        parts.append(text)
+        n += len(text)
+        if n >= length and len(''.join(parts).lstrip()) >= length:
+            break
+    return ''.join(parts)
+
 
-def _is_letter_to_editor(root):
-    pattern = re.compile(r'^\s*(to the editor|dear editor)\b', re.IGNORECASE)
+def _is_letter_to_editor(root, facts=None):
+    paragraphs = facts['paragraphs'] if facts is not None else root.findall('.//{*}p')
 
-    for p in root.findall('.//{*}p'):
-        text = ''.join(p.itertext())
+    # The pattern only looks at the first few characters, so only each
+    # paragraph's prefix is joined rather than all of its text.
+    for p in paragraphs:
+        text = _paragraph_prefix(p)
         if not text:
             continue
 
-        if pattern.match(text):
+        if _LETTER_TO_EDITOR_RE.match(text):
             return True
 
     return False
@@ -125,56 +299,6 @@ def extract_bioc_main(root):
     return result if result else None
 
 
-# ---------------------------------------------------------------------------
-# Text cleaning (shared across formats)
-# ---------------------------------------------------------------------------
-
-def clean_extracted_text(text):
-    """
-    Apply standard text cleaning to extracted methods text.
-    Shared across all XML formats.
-    """
-    text = unicodedata.normalize("NFKC", text)
-    text = htmlmod.unescape(text)
-    text = text.replace('\xa0', ' ')
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    # Remove section numbering at start of paragraphs
-    text = re.sub(r'^(\d+\.)+\d*\s*', '', text)
-    text = re.sub(r'\.\s+(\d+\.)+\d*\s+', '. ', text)
-
-    # Clean up punctuation artifacts from removed citations
-    text = re.sub(r'([,;.])\s*([,;.])', r'\2', text)
-    text = re.sub(r'\s+([,;.])', r'\1', text)
-
-    # Remove author citations
-    text = re.sub(r'\([A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)', '', text)
-
-    # Remove empty brackets
-    text = re.sub(r'\[\s*[,;–—\-\s]*\s*\]', '', text)
-    text = re.sub(r'\(\s*[,;–—\-\s]*\s*\)', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    # Clean trailing punctuation artifacts
-    text = re.sub(r'[,;]\s*[–—\-]\s*[,;.]', '.', text)
-    text = re.sub(r'[,;]\s*[–—\-]\s*$', '.', text)
-    text = re.sub(r'[–—\-]\s*[,;.]', '.', text)
-
-    # Fix bracket spacing
-    text = re.sub(r'\(\s+', '(', text)
-    text = re.sub(r'\s+\)', ')', text)
-    text = re.sub(r'\[\s+', '[', text)
-    text = re.sub(r'\s+\]', ']', text)
-
-    # Final cleanup
-    text = re.sub(r'\s+([,;.:!?])', r'\1', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = re.sub(r'\.{2,}', '.', text)
-    text = re.sub(r',{2,}', ',', text)
-
-    return text
-
-
 # ---------------------------------------------------------------------------
 # TEI XML extraction (GROBID .pdf.tei.xml files)
 # ---------------------------------------------------------------------------
@@ -217,17 +341,84 @@ FALLBACK_EXCLUDED_PREFIXES = (
 )
 
 
-def extract_tei_methods(root):
-    """
-    Extract methods section from a TEI (GROBID) XML document.
+# A head title ends the methods section if it is a NON_METHODS_SECTIONS entry
+# or starts with one followed by a space
+_TEI_STOP_RE = re.compile(
+    '(?:' + '|'.join(re.escape(w) for w in sorted(NON_METHODS_SECTIONS)) + r')(?: |\Z)'
+)
 
-    TEI structure: <body> contains flat sibling <div> elements.
-    The Methods <div> typically has just a <head> with no paragraphs;
-    the actual content is in subsequent sibling <div> elements until
-    the next major section (Results, Discussion, etc.).
+_TEI_HEAD = '{%s}head' % TEI_NS['tei']
+_TEI_P = '{%s}p' % TEI_NS['tei']
 
-    Returns extracted text string, or None if no methods section found.
+
+def index_tei_divs(divs):
     """
+    One pass over the children of each top-level TEI <div>.
+
+    Returns a list with, per div, (div, heading, title, clean_title,
+    paragraphs):
+      - heading:     stripped <head> text, or None if the div has no head
+                     text (tei:head preferred over an unnamespaced head)
+      - title:       heading lowercased, for matching
+      - clean_title: heading without leading "2.1 "-style numbering
+      - paragraphs:  the div's <p> children (tei:p, else unnamespaced p)
+    """
+    index = []
+    for div in divs:
+        tei_head = plain_head = None
+        tei_ps = []
+        plain_ps = []
+        for child in div:
+            tag = child.tag
+            if tag == _TEI_P:
+                tei_ps.append(child)
+            elif tag == 'p':
+                plain_ps.append(child)
+            elif tag == _TEI_HEAD:
+                if tei_head is None:
+                    tei_head = child
+            elif tag == 'head':
+                if plain_head is None:
+                    plain_head = child
+        head = tei_head if tei_head is not None else plain_head
+        if head is not None and head.text:
+            heading = head.text.strip()
+            title = heading.lower()
+            clean_title = strip_section_number(heading)
+        else:
+            heading = title = clean_title = None
+        index.append((div, heading, title, clean_title, tei_ps or plain_ps))
+    return index
+
+
+def _tei_methods_start(index):
+    """Position in `index` of the div where the methods section starts, or None."""
+    # Match "methods", "materials and methods", "methods and materials", etc.
+    for i, (_, heading, title, _, _) in enumerate(index):
+        if heading is not None and ('method' in title and
+                                    not title.startswith('result') and
+                                    not title.startswith('discussion')):
+            return i
+
+    # Fallback: GROBID sometimes flattens the section hierarchy and drops the
+    # top-level "Methods" head, leaving only its subheadings (e.g. "Study
+    # participants", "Genotyping", "GWAS"). If the first pass found nothing,
+    # look for heads that contain one of the methods-subsection keywords.
+    for i, (_, heading, _, clean_title, _) in enumerate(index):
+        if heading is None:
+            continue
+        # Leading numeric prefixes like "2.1 " or "3. " are already stripped
+        title_clean = clean_title.lower()
+        if title_clean.startswith(FALLBACK_EXCLUDED_PREFIXES):
+            continue
+        if any(kw in title_clean for kw in METHODS_SUBSECTION_KEYWORDS):
+            return i
+
+    return None
+
+
+def tei_body_index(root):
+    """index_tei_divs of the top-level <div>s of the TEI <body>, or None."""
     body = root.find('.//tei:body', TEI_NS)
     if body is None:
         # Try without namespace
@@ -240,88 +431,68 @@ def extract_tei_methods(root):
         divs = list(body.findall('div'))
     if not divs:
         return None
+    return index_tei_divs(divs)
 
-    # Find the index of the Methods div
-    methods_start = None
-    for i, div in enumerate(divs):
-        head = div.find('tei:head', TEI_NS)
-        if head is None:
-            head = div.find('head')
-        if head is not None and head.text:
-            title = head.text.strip().lower()
-            # Match "methods", "materials and methods", "methods and materials", etc.
-            if ('method' in title and
-                not title.startswith('result') and
-                not title.startswith('discussion')):
-                methods_start = i
-                break
 
-    # Fallback: GROBID sometimes flattens the section hierarchy and drops the
-    # top-level "Methods" head, leaving only its subheadings (e.g. "Study
-    # participants", "Genotyping", "GWAS"). If the first pass found nothing,
-    # walk the divs again looking for heads that contain one of the
-    # methods-subsection keywords.
-    if methods_start is None:
-        for i, div in enumerate(divs):
-            head = div.find('tei:head', TEI_NS)
-            if head is None:
-                head = div.find('head')
-            if head is None or not head.text:
-                continue
-            title = head.text.strip().lower()
-            # Strip leading numeric prefixes like "2.1 " or "3. ".
-            title_clean = re.sub(r'^(\d+\.)*\d+\s+', '', title)
-            if any(title_clean.startswith(p) for p in FALLBACK_EXCLUDED_PREFIXES):
-                continue
-            if any(kw in title_clean for kw in METHODS_SUBSECTION_KEYWORDS):
-                methods_start = i
-                break
+def extract_tei_methods(root, index=None, paragraphs=None):
+    """
+    Extract methods section from a TEI (GROBID) XML document.
+
+    TEI structure: <body> contains flat sibling <div> elements.
+    The Methods <div> typically has just a <head> with no paragraphs;
+    the actual content is in subsequent sibling <div> elements until
+    the next major section (Results, Discussion, etc.).
+
+    The divs' heads and paragraphs are indexed once (tei_body_index; pass
+    `index` to reuse one) and both the methods start and its end are
+    resolved from that index.  If `paragraphs` is a list, (section title,
+    paragraph text) is appended to it for each paragraph of the section.
 
+    Returns extracted text string, or None if no methods section found.
+    """
+    if index is None:
+        index = tei_body_index(root)
+    if index is None:
+        return None
+    methods_start = _tei_methods_start(index)
     if methods_start is None:
         return None
 
     # Collect this div and all subsequent sibling divs until a non-methods section
-    text_parts = []
-    for div in divs[methods_start:]:
-        head = div.find('tei:head', TEI_NS)
-        if head is None:
-            head = div.find('head')
+    return _tei_section_text(index, methods_start, _tei_methods_stop, paragraphs)
 
-        if head is not None and head.text:
-            title = head.text.strip().lower()
-            # Stop if we've hit a non-methods section (but not on the first div)
-            if div != divs[methods_start] and title in NON_METHODS_SECTIONS:
-                break
-            # Also stop on common non-methods patterns
-            if div != divs[methods_start]:
-                for stop_word in NON_METHODS_SECTIONS:
-                    if title == stop_word or title.startswith(stop_word + ' '):
-                        break
-                else:
-                    # No stop word matched — add section title
-                    # Remove leading numbering from title
-                    clean_title = re.sub(r'^(\d+\.)*\d+\s+', '', head.text.strip())
-                    if clean_title:
-                        text_parts.append(clean_title + '. ')
-                    # Fall through to extract paragraphs
-                    for p in div.findall('tei:p', TEI_NS) or div.findall('p'):
-                        para_text = ''.join(p.itertext()).strip()
-                        if para_text:
-                            text_parts.append(clean_extracted_text(para_text) + ' ')
-                    continue
-                # A stop word matched — break out of outer loop
+
+def _tei_methods_stop(title, clean_title):
+    return _TEI_STOP_RE.match(title)
+
+
+def _tei_section_text(index, start, is_stop, records=None):
+    """
+    Text of the div at `start` in a TEI div index and of the divs after it,
+    up to the first head for which is_stop(title, clean_title) is true.
+    If `records` is a list, (section title, paragraph text) is appended to
+    it for each paragraph.
+    """
+    text_parts = []
+    section = None
+    for i, (div, heading, title, clean_title, paragraphs) in enumerate(index[start:]):
+        if heading is not None:
+            # Stop if we've hit the next section (but not on the first div)
+            if i > 0 and is_stop(title, clean_title):
                 break
-            else:
-                # First div (the Methods header itself)
-                clean_title = re.sub(r'^(\d+\.)*\d+\s+', '', head.text.strip())
-                if clean_title:
-                    text_parts.append(clean_title + '. ')
+            # Add the section title, without leading numbering
+            if clean_title:
+                text_parts.append(clean_title + '. ')
+                section = clean_title
 
         # Extract paragraphs from this div
-        for p in div.findall('tei:p', TEI_NS) or div.findall('p'):
+        for p in paragraphs:
             para_text = ''.join(p.itertext()).strip()
             if para_text:
-                text_parts.append(clean_extracted_text(para_text) + ' ')
+                para_text = clean_extracted_text(para_text)
+                text_parts.append(para_text + ' ')
+                if records is not None and para_text:
+                    records.append((section, para_text))
 
     result = ' '.join(text_parts).strip()
     return result if result else None
@@ -331,7 +502,22 @@ def extract_tei_methods(root):
 # BioC XML extraction
 # ---------------------------------------------------------------------------
 
-def extract_bioc_methods(root):
+def _bioc_passage_fields(passage):
+    """
+    Return (section_title_1, text) for a BioC <passage>; either may be None.
+    """
+    section_title = None
+    for infon in passage.findall('infon'):
+        if infon.get('key') == 'section_title_1':
+            section_title = infon.text
+            break
+
+    text_elem = passage.find('text')
+    text = text_elem.text if text_elem is not None else None
+    return section_title, text
+
+
+def extract_bioc_methods(root, passages=None, paragraphs=None):
     """
     Extract methods section from a BioC XML document.
 
@@ -345,18 +531,34 @@ def extract_bioc_methods(root):
     we scan the passage text for inline section headers like
     "Materials and Methods" and collect text until the next major section.
 
+    All passages of the collection are treated as one article; see
+    iter_bioc_methods for per-<document> extraction of large collections.
+    `passages` are the (section_title_1, text) pairs of the collection
+    (bioc_passages), if already built.  If `paragraphs` is a list,
+    (section title, passage text) is appended to it for each passage used.
+
     Returns extracted text string, or None if no methods section found.
     """
+    if passages is None:
+        passages = bioc_passages(root)
+    return _bioc_methods_from_passages(passages, paragraphs)
+
+
+def bioc_passages(root):
+    """(section_title_1, text) of every <passage> (_bioc_passage_fields)."""
+    return [_bioc_passage_fields(passage) for passage in root.iter('passage')]
+
+
+def _bioc_methods_from_passages(passages, records=None):
+    """
+    Methods text from a list of (section_title_1, text) passage tuples;
+    (section title, text) of the passages used is appended to `records`,
+    if it is a list.
+    """
     # --- Primary strategy: use section_title_1 infon labels ---------------
     text_parts = []
 
-    for passage in root.iter('passage'):
-        section_title = None
-        for infon in passage.findall('infon'):
-            if infon.get('key') == 'section_title_1':
-                section_title = infon.text
-                break
-
+    for section_title, text in passages:
         if section_title is None:
             continue
 
@@ -367,19 +569,64 @@ def extract_bioc_methods(root):
             not title_lower.startswith('result') and
             not title_lower.startswith('discussion')):
 
-            text_elem = passage.find('text')
-            if text_elem is not None and text_elem.text:
-                para_text = text_elem.text.strip()
+            if text:
+                para_text = text.strip()
                 if para_text:
-                    text_parts.append(clean_extracted_text(para_text) + ' ')
+                    para_text = clean_extracted_text(para_text)
+                    text_parts.append(para_text + ' ')
+                    if records is not None and para_text:
+                        records.append((section_title.strip(), para_text))
 
     if text_parts:
         result = ' '.join(text_parts).strip()
         return result if result else None
 
     # --- Fallback: scan passage text for inline section headers -----------
-    return _bioc_fallback_inline_headers(root)
+    return _bioc_fallback_inline_headers(passages, records)
+
 
+def iter_bioc_methods(xml_file):
+    """
+    Stream a BioC collection and yield one methods result per <document>.
+
+    Uses iterparse so only the passages of the current document are held
+    in memory: each <passage> is reduced to its (section title, text) pair
+    and cleared, and each finished <document> is dropped from the tree.
+    Suitable for Auto-CORPus output and converted supplements holding many
+    documents or very large tables.
+
+    Yields dictionaries with keys 'id' (the document's <id>, or None),
+    'text', 'is_main' and 'status', as in extract_methods_section.
+    """
+    context = ET.iterparse(xml_file, events=('start', 'end'))
+    _, root = next(context)
+
+    in_passage = 0
+    doc_id = None
+    passages = []
+
+    for event, elem in context:
+        tag = elem.tag
+        if event == 'start':
+            if tag == 'passage':
+                in_passage += 1
+            elif tag == 'document':
+                doc_id = None
+                passages = []
+            continue
+
+        if tag == 'passage':
+            in_passage -= 1
+            passages.append(_bioc_passage_fields(elem))
+            elem.clear()
+        elif tag == 'id' and not in_passage and doc_id is None:
+            doc_id = (elem.text or '').strip() or None
+        elif tag == 'document':
+            result = _result(_bioc_methods_from_passages(passages))
+            result['id'] = doc_id
+            yield result
+            passages = []
+            root.clear()
 
 # Regex for detecting an inline methods header at the start of passage text
 _METHODS_HEADER_RE = re.compile(
@@ -408,285 +655,245 @@ _NON_METHODS_HEADER_RE = re.compile(
 )
 
 
-def _bioc_fallback_inline_headers(root):
+def _bioc_fallback_inline_headers(passages, records=None):
     """
     Fallback for BioC files with broken/missing section labels.
 
     Scans all passage text for an inline "Methods" header, then collects
     that passage and all subsequent passages until a non-methods header
-    (Results, Discussion, etc.) is encountered.
+    (Results, Discussion, etc.) is encountered.  `passages` is a list of
+    (section_title_1, text) tuples; `records` as in
+    _bioc_methods_from_passages, with the inline header as section title.
     """
-    passages = list(root.iter('passage'))
     methods_start = None
 
     # Find the first passage whose text begins with a methods header
-    for i, passage in enumerate(passages):
-        text_elem = passage.find('text')
-        if text_elem is None or not text_elem.text:
+    for i, (_, text) in enumerate(passages):
+        if not text:
             continue
-        t = text_elem.text.strip()
-        if _METHODS_HEADER_RE.match(t):
+        t = text.strip()
+        header = _METHODS_HEADER_RE.match(t)
+        if header:
             methods_start = i
+            section = header.group(1)
             break
 
     if methods_start is None:
         return None
 
     text_parts = []
-    for passage in passages[methods_start:]:
-        text_elem = passage.find('text')
-        if text_elem is None or not text_elem.text:
+    for i in range(methods_start, len(passages)):
+        text = passages[i][1]
+        if not text:
             continue
-        t = text_elem.text.strip()
+        t = text.strip()
 
         # Stop if we hit a non-methods section header (but not on the first passage)
-        if passage != passages[methods_start] and _NON_METHODS_HEADER_RE.match(t):
+        if i != methods_start and _NON_METHODS_HEADER_RE.match(t):
             break
 
         # Strip the inline header from the first passage
-        if passage == passages[methods_start]:
+        if i == methods_start:
             t = _METHODS_HEADER_RE.sub('', t, count=1).strip()
 
         if t:
-            text_parts.append(clean_extracted_text(t) + ' ')
+            t = clean_extracted_text(t)
+            text_parts.append(t + ' ')
+            if records is not None and t:
+                records.append((section, t))
 
     result = ' '.join(text_parts).strip()
     return result if result else None
 
 
+# Elements dropped from the extracted text: LaTeX source (MathML is kept),
+# graphics, and tables and figures (data, not narrative text)
+_SKIPPED_TEXT_TAGS = {'graphic', 'inline-graphic', 'table-wrap', 'table', 'fig', 'disp-formula'}
+
+# Tag -> how extract_text_from_element treats it (see _text_kind)
+_TEXT_KINDS = {}
+
+
+def _text_kind(tag):
+    """
+    'sec', 'p', 'skip' (never has text), 'xref' (skipped if it is a
+    bibliography citation, otherwise like 'other') or 'other'.
+    """
+    kind = _TEXT_KINDS.get(tag)
+    if kind is None:
+        local = _local_name(tag)
+        if local == 'sec' or local == 'p':
+            kind = local
+        elif tag.endswith('xref'):
+            kind = 'xref'
+        elif tag.endswith('tex-math') or local in _SKIPPED_TEXT_TAGS:
+            kind = 'skip'
+        else:
+            kind = 'other'
+        _TEXT_KINDS[tag] = kind
+    return kind
+
+
 def extract_text_from_element(element, parent_tag=None):
     """
-    Recursively extract all text content from an XML element,
-    including nested elements, while preserving structure with line breaks.
+    Extract all text content from an XML element, including nested
+    elements, while preserving structure with line breaks.
+
+      - <sec>: "Title. " (leading numbering removed), then the text of every
+        child except <label>/<title>; the section's own text is ignored
+      - <p>: the paragraph's text, without bibliography citations (any child
+        with ref-type="bibr"), cleaned with clean_extracted_text
+      - bibliography <xref>s, tex-math, graphics, tables and figures: nothing
+      - anything else: its text and its children's text
+    Each element's parts (child texts and tails, stripped) are joined with
+    spaces and normalised with clean_element_text.
+
+    The tree is walked with an explicit stack, so deeply nested sections,
+    boxed-text or lists cannot hit the recursion limit.  Elements without
+    children, the bulk of inline markup, are resolved without a stack frame.
+    `parent_tag` is unused and kept for compatibility.
     """
-    text_parts = []
-    current_tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-    
-    # Check if this is a section with a title
-    if current_tag == 'sec':
-        # Look for label and title elements
-        label_elem = None
-        title_elem = None
-        
-        for child in element:
-            child_tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-            if child_tag == 'label':
-                label_elem = child
-            elif child_tag == 'title':
-                title_elem = child
-        
-        # Add section header with period at the end
-        if label_elem is not None or title_elem is not None:
-            header_parts = []
-            # Skip label (section numbers) for cleaner sentence tokenization
-            # if label_elem is not None:
-            #     # Recursively get all text from label
-            #     label_text = extract_text_from_element(label_elem, current_tag)
-            #     if label_text:
-            #         header_parts.append(label_text.strip())
-            if title_elem is not None:
-                # Recursively get all text from title (including nested elements)
-                title_text = extract_text_from_element(title_elem, current_tag)
-                if title_text:
-                    # Remove leading section numbers from title (e.g., "2.1 GWAS" → "GWAS")
-                    import re
-                    title_text = re.sub(r'^(\d+\.)*\d+\s+', '', title_text.strip())
-                    if title_text:  # Only add if there's text left after removing numbers
-                        header_parts.append(title_text)
-            
-            if header_parts:
-                text_parts.append(' '.join(header_parts) + '. ')
-        
-        # Process other children (except label and title which we already handled)
-        for child in element:
-            child_tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-            if child_tag not in ['label', 'title']:
-                child_text = extract_text_from_element(child, current_tag)
-                if child_text:
-                    text_parts.append(child_text)
-            
-            # Get the tail text (text after the child element)
-            if child.tail:
-                tail_text = child.tail.strip()
-                if tail_text:
-                    text_parts.append(tail_text)
-    
-    # Check if this is a paragraph - add spacing between paragraphs
-    elif current_tag == 'p':
-        # Get all text from the paragraph
-        para_text_parts = []
-        
-        if element.text:
-            para_text_parts.append(element.text.strip())
-        
-        for child in element:
-            # Skip citation references (xref with ref-type="bibr")
-            # <ref type="bibr" target="#b1">2</ref> 
-            child_tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-            
-            #print(child.get('target'))
-            if child.get('ref-type') == 'bibr':
-            #if child_tag == 'xref' and child.get('ref-type') == 'bibr':  
-                # Skip this citation, but keep any tail text
-                if child.tail:
-                    tail_text = child.tail.strip()
-                    if tail_text:
-                        para_text_parts.append(tail_text)
-                continue
-          # if child.get('target') and child.get('target')="#b1" and hild.get('ref-type') == 'bibr':
-          #       # Skip this citation, but keep any tail text
-          #       if child.tail:
-          #           tail_text = child.tail.strip()
-          #           if tail_text:
-          #               para_text_parts.append(tail_text)
-          #       continue
-            
-            child_text = extract_text_from_element(child, current_tag)
-            if child_text:
-                para_text_parts.append(child_text)
-            
-            if child.tail:
-                tail_text = child.tail.strip()
-                if tail_text:
-                    para_text_parts.append(tail_text)
-        
-        # Join paragraph parts and normalize internal whitespace
-        import re
-        import unicodedata
-        
-        para_text = ' '.join(filter(None, para_text_parts))
-        
-        # Normalize unicode
-        para_text = unicodedata.normalize("NFKC", para_text)
-        import html
-        para_text = html.unescape(para_text)
-        
-        para_text = para_text.replace('\xa0', ' ')  # Replace non-breaking spaces with regular spaces
-        para_text = re.sub(r'\s+', ' ', para_text).strip()
-        
-        # Remove section numbering at start of sentences (e.g., "2.1", "2.3.1", "2.5.6.7")
-        para_text = re.sub(r'^(\d+\.)+\d*\s*', '', para_text)  # at start of paragraph
-        para_text = re.sub(r'\.\s+(\d+\.)+\d*\s+', '. ', para_text)  # after period
-        
-        # removing et al. citations 
-        #para_text = re.sub(r'\(\s*(?:[^()]*?et al\.[^()]*)\)'), '', para_text)
-        
-        # Clean up punctuation artifacts from removed citations
-        # Remove standalone punctuation like ", ," or ". ,"
-        para_text = re.sub(r'([,;.])\s*([,;.])', r'\2', para_text)  # collapse repeated punctuation
-        para_text = re.sub(r'\s+([,;.])', r'\1', para_text)  # remove space before punctuation
-        
-        # Remove incomplete author citations like (Author et al, ) or (Author et al,)
-        # Also handles multiple citations: (Author et al,; Author2 et al, )
-        para_text = re.sub(r'\([A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)', '', para_text)
-        
-        # Remove empty brackets left by citations: [ ] or [, ] or [ , ] or [, – ]
-        # This catches brackets with any combination of spaces, commas, semicolons, dashes
-        para_text = re.sub(r'\[\s*[,;–—\-\s]*\s*\]', '', para_text)  # remove empty square brackets
-        para_text = re.sub(r'\(\s*[,;–—\-\s]*\s*\)', '', para_text)  # remove empty round brackets
-        para_text = re.sub(r'\s+', ' ', para_text).strip()  # normalize whitespace again
-        
-        # Clean up trailing punctuation artifacts like ",," or ", –," or "–," at end of sentences
-        para_text = re.sub(r'[,;]\s*[–—\-]\s*[,;.]', '.', para_text)  # ", –." or "; –," → "."
-        para_text = re.sub(r'[,;]\s*[–—\-]\s*$', '.', para_text)  # ", –" at end → "."
-        para_text = re.sub(r'[–—\-]\s*[,;.]', '.', para_text)  # "–." or "–," → "."
-        
-        # Remove extra spaces inside brackets: "( text )" → "(text)"
-        para_text = re.sub(r'\(\s+', '(', para_text)  # "( " → "("
-        para_text = re.sub(r'\s+\)', ')', para_text)  # " )" → ")"
-        para_text = re.sub(r'\[\s+', '[', para_text)  # "[ " → "["
-        para_text = re.sub(r'\s+\]', ']', para_text)  # " ]" → "]"
-        
-        # Final cleanup: normalize any remaining whitespace and trim
-        para_text = re.sub(r'\s+([,;.:!?])', r'\1', para_text)  # Remove space before punctuation
-        para_text = re.sub(r'\s+', ' ', para_text).strip()
-        
-        # Replace double (or more) periods with single period
-        para_text = re.sub(r'\.{2,}', '.', para_text)  # ".." or "..." → "."
-        # Replace double (or more) commas with single comma
-        para_text = re.sub(r',{2,}', ',', para_text)  # ",," or ",,," → ","
-        
-        
-        # Add paragraph with space after it
-        if para_text:
-            text_parts.append(para_text + ' ')
-    
-    else:
-        # For non-section, non-paragraph elements, process normally
-        # Skip citation references entirely
-        if element.tag.endswith('xref') and element.get('ref-type') == 'bibr':
-            return ''  # Return empty string for citations
-        
-        # Skip LaTeX source in tex-math tags (but keep MathML)
-        if element.tag.endswith('tex-math'):
-            return ''  # Return empty string for LaTeX source
-        
-        # Skip graphics/images (we already have text from MathML)
-        tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-        if tag in ['graphic', 'inline-graphic']:
-            return ''  # Return empty string for images
-
-        # Skip tables and figures entirely (data tables, not narrative text)
-        if tag in ['table-wrap', 'table', 'fig', 'disp-formula']:
-            return ''  # Return empty string for tables and figures
-        
-        # Get the element's own text
-        if element.text:
-            text_parts.append(element.text.strip())
-        
-        # Process all child elements recursively
-        for child in element:
-            child_text = extract_text_from_element(child, current_tag)
-            if child_text:
-                text_parts.append(child_text)
-            
-            # Get the tail text (text after the child element)
+    kind = _text_kind(element.tag)
+    if kind == 'skip' or (kind == 'xref' and element.get('ref-type') == 'bibr'):
+        return ''
+
+    # A frame is [element, kind, parts, children, next child index]; the
+    # child being processed is children[index - 1].  A <sec> frame whose
+    # title is pending has a title frame above it, marked by kind 'title'.
+    stack = [_open_text_frame(element, kind)]
+    _push_sec_title(stack)
+    while True:
+        frame = stack[-1]
+        elem, kind, parts, children, i = frame
+        if i < len(children):
+            child = children[i]
+            frame[4] = i + 1
+
+            if kind == 'sec':
+                skip_child = _local_name(child.tag) in ('label', 'title')
+            elif kind == 'p':
+                skip_child = child.get('ref-type') == 'bibr'
+            else:
+                skip_child = False
+
+            if not skip_child:
+                child_kind = _text_kind(child.tag)
+                if child_kind == 'skip' or (child_kind == 'xref' and child.get('ref-type') == 'bibr'):
+                    pass
+                elif not len(child) and child_kind not in ('sec', 'p'):
+                    # Leaf inline element: its text, normalised
+                    if child.text:
+                        child_text = clean_element_text(child.text.strip())
+                        if child_text:
+                            parts.append(child_text)
+                else:
+                    stack.append(_open_text_frame(child, child_kind))
+                    _push_sec_title(stack)
+                    continue
+
             if child.tail:
                 tail_text = child.tail.strip()
                 if tail_text:
-                    text_parts.append(tail_text)
-    
-    # Join all parts with spaces
-    #result = ' '.join(filter(None, text_parts))
-    result = ' '.join(text_parts)
-    
-    # Final global normalization
-    import re
-    import unicodedata
-    
-    result = unicodedata.normalize("NFKC", result)
-    result = result.replace('\xa0', ' ')
-    result = re.sub(r'\s+', ' ', result).strip()
-    
-    # remove et al. citations globally (in case any remain)
-    result = re.sub(r'\(\s*(?:[^()]*?et al[.,;]\s*[^()]*)\)', '', result)
-    result = re.sub(r'\(\s*(?:[^()]*?n.d.\s*[^()]*)\)', '', result)
-    result = re.sub(r'\(\s*[A-Z][A-Za-z-]+(?:\s*&\s*[A-Z][A-Za-z-]+)+\s*,?\s*\)','', result)
-    result = re.sub(r'\(\s*(?:[A-Z][A-Za-z-]+(?:\s*&\s*[A-Z][A-Za-z-]+)?,\s*(?:n\.d\.|\d{4})\s*;?\s*)+\)', '', result)
-    #result = re.sub(r'\(\s*(?:[A-Z][A-Za-z-]+(?:\s*&\s*[A-Z][A-Za-z-]+)?(?:,\s*(?:n\.d\.|\d{4})?)?\s*;?\s*)+\)', '', result)
-    #result = re.sub(r'\(\s*(?:[^()]*?et al\.[^()]*)\)', '', result)
-    
-    # Fix bracket spacing LAST
-    result = re.sub(r'\(\s+', '(', result)
-    result = re.sub(r'\s+\)', ')', result)
-    
-    # Replace double (or more) periods with single period
-    result = re.sub(r'\.{2,}', '.', result)  # ".." or "..." → "."
-    # Replace double (or more) commas with single comma
-    result = re.sub(r',{2,}', ',', result)  # ",," or ",,," → ","
-    
-    # Remove empty brackets left by citations: [ ] or (, ) or [ , ] or ( , )
-    result = re.sub(r'\[\s*[,;–—\-\s]*\s*\]', '', result)  # remove empty square brackets
-    result = re.sub(r'\(\s*[,;–—\-\s]*\s*\)', '', result)  # remove empty round brackets
-    result = re.sub(r'\s+', ' ', result).strip()  # normalize whitespace again
-    
-    # remove spaces before punctuation
-    result = re.sub(r'\s+([,;.:!?])', r'\1', result)  # remove space before punctuation
+                    parts.append(tail_text)
+            continue
 
-    return result
+        # All children done: finish this element
+        stack.pop()
+        if kind == 'p':
+            para_text = clean_extracted_text(' '.join(filter(None, parts)))
+            parts = [para_text + ' '] if para_text else []
+        text = clean_element_text(' '.join(parts))
+
+        if not stack:
+            return text
+        parent = stack[-1]
+        if kind == 'title':
+            # Section header with period at the end; remove leading
+            # section numbers from the title (e.g., "2.1 GWAS" -> "GWAS")
+            if text:
+                title_text = strip_section_number(text.strip())
+                if title_text:
+                    parent[2].append(title_text + '. ')
+            continue
+        if text:
+            parent[2].append(text)
+        child = parent[3][parent[4] - 1]
+        if child.tail:
+            tail_text = child.tail.strip()
+            if tail_text:
+                parent[2].append(tail_text)
+
+
+def _open_text_frame(element, kind):
+    """Stack frame for extract_text_from_element."""
+    parts = []
+    if kind != 'sec' and element.text:
+        parts.append(element.text.strip())
+    return [element, kind, parts, list(element), 0]
+
+
+def _push_sec_title(stack):
+    """
+    If the frame on top of the stack is a <sec> with a <title> child (the
+    last one, if several), push a frame for the title so the header is
+    added before the section's other children.
+    """
+    frame = stack[-1]
+    if frame[1] != 'sec':
+        return
+    title_elem = None
+    for child in frame[3]:
+        if _local_name(child.tag) == 'title':
+            title_elem = child
+    if title_elem is not None:
+        title_frame = _open_text_frame(title_elem, 'other')
+        title_frame[1] = 'title'
+        stack.append(title_frame)
+
+
+def _sec_title(sec):
+    """A <sec>'s (last) <title> text without numbering, or None."""
+    title_elem = None
+    for child in sec:
+        if _local_name(child.tag) == 'title':
+            title_elem = child
+    if title_elem is None:
+        return None
+    return strip_section_number(clean_element_text(' '.join(title_elem.itertext()).strip())) or None
+
+
+def element_paragraphs(element, paragraphs):
+    """
+    Append (section title, paragraph text) to the list `paragraphs` for
+    every paragraph of a JATS element, in document order: each <p>, as
+    serialized by extract_text_from_element, and any other block holding
+    no <p> or <sec> (e.g. a list of plain items).  The section title is
+    that of the innermost enclosing titled <sec>, the element itself
+    included (None outside any).  Tables, figures, formulas and section
+    labels are skipped as in extract_text_from_element.
+    """
+    stack = [(element, None)]
+    while stack:
+        elem, section = stack.pop()
+        kind = _text_kind(elem.tag)
+        if kind == 'skip' or (kind == 'xref' and elem.get('ref-type') == 'bibr'):
+            continue
+        if kind == 'sec':
+            section = _sec_title(elem) or section
+            children = [child for child in elem
+                        if _local_name(child.tag) not in ('label', 'title')]
+        elif kind == 'p' or not any(_text_kind(d.tag) in ('p', 'sec') for d in elem.iter()
+                                    if d is not elem):
+            text = extract_text_from_element(elem).strip()
+            if text:
+                paragraphs.append((section, text))
+            continue
+        else:
+            children = list(elem)
+        stack.extend((child, section) for child in reversed(children))
 
 
-def find_methods_section(root):
+def find_methods_section(root, facts=None):
     """
     Find the methods section in a JATS XML document.
     Returns a tuple of (methods_element, is_main_fallback) or (None, False) if not found.
@@ -697,23 +904,162 @@ def find_methods_section(root):
     3. title text containing "methods" (case-insensitive)
     
     Skips methods sections inside abstracts (these are summaries, not full methods).
+
+    `facts` is the document's collect_jats_facts result, if already built.
     """
-    all_sections = find_all_methods_sections(root)
+    if facts is None:
+        facts = collect_jats_facts(root)
+    all_sections = jats_methods_sections(root, facts)
     
-    if _is_main_journal(root) and not all_sections:
-        body = root.find('.//{*}body')
+    if not all_sections and _is_main_journal(root, facts):
+        body = facts['body']
         if body is not None:
             return (body, True)
     
-    if _is_letter_to_editor(root) and not all_sections:
-        body = root.find('.//{*}body')
+    if not all_sections and _is_letter_to_editor(root, facts):
+        body = facts['body']
         if body is not None:
             return (body, True)
           
     return (all_sections[0], False) if len(all_sections) > 0 else (None, False)
 
 
-def find_all_methods_sections(root):
+def _jats_tag_kind(tag):
+    """
+    What collect_jats_facts needs to know about a tag: 'sec' and
+    'abstract' (by suffix, as the locator has always matched them),
+    'journal-title', 'body', 'p', 'supplementary-material', 'media' (by
+    local name) or None.
+    """
+    if tag.endswith('sec'):
+        return 'sec'
+    if tag.endswith('abstract'):
+        return 'abstract'
+    local = _local_name(tag)
+    if local in ('journal-title', 'body', 'p', 'supplementary-material', 'media'):
+        return local
+    return None
+
+
+def collect_jats_facts(root):
+    """
+    Single walk over a JATS tree collecting everything the extraction
+    decisions need (locator, main-journal and letter checks, supplementary
+    methods note, body fallback), so no decision searches the tree again.
+
+    Returns a dictionary with:
+      - 'index':         the locator index (see _index_jats_tree)
+      - 'journal_title': first <journal-title> element, or None
+      - 'body':          first <body> element, or None
+      - 'paragraphs':    every <p> element below the root, in document order
+      - 'abstracts':     every <abstract> element, in document order
+      - 'supplementary': (element, first <media> inside it or None) for every
+                         <supplementary-material> and
+                         <sec sec-type="supplementary-material">, in
+                         document order (the root included)
+    The methods-section candidates are added under 'methods_sections' the
+    first time they are needed (jats_methods_sections).
+
+    The walk itself is root.iter(), with each distinct tag classified once;
+    sec depth, abstract membership and which supplementary block a <media>
+    belongs to are then read off the parent chains of those few elements.
+    """
+    parent = {}
+    secs = []
+    firsts = {}
+    paragraphs = []
+    supplementary = []
+    media = []
+    abstracts = []
+    kinds = {}
+
+    for elem in root.iter():
+        for child in elem:
+            parent[child] = elem
+        tag = elem.tag
+        kind = kinds.get(tag, False)
+        if kind is False:
+            kind = kinds[tag] = _jats_tag_kind(tag)
+        if kind is None:
+            continue
+        if kind == 'abstract':
+            if _local_name(tag) == 'abstract':
+                abstracts.append(elem)
+            continue
+        if kind == 'sec':
+            secs.append(elem)
+            if elem.get('sec-type') == 'supplementary-material' and _local_name(tag) == 'sec':
+                supplementary.append(elem)
+        elif kind == 'p':
+            if elem is not root:
+                paragraphs.append(elem)
+        elif kind == 'media':
+            media.append(elem)
+        elif kind == 'supplementary-material':
+            supplementary.append(elem)
+        elif elem is not root and kind not in firsts:
+            firsts[kind] = elem
+
+    sec_depth = {}
+    in_abstract = set()
+    for sec in secs:
+        depth = 0
+        ancestor = parent.get(sec)
+        while ancestor is not None:
+            kind = kinds[ancestor.tag]
+            if kind == 'sec':
+                depth += 1
+            elif kind == 'abstract':
+                in_abstract.add(sec)
+            ancestor = parent.get(ancestor)
+        sec_depth[sec] = depth
+
+    first_media = {}
+    if supplementary and media:
+        blocks = set(supplementary)
+        for elem in media:
+            ancestor = parent.get(elem)
+            while ancestor is not None:
+                if ancestor in blocks:
+                    first_media.setdefault(ancestor, elem)
+                ancestor = parent.get(ancestor)
+
+    return {
+        'index': {
+            'parent': parent,
+            'secs': secs,
+            'sec_depth': sec_depth,
+            'in_abstract': in_abstract,
+        },
+        'journal_title': firsts.get('journal-title'),
+        'body': firsts.get('body'),
+        'paragraphs': paragraphs,
+        'abstracts': abstracts,
+        'supplementary': [(block, first_media.get(block)) for block in supplementary],
+    }
+
+
+def jats_methods_sections(root, facts):
+    """find_all_methods_sections for a document, computed once per `facts`."""
+    if 'methods_sections' not in facts:
+        facts['methods_sections'] = find_all_methods_sections(root, facts['index'])
+    return facts['methods_sections']
+
+
+def _index_jats_tree(root):
+    """
+    Single pre-pass over a JATS tree for the methods-section locator.
+
+    Returns a dictionary with:
+      - 'parent':      element -> parent element
+      - 'secs':        every <sec> element, in document order
+      - 'sec_depth':   sec -> number of <sec> ancestors
+      - 'in_abstract': set of secs that sit inside an <abstract>
+    """
+    return collect_jats_facts(root)['index']
+
+
+def find_all_methods_sections(root, index=None):
     """
     Find ALL top-level methods sections in a JATS XML document.
     Returns a list of methods section elements (may be empty).
@@ -721,8 +1067,19 @@ def find_all_methods_sections(root):
     This is useful for files that have both a stub and a full methods section.
     Only returns top-level sections, not their subsections.
     Filters out author/contributor lists that are incorrectly tagged as methods.
+
+    All ancestry questions (in abstract? nested in a found section? how
+    deep?) are answered from a single pre-pass (_index_jats_tree), so the
+    search is linear in document size.  Pass a pre-built index to reuse it.
     """
+    if index is None:
+        index = _index_jats_tree(root)
+    parent = index['parent']
+    in_abstract = index['in_abstract']
+    sec_depth = index['sec_depth']
+
     candidates = []
+    found = set()
     
     # Author/team section keywords to skip (these are not real methods)
     author_keywords = [
@@ -730,14 +1087,19 @@ def find_all_methods_sections(root):
         'study group', 'consortium', 'working group', 'steering committee',
         'acknowledgment', 'funding', 'competing interest', 'conflict of interest'
     ]
+
+    def add_candidate(sec):
+        candidates.append(sec)
+        found.add(sec)
     
     # Helper function to check if a section is inside another section in candidates
     def is_subsection_of_found(sec):
-        """Check if sec is a descendant of any section already in candidates"""
-        for found_sec in candidates:
-            for descendant in found_sec.iter():
-                if descendant == sec:
-                    return True
+        """Check if sec is (or is a descendant of) a section already in candidates"""
+        elem = sec
+        while elem is not None:
+            if elem in found:
+                return True
+            elem = parent.get(elem)
         return False
     
     # Helper function to check if section is an author/contributor list
@@ -754,90 +1116,48 @@ def find_all_methods_sections(root):
         return False
     
     # First try: Look for sections with sec-type="materials|methods" or "materials and methods"
-    for sec in root.iter():
-        if sec.tag.endswith('sec'):
-            sec_type = sec.get('sec-type')
-            if sec_type and ('material' in sec_type.lower() and 'method' in sec_type.lower()):
-                # Check if in abstract
-                for parent in root.iter():
-                    if parent.tag.endswith('abstract'):
-                        for child in parent.iter():
-                            if child == sec:
-                                break
-                        else:
-                            continue
-                        break
-                else:
-                    # Not in abstract, check if it's an author section
-                    if not is_subsection_of_found(sec) and not is_author_section(sec):
-                        candidates.append(sec)
+    for sec in index['secs']:
+        sec_type = sec.get('sec-type')
+        if sec_type and ('material' in sec_type.lower() and 'method' in sec_type.lower()):
+            # Skip sections in the abstract and author sections
+            if sec in in_abstract:
+                continue
+            if not is_subsection_of_found(sec) and not is_author_section(sec):
+                add_candidate(sec)
     
     # Second try: Look for sections with sec-type="methods" (not in abstract)
     methods_candidates = []
-    for sec in root.iter():
-        if sec.tag.endswith('sec'):
-            sec_type = sec.get('sec-type')
-            if sec_type and sec_type.lower() == 'methods':
-                # Check if in abstract
-                is_in_abstract = False
-                for parent in root.iter():
-                    if parent.tag.endswith('abstract'):
-                        for child in parent.iter():
-                            if child == sec:
-                                is_in_abstract = True
-                                break
-                        if is_in_abstract:
-                            break
-                
-                if not is_in_abstract:
-                    # Count depth (how many sec ancestors)
-                    depth = 0
-                    for parent in root.iter():
-                        if parent.tag.endswith('sec'):
-                            for child in parent.iter():
-                                if child == sec and child != parent:
-                                    depth += 1
-                                    break
-                    methods_candidates.append((sec, depth))
+    for sec in index['secs']:
+        sec_type = sec.get('sec-type')
+        if sec_type and sec_type.lower() == 'methods' and sec not in in_abstract:
+            methods_candidates.append((sec, sec_depth[sec]))
     
-    # Sort by depth and add to candidates
+    # Sort by depth (how many sec ancestors) and add to candidates
     if methods_candidates:
         methods_candidates.sort(key=lambda x: x[1])
         for sec, depth in methods_candidates:
-            if sec not in candidates and not is_subsection_of_found(sec) and not is_author_section(sec):
-                candidates.append(sec)
+            if not is_subsection_of_found(sec) and not is_author_section(sec):
+                add_candidate(sec)
     
     # Third try: Look for sections with title containing "methods" (not in abstract)
     # Common patterns: "Methods", "Materials and Methods", "Methods and Materials"
-    for sec in root.iter():
-        if sec.tag.endswith('sec'):
-            # Check if inside abstract first
-            is_in_abstract = False
-            for parent in root.iter():
-                if parent.tag.endswith('abstract'):
-                    for child in parent.iter():
-                        if child == sec:
-                            is_in_abstract = True
-                            break
-                    if is_in_abstract:
-                        break
-            
-            if is_in_abstract or sec in candidates or is_subsection_of_found(sec):
-                continue
-            
-            # Look for a title child element
-            for child in sec:
-                if child.tag.endswith('title'):
-                    title_text = ''.join(child.itertext()).strip().lower()
-                    # Check if title contains methods-related keywords
-                    if ('method' in title_text and 
-                        not title_text.startswith('result') and
-                        not title_text.startswith('discussion') and
-                        # Avoid subsections like "Statistical methods"
-                        len(title_text.split()) <= 6):
-                        if not is_author_section(sec):
-                            candidates.append(sec)
-                    break  # Only check first title
+    for sec in index['secs']:
+        if sec in in_abstract or is_subsection_of_found(sec):
+            continue
+        
+        # Look for a title child element
+        for child in sec:
+            if child.tag.endswith('title'):
+                title_text = ''.join(child.itertext()).strip().lower()
+                # Check if title contains methods-related keywords
+                if ('method' in title_text and 
+                    not title_text.startswith('result') and
+                    not title_text.startswith('discussion') and
+                    # Avoid subsections like "Statistical methods"
+                    len(title_text.split()) <= 6):
+                    if not is_author_section(sec):
+                        add_candidate(sec)
+                break  # Only check first title
     
     # Prioritize sections: prefer explicit "Methods Summary" / "Materials and Methods" titles
     # over generic sec-type="methods" sections that might be author lists
@@ -879,153 +1199,442 @@ def find_all_methods_sections(root):
     return candidates
 
 
-def extract_methods_section(xml_file):
+# Well-known fallbacks for namespace prefixes that publishers commonly
+# forget to declare.
+DEFAULT_URIS = {
+    'xlink': 'http://www.w3.org/1999/xlink',
+    'mml':   'http://www.w3.org/1998/Math/MathML',
+    'oasis': 'http://docs.oasis-open.org/ns/oasis-exchange/table',
+    'ali':   'http://www.niso.org/schemas/ali/1.0/',
+}
+
+
+def _inject_namespace_declarations(raw):
+    """
+    Declare every namespace prefix used in `raw` on its root element.
+
+    Returns (patched text, sorted list of injected prefixes, sorted list of
+    those that had no known URI and got a placeholder).
+    """
+    # Collect every prefix that's actually USED, both as element
+    # prefix (`<oasis:table>`) and as attribute prefix
+    # (`xlink:href="..."`).  `xml` and `xmlns` are XML's special
+    # built-in prefixes — never declare those.
+    elem_prefixes = set(re.findall(r'<\s*([A-Za-z][\w.-]*):', raw))
+    attr_prefixes = set(re.findall(r'\s([A-Za-z][\w.-]*):[A-Za-z][\w.-]*\s*=', raw))
+    used_prefixes = (elem_prefixes | attr_prefixes) - {'xml', 'xmlns'}
+    if not used_prefixes:
+        return raw, [], []
+
+    # Map each declared prefix to a URI seen anywhere in the file.
+    # Some publishers declare a prefix on inner subtrees only, so a
+    # different subtree using the same prefix still raises
+    # "unbound prefix".  We re-declare every used prefix on the
+    # ROOT element to make the document self-contained.  Re-using
+    # the same URI as inner declarations is harmless.
+    declared_uris = dict(
+        re.findall(r'xmlns:([A-Za-z][\w.-]*)\s*=\s*"([^"]*)"', raw)
+    )
+
+    injections = []
+    unknown = []
+    for p in sorted(used_prefixes):
+        uri = declared_uris.get(p) or DEFAULT_URIS.get(p)
+        if uri is None:
+            uri = f'urn:local:undeclared:{p}'
+            unknown.append(p)
+        injections.append(f' xmlns:{p}="{uri}"')
+    injection = ''.join(injections)
+
+    # Inject into the FIRST element opening tag (the root).
+    # Strip any existing xmlns:foo declarations on the root for
+    # the same prefixes, so our injection is authoritative.
+    def _patch_root(m):
+        head = m.group(1)
+        tail = m.group(2)
+        for p in used_prefixes:
+            head = re.sub(
+                rf'\s+xmlns:{re.escape(p)}\s*=\s*"[^"]*"',
+                '', head,
+            )
+        return head + injection + tail
+
+    patched, n = re.subn(
+        r'(<[A-Za-z][\w.-]*\b[^>]*?)(\s*/?>)',
+        _patch_root,
+        raw,
+        count=1,
+    )
+    if not n:
+        return patched, [], []
+    return patched, sorted(used_prefixes), unknown
+
+
+# lxml error-log message for an undeclared prefix, e.g.
+# "Namespace prefix oasis on table is not defined" or
+# "Namespace prefix xlink for href on ext-link is not defined"
+_LXML_UNDECLARED_PREFIX_RE = re.compile(r'Namespace prefix (\S+) (?:on|for) ')
+
+
+def _parse_with_lxml(xml_file, data=None):
+    """
+    Parse once with lxml's recovering parser.
+
+    Malformed publisher XML (undeclared prefixes, undefined entities,
+    truncated files) is recovered in the same pass, so no repair or
+    re-parse is needed.  Undeclared prefixes stay in the tag ('oasis:table')
+    and are handled by namespace-agnostic tag matching (_local_name).
+
+    Returns (root, parse info); see parse_xml_file.
+    """
+    lxml_parser = LET.XMLParser(
+        recover=True, huge_tree=True, remove_comments=True, remove_pis=True,
+    )
+    try:
+        if data is None:
+            root = LET.parse(str(xml_file), lxml_parser).getroot()
+        else:
+            root = LET.fromstring(data, lxml_parser)
+    except LET.XMLSyntaxError as e:
+        raise ET.ParseError(str(e))
+    if root is None:
+        raise ET.ParseError(f"no element found in {xml_file}")
+
+    if not len(lxml_parser.error_log):
+        return root, {'strategy': 'lxml', 'prefixes': [], 'unknown_prefixes': []}
+    prefixes = sorted({
+        m.group(1) for m in
+        (_LXML_UNDECLARED_PREFIX_RE.match(e.message) for e in lxml_parser.error_log)
+        if m
+    })
+    unknown = [p for p in prefixes if p not in DEFAULT_URIS]
+    return root, {'strategy': 'lxml-recover', 'prefixes': prefixes, 'unknown_prefixes': unknown}
+
+
+def _parse_with_repair(xml_file, data, parse_err=None):
+    """ElementTree parse after injecting undeclared namespace prefixes."""
+    if parse_err is not None:
+        print(
+            f"Warning: ElementTree could not parse {xml_file} ({parse_err}); "
+            f"attempting to repair undeclared namespace prefixes",
+            file=sys.stderr,
+        )
+    raw = data.decode('utf-8')
+    patched, injected, unknown = _inject_namespace_declarations(raw)
+    if injected and parse_err is not None:
+        print(
+            f"  injected xmlns declarations for: {injected}",
+            file=sys.stderr,
+        )
+    root = ET.fromstring(patched)
+    return root, {'strategy': 'etree-repair', 'prefixes': injected, 'unknown_prefixes': unknown}
+
+
+def parse_xml_file(xml_file, fmt='unknown', parser='auto', data=None, hint=None):
+    """
+    Parse an XML file and return (root element, parse info).
+
+    parser='auto' (default): strict ElementTree parse first — well-formed
+    files, the large majority, stay on ET, whose trees are the fastest to
+    walk from Python.  If that fails and lxml is installed, the raw file is
+    parsed exactly once more by lxml's recovering parser and the extractors
+    run on that tree directly (no namespace repair, no re-serialization).
+
+    parser='lxml': always parse once with lxml's recovering parser.
+
+    parser='etree', or 'auto' without lxml: stdlib only.  Some
+    publisher-produced JATS (e.g. SAGE/Atypon) ships malformed XML —
+    namespace prefixes like <oasis:table> are used without being declared
+    on the root element.  ElementTree's strict parser refuses these.
+    Recovery strategy:
+      1. Read the file as text.
+      2. Find every `<prefix:` used in the body but not declared
+         via `xmlns:prefix=` on the root.
+      3. Inject placeholder namespace declarations on the root
+         <article> element, then re-parse with ET.
+
+    `fmt` is the sniffed format (sniff_xml_format).  TEI and BioC files are
+    machine-generated (GROBID, Auto-CORPus) and never use undeclared
+    prefixes, so for those the repair is not attempted.
+
+    `data` is the file content if already read.  `hint` is this file's
+    parse cache entry (parse_cache.py): if it records that the file needed
+    repair or recovery, the failing strict parse is skipped and the
+    recorded strategy is used directly (when available with `parser`).
+
+    The parse info dictionary has keys 'strategy' ('etree', 'etree-repair',
+    'lxml' or 'lxml-recover'), 'prefixes' (injected or undeclared namespace
+    prefixes) and 'unknown_prefixes' (those with no known URI).
+    """
+    if parser == 'lxml':
+        if LET is None:
+            raise ImportError("parser='lxml' requested but lxml is not installed")
+        return _parse_with_lxml(xml_file, data)
+
+    if data is None:
+        data = Path(xml_file).read_bytes()
+
+    hinted = hint['strategy'] if hint else None
+    if hinted == 'lxml-recover' and LET is not None and parser == 'auto':
+        return _parse_with_lxml(xml_file, data)
+    if hinted == 'etree-repair' and (LET is None or parser == 'etree'):
+        return _parse_with_repair(xml_file, data)
+
+    try:
+        return ET.fromstring(data), {'strategy': 'etree', 'prefixes': [], 'unknown_prefixes': []}
+    except ET.ParseError as parse_err:
+        if LET is not None and parser == 'auto':
+            print(
+                f"Warning: ElementTree could not parse {xml_file} ({parse_err}); "
+                f"parsing with lxml recover=True",
+                file=sys.stderr,
+            )
+            return _parse_with_lxml(xml_file, data)
+
+        if fmt in ('tei', 'bioc'):
+            raise
+
+        return _parse_with_repair(xml_file, data, parse_err)
+
+
+def extract_methods_section(xml_file, parser='auto', parse_hints=None, data=None, sections=None,
+                            paragraphs=False, supplement_dir=None, validators=None):
     """
     Extract the methods section text from a JATS, TEI, or BioC XML file.
 
-    Automatically detects the XML format and dispatches to the appropriate
-    extraction logic.
+    Sniffs the XML format from the first few KB of the file, parses it
+    (repairing malformed publisher XML where needed) and dispatches to the
+    appropriate extraction logic.
 
     Args:
         xml_file: Path to the XML file
+        parser: 'auto', 'lxml' or 'etree' (see parse_xml_file)
+        parse_hints: optional parse cache entries by content hash
+            (parse_cache.parse_hints); a hit skips straight to the parse
+            strategy that worked before
+        data: the file's content, if already read (e.g. an archive member;
+            xml_file is then only used as its name)
+        sections: names of further section views to extract from the same
+            parse (see extract_sections)
+        paragraphs: also return the text split into paragraphs (see
+            'paragraphs' below)
+        supplement_dir: folder of downloaded and converted supplements
+            (SUPPLEMENT_DIR); when the methods are only in a supplementary
+            file whose BioC conversion is there, they are extracted from it
+        validators: name -> validator(text) run on the methods text in
+            memory before anything is written (see validate_text); results
+            under 'validation'
 
     Returns:
         Dictionary with keys:
         - 'text': String containing the methods section text, or None if not found or if online-only
         - 'is_main': Boolean indicating if this is Nature Genetics fallback body text
+        - 'status': One of 'success', 'main-fallback' (the text is the
+          body fallback, is_main), 'supplementary-methods' (the text is
+          from the converted supplementary file), 'online-only',
+          'supplementary-only' (methods are in a supplementary file, not
+          converted or without a methods section), 'no-methods' or 'failed'
+        - 'format': the detected format, or None if the file could not be read
+        - 'word_count': number of words in 'text'
+        - 'timings': seconds spent reading (and sniffing), parsing and
+          extracting ('read', 'parse', 'extract', 'total')
+        - 'parse': how the file was parsed, for the parse cache: 'sha1',
+          'strategy' ('failed' if it could not be parsed), 'prefixes',
+          'unknown_prefixes' and 'publisher'
+        - 'supplement': only for 'supplementary-methods': the converted
+          supplement the text is from
+        - 'profile': only after enable_profiling(): exclusive seconds per
+          stage and counters (see profiling.py)
+        - 'sections': only with `sections`: section name -> text or None
+        - 'paragraphs': only with `paragraphs`: the text as a list of
+          (section title, paragraph text), section title None where there
+          is none; 'section_paragraphs' holds the same per section view
+        - 'validation': only with `validators`: name -> validator result
+          ({} if there is no text)
     """
-    try:
-        try:
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-        except ET.ParseError as parse_err:
-            # Some publisher-produced JATS (e.g. SAGE/Atypon) ships malformed
-            # XML — namespace prefixes like <oasis:table> are used without
-            # being declared on the root element.  ElementTree's strict
-            # parser refuses these.  Recovery strategy:
-            #   1. Read the file as text.
-            #   2. Find every `<prefix:` used in the body but not declared
-            #      via `xmlns:prefix=` on the root.
-            #   3. Inject placeholder namespace declarations on the root
-            #      <article> element, then re-parse with ET.
-            #   4. If that still fails, fall back to lxml's recovering
-            #      parser and round-trip through serialization.
-            print(
-                f"Warning: ElementTree could not parse {xml_file} ({parse_err}); "
-                f"attempting to repair undeclared namespace prefixes",
-                file=sys.stderr,
-            )
-            raw = Path(xml_file).read_text(encoding='utf-8')
-
-            # Collect every prefix that's actually USED, both as element
-            # prefix (`<oasis:table>`) and as attribute prefix
-            # (`xlink:href="..."`).  `xml` and `xmlns` are XML's special
-            # built-in prefixes — never declare those.
-            elem_prefixes = set(re.findall(r'<\s*([A-Za-z][\w.-]*):', raw))
-            attr_prefixes = set(re.findall(r'\s([A-Za-z][\w.-]*):[A-Za-z][\w.-]*\s*=', raw))
-            used_prefixes = (elem_prefixes | attr_prefixes) - {'xml', 'xmlns'}
-
-            # Map each declared prefix to a URI seen anywhere in the file.
-            # Some publishers declare a prefix on inner subtrees only, so a
-            # different subtree using the same prefix still raises
-            # "unbound prefix".  We re-declare every used prefix on the
-            # ROOT element to make the document self-contained.  Re-using
-            # the same URI as inner declarations is harmless.
-            declared_uris = dict(
-                re.findall(r'xmlns:([A-Za-z][\w.-]*)\s*=\s*"([^"]*)"', raw)
-            )
-            # Well-known fallbacks for prefixes that publishers commonly
-            # forget to declare.
-            DEFAULT_URIS = {
-                'xlink': 'http://www.w3.org/1999/xlink',
-                'mml':   'http://www.w3.org/1998/Math/MathML',
-                'oasis': 'http://docs.oasis-open.org/ns/oasis-exchange/table',
-                'ali':   'http://www.niso.org/schemas/ali/1.0/',
+    if _profiler is not None:
+        _profiler.reset()
+    start = time.perf_counter()
+    info = {
+        'format': None,
+        'timings': {},
+        'parse': {'sha1': None, 'strategy': None, 'prefixes': [],
+                  'unknown_prefixes': [], 'publisher': None},
+    }
+    if paragraphs:
+        info['paragraphs'] = []
+        if sections:
+            info['section_paragraphs'] = {}
+    result = _extract_from_file(xml_file, parser, parse_hints, info, data, sections,
+                                supplement_dir)
+    if sections:
+        found = info.pop('sections', {})
+        result['sections'] = {name: result['text'] if name == 'methods' else found.get(name)
+                              for name in sections}
+    if paragraphs:
+        if result['text'] is None:
+            info['paragraphs'] = []
+        if sections:
+            found = info['section_paragraphs']
+            info['section_paragraphs'] = {
+                name: info['paragraphs'] if name == 'methods' else found.get(name, [])
+                for name in sections
             }
 
-            patched = raw
-            if used_prefixes:
-                injections = []
-                for p in sorted(used_prefixes):
-                    uri = declared_uris.get(p) or DEFAULT_URIS.get(p) or f'urn:local:undeclared:{p}'
-                    injections.append(f' xmlns:{p}="{uri}"')
-                injection = ''.join(injections)
-                # Inject into the FIRST element opening tag (the root).
-                # Strip any existing xmlns:foo declarations on the root for
-                # the same prefixes, so our injection is authoritative.
-                def _patch_root(m):
-                    head = m.group(1)
-                    tail = m.group(2)
-                    for p in used_prefixes:
-                        head = re.sub(
-                            rf'\s+xmlns:{re.escape(p)}\s*=\s*"[^"]*"',
-                            '', head,
-                        )
-                    return head + injection + tail
-
-                patched, n = re.subn(
-                    r'(<[A-Za-z][\w.-]*\b[^>]*?)(\s*/?>)',
-                    _patch_root,
-                    patched,
-                    count=1,
-                )
-                if n:
-                    print(
-                        f"  injected xmlns declarations for: {sorted(used_prefixes)}",
-                        file=sys.stderr,
-                    )
-
-            try:
-                root = ET.fromstring(patched)
-                tree = ET.ElementTree(root)
-            except ET.ParseError as second_err:
-                # Final fallback: lxml recovering parser.  We strip
-                # namespaces from every element so the resulting tree is
-                # serializable through ET without re-triggering the same
-                # error.
-                try:
-                    from lxml import etree as LET
-                except ImportError:
-                    raise second_err
-                print(
-                    f"  namespace injection insufficient ({second_err}); "
-                    f"falling back to lxml recover=True with namespace strip",
-                    file=sys.stderr,
-                )
-                lxml_parser = LET.XMLParser(recover=True, huge_tree=True)
-                lxml_root = LET.fromstring(raw.encode('utf-8'), lxml_parser)
-                # Strip namespace from element tags so ET can serialize.
-                for elem in lxml_root.iter():
-                    if isinstance(elem.tag, str) and '}' in elem.tag:
-                        elem.tag = elem.tag.split('}', 1)[1]
-                LET.cleanup_namespaces(lxml_root)
-                root = ET.fromstring(LET.tostring(lxml_root))
-                tree = ET.ElementTree(root)
-
-        # Detect format and dispatch
-        fmt = detect_xml_format(root)
+    if validators:
+        t0 = time.perf_counter()
+        info['validation'] = validate_text(result['text'], validators)
+        info['timings']['validate'] = time.perf_counter() - t0
+
+    timings = info['timings']
+    total = time.perf_counter() - start
+    timings['extract'] = (total - timings.get('read', 0) - timings.get('parse', 0) -
+                          timings.get('validate', 0))
+    timings['total'] = total
+    if info['parse']['strategy'] is None and info['parse']['sha1'] is not None:
+        info['parse']['strategy'] = 'failed'
+    result.update(info)
+    result['word_count'] = len(result['text'].split()) if result['text'] else 0
+    if _profiler is not None:
+        result['profile'] = _profiler.snapshot(total)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Profiling (off unless enable_profiling() is called; see profiling.py)
+# ---------------------------------------------------------------------------
+
+_profiler = None
+
+# Stage -> module functions charged to it
+_PROFILED_STAGES = {
+    'read': ('_read_input',),
+    'detect': ('sniff_xml_format', 'sniff_publisher', 'detect_xml_format'),
+    'parse': ('parse_xml_file',),
+    'repair': ('_parse_with_repair', '_parse_with_lxml'),
+    'locate': ('collect_jats_facts', 'find_methods_section', 'jats_methods_sections',
+               'check_supplementary_methods', '_is_main_journal', 'index_tei_divs',
+               '_tei_methods_start', '_bioc_passage_fields'),
+    'serialize': ('extract_text_from_element', 'extract_tei_methods', 'extract_bioc_methods',
+                  '_bioc_methods_from_passages', 'jats_sections', 'tei_sections',
+                  'bioc_sections'),
+    'clean': ('clean_extracted_text', 'clean_element_text', 'strip_section_number'),
+}
+
+
+def _count_bytes(counts, args, result):
+    counts['bytes_read'] += len(result[0])
+
+
+def _count_elements(counts, args, result):
+    counts['elements'] += sum(1 for _ in result[0].iter())
+
+
+def _count_serialized(counts, args, result):
+    counts['elements_serialized'] += sum(1 for _ in args[0].iter())
+
+
+def _count_cleaning(counts, args, result):
+    counts['clean_calls'] += 1
+    if text_cleaning.needs_cleaning(args[0]):
+        counts['regex_passes'] += 1
+
+
+_PROFILE_COUNTERS = {
+    '_read_input': _count_bytes,
+    'parse_xml_file': _count_elements,
+    'extract_text_from_element': _count_serialized,
+    'clean_extracted_text': _count_cleaning,
+    'clean_element_text': _count_cleaning,
+}
+
+
+def enable_profiling():
+    """
+    Turn on per-stage timers and counters for this process: every
+    extract_methods_section result then has a 'profile'.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = profiling.StageTimer()
+        profiling.install(globals(), _profiler, _PROFILED_STAGES, _PROFILE_COUNTERS)
+    return _profiler
+
+
+def _read_input(xml_file, data=None):
+    """(content, SHA-1) of an input; `data` is its content if already read."""
+    if data is None:
+        data = Path(xml_file).read_bytes()
+    return data, parse_cache.content_hash(data)
+
+
+def _extract_from_file(xml_file, parser, parse_hints, info, data=None, sections=None,
+                       supplement_dir=None):
+    """
+    Body of extract_methods_section; fills in `info` as it goes, including
+    info['sections'] for the requested section views other than methods,
+    and the paragraph records if info has a 'paragraphs' list.
+    """
+    parse_info = info['parse']
+    records = info.get('paragraphs')
+    section_records = info.get('section_paragraphs')
+    try:
+        t0 = time.perf_counter()
+        data, parse_info['sha1'] = _read_input(xml_file, data)
+        parse_info['publisher'] = sniff_publisher(data)
+        fmt = sniff_xml_format(xml_file, head=data)
+        hint = parse_hints.get(parse_info['sha1']) if parse_hints else None
+        t1 = time.perf_counter()
+        root, strategy = parse_xml_file(xml_file, fmt, parser, data=data, hint=hint)
+        parse_info.update(strategy)
+        info['timings'].update(read=t1 - t0, parse=time.perf_counter() - t1)
+
+        # Fall back to a full-tree format check if sniffing was inconclusive
+        if fmt == 'unknown':
+            fmt = detect_xml_format(root)
+        info['format'] = fmt
 
         if fmt == 'tei':
-            return {'text': extract_tei_methods(root), 'is_main': False}
+            index = tei_body_index(root)
+            if sections:
+                info['sections'] = tei_sections(root, index, sections, section_records)
+            return _result(extract_tei_methods(root, index, records))
 
         if fmt == 'bioc':
-            return {'text': extract_bioc_methods(root), 'is_main': False}
+            passages = bioc_passages(root)
+            if sections:
+                info['sections'] = bioc_sections(passages, sections, section_records)
+            return _result(extract_bioc_methods(root, passages, records))
 
         if fmt == 'unknown':
             print(f"Warning: could not detect XML format for {xml_file}, trying JATS", file=sys.stderr)
 
-        # JATS format (default) — original logic follows
+        # JATS format (default) — original logic follows.  Every decision
+        # below is answered from one walk over the tree.
+        facts = collect_jats_facts(root)
+        if sections:
+            info['sections'] = jats_sections(root, facts, sections, section_records)
+
         # Find the methods section
-        methods_section, is_main = find_methods_section(root)
+        methods_section, is_main = find_methods_section(root, facts)
         
         if methods_section is None:
             # Check if methods are in supplementary materials
-            supplementary_note = check_supplementary_methods(root)
+            supplementary_note = check_supplementary_methods(root, facts)
+            if supplementary_note and supplement_dir:
+                # Follow through to the converted supplement, if downloaded
+                pmcid = article_pmcid(xml_file, data)
+                if pmcid:
+                    paths = converted_supplements(root, facts, supplement_dir, pmcid)
+                    supp_text, supp_path = extract_supplement_methods(paths, parser, records)
+                    if supp_text:
+                        info['supplement'] = str(supp_path)
+                        return _result(supp_text, status='supplementary-methods')
             if supplementary_note:
                 # Methods are in supplementary files - don't write a file
                 print("Methods are in supplementary materials (not extracted).", file=sys.stderr)
-                return {'text': None, 'is_main': False}
-            return {'text': None, 'is_main': False}
+                return _result(None, status='supplementary-only')
+            return _result(None)
         
         # Extract all text from the methods section
         methods_text = extract_text_from_element(methods_section)
@@ -1063,14 +1672,16 @@ def extract_methods_section(xml_file):
             if has_strong_indicator or starts_with_redirection:
                 # This looks like an online-only stub, but check if there's another methods section
                 # (Some Nature papers have a stub followed by "ONLINE METHODS")
-                all_methods_sections = find_all_methods_sections(root)
+                all_methods_sections = jats_methods_sections(root, facts)
                 if len(all_methods_sections) > 1:
                     # Try the next methods section
                     for section in all_methods_sections[1:]:
                         alt_text = extract_text_from_element(section).strip()
                         if alt_text and len(alt_text.split()) >= 50:
                             # Found a real methods section
-                            return {'text': alt_text, 'is_main': False}
+                            if records is not None:
+                                element_paragraphs(section, records)
+                            return _result(alt_text)
 
                 # No alternative methods section found.  For older Nature
                 # Genetics / Cell Press / AJHG papers, the actual methods text
@@ -1078,73 +1689,1534 @@ def extract_methods_section(xml_file):
                 # is this online-only stub.  Fall back to the whole body, the
                 # same way we do for main-journal articles with zero methods
                 # candidates.
-                if _is_main_journal(root):
-                    body = root.find('.//{*}body')
+                if _is_main_journal(root, facts):
+                    body = facts['body']
                     if body is not None:
                         body_text = extract_text_from_element(body).strip()
                         if body_text and len(body_text.split()) >= 50:
-                            return {'text': body_text, 'is_main': True}
+                            if records is not None:
+                                element_paragraphs(body, records)
+                            return _result(body_text, is_main=True)
 
                 # No alternative found, this is truly online-only
                 print("Methods are only available online (not extracted).", file=sys.stderr)
-                return {'text': None, 'is_main': False}
+                return _result(None, status='online-only')
         
-        return {'text': methods_text, 'is_main': is_main}
+        if records is not None and methods_text:
+            element_paragraphs(methods_section, records)
+        return _result(methods_text, is_main=is_main)
         
     except ET.ParseError as e:
         print(f"Error parsing XML file: {e}", file=sys.stderr)
-        return {'text': None, 'is_main': False}
+        return _result(None, status='failed')
     except Exception as e:
         print(f"Error processing file: {e}", file=sys.stderr)
-        return {'text': None, 'is_main': False}
+        return _result(None, status='failed')
+
+
+def _result(text, is_main=False, status=None):
+    """Build the result dictionary returned by extract_methods_section."""
+    if status is None:
+        if not text:
+            status = 'no-methods'
+        else:
+            status = 'main-fallback' if is_main else 'success'
+    return {'text': text if text else None, 'is_main': is_main, 'status': status}
+
+
+def _supplementary_methods_blocks(facts):
+    """
+    (element, first <media> or None) of the supplementary-material blocks
+    whose text refers to supplementary methods.
+    """
+    for elem, media_elem in facts['supplementary']:
+        # Check all text in this element for methods references
+        all_text = ' '.join(elem.itertext()).lower()
+        if 'method' in all_text and ('supplemental' in all_text or 'supplementary' in all_text):
+            yield elem, media_elem
 
 
-def check_supplementary_methods(root):
+def _media_href(media_elem):
+    return (media_elem.get('{http://www.w3.org/1999/xlink}href') or
+            media_elem.get('xlink:href'))
+
+
+def check_supplementary_methods(root, facts=None):
     """
     Check if methods section is in supplementary materials (common in Cell Press journals).
     Returns a note if supplementary methods are found, None otherwise.
     """
+    if facts is None:
+        facts = collect_jats_facts(root)
+
     # Look for supplementary-material sections
-    for elem in root.iter():
-        tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-        if tag == 'supplementary-material' or (tag == 'sec' and elem.get('sec-type') == 'supplementary-material'):
-            # Check all text in this element for methods references
-            all_text = ' '.join(elem.itertext()).lower()
-            if 'method' in all_text and ('supplemental' in all_text or 'supplementary' in all_text):
-                # Found reference to supplementary methods
-                # Try to extract the file name if available
-                media_elem = elem.find('.//{*}media')
-                if media_elem is not None:
-                    href = media_elem.get('{http://www.w3.org/1999/xlink}href')
-                    if href:
-                        return f"NOTE: Methods section is in supplementary materials file: {href}\n\nThis XML file does not contain the methods text inline. Please refer to the supplementary materials document."
-                
-                return "NOTE: Methods section is in supplementary materials.\n\nThis XML file does not contain the methods text inline. Please refer to the supplementary materials document."
+    for elem, media_elem in _supplementary_methods_blocks(facts):
+        # Found reference to supplementary methods
+        # Try to extract the file name if available
+        if media_elem is not None:
+            href = _media_href(media_elem)
+            if href:
+                return f"NOTE: Methods section is in supplementary materials file: {href}\n\nThis XML file does not contain the methods text inline. Please refer to the supplementary materials document."
+        
+        return "NOTE: Methods section is in supplementary materials.\n\nThis XML file does not contain the methods text inline. Please refer to the supplementary materials document."
     
     return None
 
 
+# Where download_pmc_supplements_aws.sh saves each article's supplementary
+# files ({PMCID}/{file}) and convert_supplements.sh writes their BioC
+# conversions ({PMCID}/{file stem}.xml)
+SUPPLEMENT_DIR = 'output/supplement'
+
+_PMCID_RE = re.compile(r'PMC\d+')
+
+
+def article_pmcid(xml_file, head):
+    """PMCID of an article from its <article-id> (sniff_article_id) or its file name."""
+    article_id = sniff_article_id(head)
+    if article_id and article_id.startswith('PMC'):
+        return article_id
+    name = output_name_for(xml_file)
+    return name if _PMCID_RE.fullmatch(name) else None
+
+
+def converted_supplements(root, facts, supplement_dir, pmcid):
+    """
+    BioC conversions in supplement_dir/{pmcid}/ of the supplementary files
+    named by the article's supplementary-methods blocks
+    (check_supplementary_methods), in document order.
+    """
+    paths = []
+    article_dir = Path(supplement_dir) / pmcid
+    for _, media_elem in _supplementary_methods_blocks(facts):
+        href = _media_href(media_elem) if media_elem is not None else None
+        if not href:
+            continue
+        path = (article_dir / Path(href).name).with_suffix('.xml')
+        if path.is_file() and path not in paths and sniff_xml_format(path) == 'bioc':
+            paths.append(path)
+    return paths
+
+
+def extract_supplement_methods(paths, parser='auto', paragraphs=None):
+    """
+    (methods text, path) from the first converted supplement in `paths`
+    with a methods section (extract_bioc_methods), or (None, None).
+    """
+    for path in paths:
+        try:
+            root, _ = parse_xml_file(str(path), 'bioc', parser)
+        except ET.ParseError as e:
+            print(f"Warning: could not parse supplement {path} ({e})", file=sys.stderr)
+            continue
+        records = [] if paragraphs is not None else None
+        text = extract_bioc_methods(root, paragraphs=records)
+        if text:
+            if paragraphs is not None:
+                paragraphs.extend(records)
+            return text, path
+    return None, None
+
+
+# ---------------------------------------------------------------------------
+# Other section views (abstract, results, discussion, body)
+# ---------------------------------------------------------------------------
+
+# Sections extract_sections can return; 'methods' is extract_methods_section's
+# text, 'body' the whole article body (the fallback view when a paper has
+# no usable sections)
+SECTION_NAMES = ('abstract', 'methods', 'results', 'discussion', 'body')
+
+# Section view -> pattern matched at the start of a lowercased section title
+# without its numbering.  A combined "Results and discussion" section is
+# part of both views.
+_SECTION_TITLE_RES = {
+    'results': re.compile(r'results?\b'),
+    'discussion': re.compile(r'(?:results? and )?(?:discussion|conclusions?|concluding remarks)\b'),
+}
+
+# Section view -> substrings of a JATS sec-type marking it
+_SECTION_SEC_TYPES = {
+    'results': ('result',),
+    'discussion': ('discussion', 'conclusion'),
+}
+
+# Titles that start a major section other than results / discussion (they
+# end a TEI results or discussion view, along with NON_METHODS_SECTIONS)
+_OTHER_MAJOR_PREFIXES = ('introduction', 'background', 'method', 'materials', 'online method',
+                         'experimental procedures', 'subjects and methods')
+
+# BioC section titles that are not part of the article body
+_BIOC_NON_BODY_PREFIXES = (
+    'title', 'document title', 'abstract', 'keyword', 'reference', 'acknowledg',
+    'funding', 'competing', 'conflict', 'author contribution', 'author information',
+    'supplementary',
+)
+
+
+def _join_texts(texts):
+    text = ' '.join(t for t in texts if t).strip()
+    return text or None
+
+
+def _jats_title(sec):
+    """Lowercased first <title> of a <sec>, without numbering ('' if none)."""
+    for child in sec:
+        if child.tag.endswith('title'):
+            return strip_section_number(''.join(child.itertext()).strip()).lower()
+    return ''
+
+
+def jats_sections(root, facts, names, paragraphs=None):
+    """
+    Text of the named section views (other than 'methods') of a JATS
+    article, from its collect_jats_facts:
+      - abstract:   the first <abstract> without an abstract-type (e.g. not a
+                    teaser or graphical abstract), else the first one
+      - results / discussion: the shallowest body <sec>s whose sec-type or
+                    title marks them as such, in document order
+      - body:       the whole <body>
+    Returns {name: text or None}.  If `paragraphs` is a dictionary, each
+    view's element_paragraphs records are stored in it by name.
+    """
+    sections = {}
+    for name in names:
+        if name == 'abstract':
+            abstracts = facts['abstracts']
+            plain = [a for a in abstracts if a.get('abstract-type') is None]
+            elements = (plain or abstracts)[:1]
+        elif name == 'body':
+            elements = [facts['body']] if facts['body'] is not None else []
+        elif name in _SECTION_TITLE_RES:
+            elements = _jats_sections_of_kind(facts['index'], name)
+        else:
+            continue
+        sections[name] = _join_texts(extract_text_from_element(elem) for elem in elements)
+        if paragraphs is not None:
+            records = paragraphs[name] = []
+            if sections[name]:
+                for elem in elements:
+                    element_paragraphs(elem, records)
+    return sections
+
+
+def _jats_sections_of_kind(index, name):
+    """Shallowest non-abstract <sec>s marked as section view `name`."""
+    title_re = _SECTION_TITLE_RES[name]
+    sec_types = _SECTION_SEC_TYPES[name]
+    matches = []
+    for sec in index['secs']:
+        if sec in index['in_abstract']:
+            continue
+        sec_type = (sec.get('sec-type') or '').lower()
+        if any(t in sec_type for t in sec_types) or title_re.match(_jats_title(sec)):
+            matches.append(sec)
+    if not matches:
+        return []
+    depth = min(index['sec_depth'][sec] for sec in matches)
+    return [sec for sec in matches if index['sec_depth'][sec] == depth]
+
+
+def tei_sections(root, index, names, paragraphs=None):
+    """
+    Text of the named section views (other than 'methods') of a TEI
+    document, from its tei_body_index: the header abstract, the whole body,
+    or for results / discussion the divs from the first matching head up to
+    the next major section head.  Returns {name: text or None}; with a
+    `paragraphs` dictionary, as jats_sections.
+    """
+    sections = {}
+    for name in names:
+        records = [] if paragraphs is not None else None
+        if name == 'abstract':
+            abstract = root.find('.//tei:teiHeader//tei:abstract', TEI_NS)
+            if abstract is None:
+                abstract = root.find('.//teiHeader//abstract')
+            ps = [] if abstract is None else list(abstract.iter(_TEI_P)) or list(abstract.iter('p'))
+            texts = [clean_extracted_text(''.join(p.itertext()).strip()) for p in ps]
+            sections[name] = _join_texts(texts)
+            if records is not None:
+                records.extend((None, text) for text in texts if text)
+        elif name == 'methods':
+            continue
+        elif not index:
+            sections[name] = None
+        elif name == 'body':
+            sections[name] = _tei_section_text(index, 0, _tei_never_stop, records)
+        elif name in _SECTION_TITLE_RES:
+            sections[name] = _tei_named_section(index, _SECTION_TITLE_RES[name], records)
+        if paragraphs is not None:
+            paragraphs[name] = records
+    return sections
+
+
+def _tei_never_stop(title, clean_title):
+    return False
+
+
+def _tei_named_section(index, title_re, records=None):
+    start = None
+    for i, (_, heading, _, clean_title, _) in enumerate(index):
+        if heading is not None and title_re.match(clean_title.lower()):
+            start = i
+            break
+    if start is None:
+        return None
+
+    def is_stop(title, clean_title):
+        clean_title = clean_title.lower()
+        if title_re.match(clean_title):
+            return False
+        return (bool(_TEI_STOP_RE.match(clean_title))
+                or clean_title.startswith(_OTHER_MAJOR_PREFIXES))
+
+    return _tei_section_text(index, start, is_stop, records)
+
+
+def bioc_sections(passages, names, paragraphs=None):
+    """
+    Text of the named section views (other than 'methods') of a BioC
+    collection, from its bioc_passages: the passages whose section_title_1
+    marks them as abstract, results or discussion, or for body every passage
+    outside the front and back matter.  Returns {name: text or None}; with a
+    `paragraphs` dictionary, as jats_sections.
+    """
+    titles = [strip_section_number((title or '').strip()).lower() for title, _ in passages]
+    sections = {}
+    for name in names:
+        if name == 'methods':
+            continue
+        records = [
+            (label.strip() if label else None, clean_extracted_text(text.strip()))
+            for title, (label, text) in zip(titles, passages)
+            if text and text.strip() and _bioc_in_section(name, title)
+        ]
+        sections[name] = _join_texts(text for _, text in records)
+        if paragraphs is not None:
+            paragraphs[name] = [(label, text) for label, text in records if text]
+    return sections
+
+
+def _bioc_in_section(name, title):
+    """Whether a passage with this (normalised) section title is in view `name`."""
+    if name == 'abstract':
+        return title.startswith('abstract')
+    if name == 'body':
+        return not title.startswith(_BIOC_NON_BODY_PREFIXES)
+    return bool(_SECTION_TITLE_RES[name].match(title))
+
+
+def extract_sections(xml_file, sections=SECTION_NAMES, parser='auto', parse_hints=None, data=None):
+    """
+    Extract several section views of an article from a single parse.
+
+    Returns extract_methods_section's result (the methods text, status and
+    parse details) with an added 'sections' dictionary: for each name in
+    `sections` (see SECTION_NAMES), its text or None.  'methods' is the
+    result's 'text' (None for online-only and supplementary-only articles).
+    """
+    unknown = [name for name in sections if name not in SECTION_NAMES]
+    if unknown:
+        raise ValueError(f"unknown sections: {', '.join(unknown)}")
+    return extract_methods_section(xml_file, parser=parser, parse_hints=parse_hints, data=data,
+                                   sections=tuple(sections))
+
+
+# ---------------------------------------------------------------------------
+# Batch mode (whole input folder in one interpreter)
+# ---------------------------------------------------------------------------
+
+# Archive members read as articles (PMC OA packages ship JATS as .nxml)
+ARCHIVE_MEMBER_SUFFIXES = ('.xml', '.nxml')
+
+def output_name_for(xml_file):
+    """
+    Base output name for an input XML file, without the '_methods.txt' part.
+
+    Normalises the .pdf.tei suffix to _pdf_tei so GROBID output files get
+    predictable names like {pmid}_pdf_tei_methods.txt.
+    """
+    name = Path(xml_file).name
+    for suffix in ARCHIVE_MEMBER_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.replace('.pdf.tei', '_pdf_tei', 1)
+
+
+def main_output_path(output_path):
+    """Insert '_main' before the file extension (Nature Genetics body fallback)."""
+    output_path = Path(output_path)
+    return output_path.parent / f"{output_path.stem}_main{output_path.suffix}"
+
+
+def supp_output_path(output_path):
+    """Insert '_supp' before the file extension (methods from a converted supplement)."""
+    output_path = Path(output_path)
+    return output_path.parent / f"{output_path.stem}_supp{output_path.suffix}"
+
+
+# Output layouts: 'flat' is the text as one run of sentences; 'paragraphs'
+# puts each paragraph (and each section title, when it changes) on its own
+# line, separated by blank lines; 'json' is a list of {"section", "text"}
+# paragraph records
+LAYOUTS = ('flat', 'paragraphs', 'json')
+
+
+def format_output(text, paragraphs, layout='flat'):
+    """
+    Text to write for a section in `layout`; `paragraphs` are its
+    (section title, paragraph text) records (extract_methods_section with
+    paragraphs=True), unused for the flat layout.
+    """
+    if layout == 'flat':
+        return text
+    if layout == 'json':
+        return json.dumps([{'section': section, 'text': para} for section, para in paragraphs],
+                          ensure_ascii=False, indent=1)
+    blocks = []
+    current = None
+    for section, para in paragraphs:
+        if section and section != current:
+            blocks.append(section if section.endswith(('.', ':', '?')) else section + '.')
+        current = section
+        blocks.append(para)
+    return '\n\n'.join(blocks)
+
+
+def section_output_path(output_dir, name, section, is_main=False, layout='flat', is_supp=False):
+    """
+    Output file of one section view: {name}_methods.txt in output_dir
+    ({name}_methods_main.txt for the body fallback, {name}_methods_supp.txt
+    for methods from a converted supplement), other views in a
+    subfolder per section ({output_dir}/results/{name}_results.txt), so the
+    folder read by the downstream scripts holds only methods text.  The
+    json layout writes .json files.
+    """
+    suffix = '.json' if layout == 'json' else '.txt'
+    if section == 'methods':
+        output_path = Path(output_dir) / f"{name}_methods{suffix}"
+        if is_supp:
+            return supp_output_path(output_path)
+        return main_output_path(output_path) if is_main else output_path
+    return Path(output_dir) / section / f"{name}_{section}{suffix}"
+
+
+def write_sections(output_dir, name, result, sections=('methods',), layout='flat'):
+    """
+    Write the section views of an extract_methods_section / extract_sections
+    result that have text, in `layout` (the result must then have been
+    extracted with paragraphs=True); returns the output paths.
+    """
+    output_paths = []
+    for section in sections:
+        if section == 'methods':
+            text, paragraphs = result['text'], result.get('paragraphs')
+        else:
+            text = result['sections'].get(section)
+            paragraphs = result.get('section_paragraphs', {}).get(section)
+        if text is None:
+            continue
+        output_path = section_output_path(output_dir, name, section, result['is_main'], layout,
+                                          result['status'] == 'supplementary-methods')
+        output_path.parent.mkdir(exist_ok=True)
+        output_path.write_text(format_output(text, paragraphs, layout), encoding='utf-8')
+        output_paths.append(output_path)
+    return output_paths
+
+
+def write_bioc_documents(xml_file, output_dir, documents=None):
+    """
+    Stream a BioC collection and write one '{document id}_bioc_methods.txt'
+    per <document> that has a methods section.
+
+    Documents without an <id> are named after the collection file and
+    their position in it.  Returns (status, output_paths, word_count);
+    status is 'success' if any document produced text.  If `documents` is
+    a list, (document name, text) is appended to it for each output.
+    """
+    output_paths = []
+    status = 'no-methods'
+    word_count = 0
+    for n, result in enumerate(iter_bioc_methods(xml_file), 1):
+        if result['text'] is None:
+            continue
+        doc_name = result['id'] or f"{output_name_for(xml_file)}_{n}"
+        output_path = Path(output_dir) / f"{doc_name}_bioc_methods.txt"
+        output_path.write_text(result['text'], encoding='utf-8')
+        output_paths.append(str(output_path))
+        if documents is not None:
+            documents.append((f"{doc_name}_bioc", result['text']))
+        word_count += len(result['text'].split())
+        status = 'success'
+    return status, output_paths, word_count
+
+
+# ---------------------------------------------------------------------------
+# Validation on write: validators are callables text -> dict with at least
+# 'passed' (e.g. check_methods_processing.check_result), run on the text in
+# memory so checking it costs no re-read of the output.  They reach the
+# batch workers by pickling, so they must be module-level functions.
+# ---------------------------------------------------------------------------
+
+def preprocessing_validators():
+    """The validators run by --validate: the check_methods_processing.py checks."""
+    import check_methods_processing
+    return {'preprocessing': check_methods_processing.check_result}
+
+
+def validate_text(text, validators):
+    """name -> validator(text) for each of `validators`; {} if there is no text."""
+    if text is None:
+        return {}
+    return {name: validator(text) for name, validator in validators.items()}
+
+
+def validation_passed(result):
+    """False if a validator failed the text of a result (or run report record)."""
+    return all(v['passed'] for v in result.get('validation', {}).values())
+
+
+def run_report_record(xml_file, result, output_paths):
+    """
+    One line of the JSONL run report for an extract_methods_section result:
+    input, status, format, word_count, outputs, parse_repaired (the file was
+    not well-formed XML), timings (seconds per stage) and the parse info,
+    plus the per-stage 'profile' when profiling is on, the word count of
+    each section view ('sections') when several were extracted, the
+    converted supplement the methods came from ('supplement') and the
+    validator results ('validation', plus 'quarantined' if the outputs
+    went to the quarantine folder).
+    """
+    parse_info = result['parse']
+    record = {
+        'input': str(xml_file),
+        'status': result['status'],
+        'format': result['format'],
+        'word_count': result['word_count'],
+        'outputs': [str(p) for p in output_paths],
+        'parse_repaired': bool(parse_info) and
+                          parse_info['strategy'] in parse_cache.REPAIRED_STRATEGIES,
+        'timings': {stage: round(t, 6) for stage, t in result['timings'].items()},
+        'parse': parse_info,
+        'extractor_version': EXTRACTOR_VERSION,
+    }
+    if result.get('supplement'):
+        record['supplement'] = result['supplement']
+    if 'validation' in result:
+        record['validation'] = result['validation']
+        if result.get('quarantined'):
+            record['quarantined'] = True
+    if result.get('sections'):
+        record['sections'] = {name: len(text.split()) if text else 0
+                              for name, text in result['sections'].items()}
+    if result.get('profile'):
+        stages = result['profile']['stages']
+        record['profile'] = {
+            'stages': {stage: round(t, 6) for stage, t in stages.items()},
+            'counters': result['profile']['counters'],
+        }
+    return record
+
+
+def dataset_row(name, xml_file, result):
+    """
+    Methods dataset row (see methods_dataset.py) for one result.  A text
+    that failed validation and went to the quarantine folder gets status
+    'quarantined' and no text, so dataset readers skip it.
+    """
+    quarantined = result.get('quarantined', False)
+    return {
+        'id': name,
+        'input': str(xml_file),
+        'format': result['format'],
+        'status': 'quarantined' if quarantined else result['status'],
+        'is_main': result.get('is_main', False),
+        'word_count': result['word_count'],
+        'text': None if quarantined else result.get('text'),
+        'extractor_version': EXTRACTOR_VERSION,
+    }
+
+
+def _process_batch_file(xml_file, output_dir, split_bioc=False, parser='auto', parse_hints=None,
+                        data=None, output_name=None, with_rows=False, profile=False,
+                        sections=None, layout='flat', supplement_dir=None, validators=None,
+                        quarantine_dir=None):
+    """
+    Worker for batch mode: extract one file and write its output(s).
+
+    `data` is the file content if it does not come from disk (archive
+    members); `output_name` overrides output_name_for(xml_file).  Returns
+    the file's run report record (run_report_record);
+    'parse' is None for streamed BioC collections.  With `with_rows`, the
+    record also carries the file's methods dataset rows under 'rows'.
+    `profile` turns on per-stage profiling in the worker (enable_profiling).
+    `sections` are the section views to write (write_sections; default:
+    methods only) and `layout` their output layout (LAYOUTS); streamed
+    BioC collections only ever write flat methods text.  supplement_dir and
+    validators are passed on to extract_methods_section; with
+    quarantine_dir, the outputs of a text that failed validation are
+    written there instead of to output_dir.
+    """
+    if profile:
+        enable_profiling()
+    start = time.perf_counter()
+    name = output_name or output_name_for(xml_file)
+    if split_bioc and sniff_xml_format(xml_file) == 'bioc':
+        documents = []
+        try:
+            status, output_paths, word_count = write_bioc_documents(xml_file, output_dir,
+                                                                    documents)
+        except ET.ParseError as e:
+            print(f"Error parsing XML file: {e}", file=sys.stderr)
+            status, output_paths, word_count = 'failed', [], 0
+        result = {'status': status, 'format': 'bioc', 'word_count': word_count, 'parse': None,
+                  'timings': {'total': time.perf_counter() - start}}
+        rec = run_report_record(xml_file, result, output_paths)
+        if with_rows:
+            rec['rows'] = [
+                dataset_row(doc_name, xml_file, {'format': 'bioc', 'status': 'success',
+                                                 'word_count': len(text.split()), 'text': text})
+                for doc_name, text in documents
+            ] or [dataset_row(name, xml_file, result)]
+        return rec
+
+    result = extract_methods_section(xml_file, parser=parser, parse_hints=parse_hints, data=data,
+                                     sections=sections, paragraphs=layout != 'flat',
+                                     supplement_dir=supplement_dir, validators=validators)
+    if quarantine_dir and not validation_passed(result):
+        output_dir = quarantine_dir
+        result['quarantined'] = True
+    t0 = time.perf_counter()
+    output_paths = write_sections(output_dir, name, result, sections or ('methods',), layout)
+    if output_paths:
+        result['timings']['write'] = time.perf_counter() - t0
+        result['timings']['total'] = time.perf_counter() - start
+        if 'profile' in result:
+            result['profile']['stages']['write'] = result['timings']['write']
+    rec = run_report_record(xml_file, result, output_paths)
+    if with_rows:
+        rec['rows'] = [dataset_row(name, xml_file, result)]
+    return rec
+
+
+def _process_batch_member(member, output_dir, parser='auto', parse_hints=None, with_rows=False,
+                          profile=False, sections=None, layout='flat', supplement_dir=None,
+                          validators=None, quarantine_dir=None):
+    """
+    Worker for archive mode: `member` is a (name, content, output name,
+    collision) tuple from _name_archive_members; a collision is recorded
+    as 'name_collision' in the run report record.
+    """
+    name, data, output_name, collision = member
+    rec = _process_batch_file(name, output_dir, parser=parser, parse_hints=parse_hints,
+                              data=data, output_name=output_name,
+                              with_rows=with_rows, profile=profile, sections=sections,
+                              layout=layout, supplement_dir=supplement_dir,
+                              validators=validators, quarantine_dir=quarantine_dir)
+    if collision:
+        rec['name_collision'] = collision
+    return rec
+
+
+def _name_archive_members(members):
+    """
+    Add output names to (member name, content) pairs: the article's
+    PMCID / PMID (sniff_article_id), falling back to the member's file
+    name (output_name_for).
+
+    A name already used by an earlier member would overwrite its outputs,
+    so the member gets its full path instead ('PMC1/article.nxml' ->
+    'PMC1_article'), then a numeric suffix; the name it collided with is
+    yielded as the fourth item (None if there was no collision).
+    """
+    used = set()
+    for name, data in members:
+        output_name = sniff_article_id(data) or output_name_for(name)
+        collision = None
+        if output_name in used:
+            collision = output_name
+            output_name = Path(name).with_name(output_name_for(name)).as_posix().replace('/', '_')
+            base, n = output_name, 1
+            while output_name in used:
+                n += 1
+                output_name = f"{base}_{n}"
+            print(f"Warning: {name}: output name {collision} already used, "
+                  f"writing {output_name} instead", file=sys.stderr)
+        used.add(output_name)
+        yield name, data, output_name, collision
+
+
+def _map_bounded(func, items, workers=None):
+    """
+    Yield func(item) for each of `items`, in order, over a process pool
+    (workers=1 runs in-process).
+
+    Unlike Executor.map, only a few items per worker are submitted ahead,
+    so `items` can be a lazy stream (e.g. archive members read on demand)
+    without all of it being held in memory.
+    """
+    if workers == 1:
+        for item in items:
+            yield func(item)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    n_workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= n_workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Statuses of an extraction that produced methods text
+METHODS_STATUSES = ('success', 'main-fallback', 'supplementary-methods')
+
+# Per-file progress labels in batch mode, by status
+_BATCH_LABELS = {
+    'success': '✓ SUCCESS',
+    'main-fallback': '✓ SUCCESS (main body)',
+    'supplementary-methods': '✓ SUCCESS (supplement)',
+    'online-only': '⚠ ONLINE ONLY',
+    'supplementary-only': '⚠ METHODS IN SUPPLEMENT',
+    'no-methods': '⚠ NO METHODS SECTION',
+    'failed': '✗ FAILED',
+}
+
+
+def _batch_recorder(by_status, report_file, cache_entries, dataset=None, profiles=None):
+    """
+    Handler for each run report record coming back from the workers:
+    prints the progress line and records the result in by_status, the
+    JSONL report, the parse cache and the methods dataset writer.  Records
+    with a profile are also appended to the `profiles` list, if given, and
+    inputs whose text failed validation to by_status['failed-validation'].
+    """
+    def record(rec):
+        rows = rec.pop('rows', ())
+        if dataset is not None:
+            for row in rows:
+                dataset.add(row)
+        if profiles is not None and 'profile' in rec:
+            profiles.append({'input': rec['input'], 'profile': rec['profile']})
+        xml_file, status = rec['input'], rec['status']
+        label = _BATCH_LABELS[status]
+        if not validation_passed(rec):
+            label += ' [quarantined]' if rec.get('quarantined') else ' [failed validation]'
+            by_status.setdefault('failed-validation', []).append(xml_file)
+        print(f"Processing: {Path(xml_file).name}... {label}", flush=True)
+        by_status[status].append(xml_file)
+        report_file.write(json.dumps(rec) + '\n')
+        if cache_entries is not None:
+            parse_cache.record(cache_entries, rec['parse'], xml_file)
+    return record
+
+
+def _print_batch_summary(by_status, n_files, output_dir, report_path, parse_cache_path,
+                         cache_entries, skipped_statuses=None, dataset=None, n_duplicates=None,
+                         n_fallbacks=None, quarantine_dir=None):
+    """
+    Print the batch summary and append the failed / no-methods file lists.
+    `skipped_statuses` counts the inputs skipped as unchanged by their
+    recorded status; the other counts are about this run's extractions.
+    """
+    print("")
+    print("=" * 50)
+    print("SUMMARY")
+    print("=" * 50)
+    no_methods = by_status['no-methods'] + by_status['supplementary-only']
+    n_success = sum(len(by_status[status]) for status in METHODS_STATUSES)
+    print(f"Successfully processed: {n_success} "
+          f"({len(by_status['main-fallback'])} main body fallback, "
+          f"{len(by_status['supplementary-methods'])} from converted supplements)")
+    print(f"Online only:            {len(by_status['online-only'])}")
+    print(f"No methods section:     {len(no_methods)} "
+          f"({len(by_status['supplementary-only'])} in supplementary files)")
+    print(f"Failed:                 {len(by_status['failed'])}")
+    if 'failed-validation' in by_status:
+        moved = f" (outputs in {quarantine_dir})" if quarantine_dir else ""
+        print(f"Failed validation:      {len(by_status['failed-validation'])}{moved}")
+    if skipped_statuses is not None:
+        recorded = ', '.join(f"{n} {status}" for status, n in skipped_statuses.most_common())
+        print(f"Skipped (unchanged):    {sum(skipped_statuses.values())}"
+              + (f" (recorded: {recorded})" if recorded else ""))
+    if n_duplicates:
+        print(f"Duplicates skipped:     {n_duplicates} (same paper in a preferred source; "
+              f"see {output_dir / DUPLICATES_LOG})")
+    if n_fallbacks:
+        print(f"Fallback sources:       {n_fallbacks} (preferred source had no methods section)")
+    print(f"Total files:            {n_files}")
+    print("")
+    print(f"Output files saved to: {output_dir}")
+    print(f"Run report (JSONL):    {report_path}")
+    if dataset is not None:
+        print(f"Methods dataset:       {dataset.path.parent} ({dataset.n_rows} rows added)")
+    if cache_entries is not None:
+        n_repaired = len(parse_cache.parse_hints(cache_entries))
+        print(f"Parse cache: {parse_cache_path} ({n_repaired} malformed files known; "
+              f"per-publisher report: python3 parse_cache.py {parse_cache_path})")
+
+    if by_status['failed']:
+        failed_list = output_dir / 'failed_files.txt'
+        with open(failed_list, 'a', encoding='utf-8') as f:
+            f.writelines(f"{xml_file}\n" for xml_file in by_status['failed'])
+        print("")
+        print(f"Failed files list saved to: {failed_list}")
+        print("Failed files:")
+        for xml_file in by_status['failed']:
+            print(f"  - {xml_file}")
+
+    if no_methods:
+        no_methods_list = output_dir / 'no_methods_files.txt'
+        with open(no_methods_list, 'a', encoding='utf-8') as f:
+            f.writelines(f"{xml_file}\n" for xml_file in no_methods)
+        print("")
+        print(f"No methods section list saved to: {no_methods_list}")
+
+
+# Profile table of a batch run with --profile, in the output folder
+PROFILE_SUMMARY = 'profile_summary.log'
+
+
+def _report_profile(profiles, output_dir, profile_top=0, **extract_options):
+    """
+    Print the profile table of a batch run (also saved to
+    output_dir/PROFILE_SUMMARY, not a .txt file so nothing that reads the
+    *.txt outputs takes it for an article); with profile_top, re-run that
+    many of the slowest files under cProfile (dumps in output_dir/profiles).
+    `extract_options` are the extract_methods_section keyword arguments of
+    the batch run, so the re-run does the same work as the profiled one.
+    """
+    lines = profiling.summary_lines(profiles)
+    if profile_top:
+        slowest = [rec['input'] for rec in profiling.slowest(profiles, profile_top)]
+        lines += [""] + profiling.profile_slowest(
+            partial(extract_methods_section, **extract_options), slowest,
+            output_dir / 'profiles')
+    summary_path = output_dir / PROFILE_SUMMARY
+    summary_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    print("")
+    print('\n'.join(lines))
+    print("")
+    print(f"Profile saved to: {summary_path} (per-file stages in the run report)")
+
+
+# Log of inputs skipped as duplicates of a paper in a preferred source
+DUPLICATES_LOG = 'duplicate_sources.tsv'
+
+
+def process_directory(input_dir, output_dir, workers=None, split_bioc=False, formats=None,
+                      parser='auto', parse_cache_path=None, force=False, report_path=None,
+                      dataset_dir=None, source_preference=source_resolver.DEFAULT_PREFERENCE,
+                      id_mapping=None, profile=False, profile_top=0, sections=None,
+                      layout='flat', supplement_dir=None, validators=None, quarantine_dir=None):
+    """
+    Extract methods sections from every *.xml file in input_dir.
+
+    Files are processed over a process pool (workers=1 runs in-process),
+    so the interpreter start-up and imports are paid once per worker rather
+    than once per file.  Prints the same per-file progress and summary as
+    batch_process_methods.sh and appends failed / no-methods file lists to
+    output_dir.  With split_bioc, *_bioc.xml collections are streamed and
+    written as one output per <document> (see write_bioc_documents).
+    Files are bucketed by sniffed format first; `formats` restricts the run
+    to some of them (e.g. {'tei'}).
+
+    With parse_cache_path, the parse strategy of every file is recorded in
+    that cache (see parse_cache.py) and files known to be malformed are
+    parsed with the strategy that worked for them last time.
+
+    Runs are incremental: an extraction manifest in output_dir (see
+    extraction_manifest.py) records each input's hash, status and outputs,
+    and inputs unchanged since a run with the same EXTRACTOR_VERSION and
+    options are skipped, unless that extraction failed (force=True
+    re-extracts everything).  Outputs of
+    deleted inputs, or superseded by a re-extraction, are listed in
+    output_dir/stale_outputs.txt.
+
+    One JSON record per input (run_report_record; unchanged inputs get a
+    short record with 'skipped': true, their publisher and extractor
+    version and their last validation results)
+    is written to report_path, by
+    default output_dir/extraction_report.jsonl, replacing the previous
+    run's report.
+
+    With dataset_dir, every extracted input (not the skipped ones, whose
+    rows are already there) is also added as a row to that Parquet methods
+    dataset (see methods_dataset.py), alongside the *_methods.txt files.
+
+    A paper present in several sources (e.g. {pmid}.xml, {pmid}_bioc.xml
+    and {pmid}.pdf.tei.xml) is extracted once, from the source whose format
+    comes first in source_preference (see source_resolver.py; id_mapping
+    maps PMCID file names to PMIDs, None disables the check), or from the
+    next source if that one has no methods text (status not in
+    METHODS_STATUSES).  The skipped
+    inputs are logged in output_dir/duplicate_sources.tsv; outputs they
+    produced in earlier runs are reported as stale, and their dataset rows
+    are replaced by rows with status 'duplicate'.
+
+    With profile, per-stage timings and counters (profiling.py) are added
+    to the run report and an aggregate table of the slowest stages and
+    files is printed; profile_top re-runs that many of the slowest files
+    under cProfile.
+
+    `sections` chooses the section views written per article (see
+    extract_sections and write_sections); by default only the methods.
+    Progress, summary and dataset rows are always about the methods.
+    `layout` is the output layout (LAYOUTS: flat text, blank-line
+    separated paragraphs or JSON paragraph records); dataset rows always
+    hold the flat text.
+
+    With supplement_dir, articles whose methods are only in a supplementary
+    file are extracted from its BioC conversion in
+    supplement_dir/{PMCID}/, if there (status 'supplementary-methods',
+    output {name}_methods_supp.txt).  Inputs recorded as
+    'supplementary-only' are then always re-extracted, in case their
+    supplement has been converted since.
+
+    `validators` (see validate_text) check every methods text in memory
+    before it is written; their results go to the run report, and with
+    quarantine_dir the outputs of texts that fail are written to that
+    folder instead of output_dir, and their dataset rows have status
+    'quarantined' and no text.  Streamed BioC collections (split_bioc)
+    are not validated.
+
+    Returns a dictionary of status -> list of input files, plus 'skipped'
+    for the unchanged inputs and, with validators, 'failed-validation'.
+    """
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    xml_files = sorted(str(f) for f in input_dir.glob('*.xml'))
+    if not xml_files:
+        print(f"No XML files found in {input_dir}")
+        return None
+
+    buckets = bucket_by_format(xml_files)
+    if formats:
+        xml_files = sorted(f for fmt in formats for f in buckets.get(fmt, []))
+        if not xml_files:
+            print(f"No {'/'.join(sorted(formats))} XML files found in {input_dir}")
+            return None
+
+    print(f"Processing XML files in: {input_dir}")
+    print(f"Output will be saved to: {output_dir}")
+    print("Formats: " + ", ".join(
+        f"{fmt} {len(files)}" for fmt, files in sorted(buckets.items())
+    ))
+    print("")
+
+    # Resolve duplicates over every source in the folder, so a restricted
+    # --formats run never extracts a paper already taken from another source.
+    # A paper's sources are tried best first: the next one is extracted only
+    # when those before it turned out to have no methods text.
+    run_files = set(xml_files)
+    groups = {}
+    if source_preference:
+        ungrouped, groups = source_resolver.ranked_groups(buckets, output_name_for, id_mapping,
+                                                          source_preference)
+        xml_files = sorted(f for f in ungrouped if f in run_files)
+
+    manifest = extraction_manifest.load_manifest(output_dir)
+    options = {'parser': parser, 'split_bioc': split_bioc}
+    if sections:
+        options['sections'] = list(sections)
+    if layout != 'flat':
+        options['layout'] = layout
+    if supplement_dir:
+        options['supplement_dir'] = str(supplement_dir)
+    if validators:
+        options['validators'] = sorted(validators)
+    if quarantine_dir:
+        options['quarantine_dir'] = str(quarantine_dir)
+        Path(quarantine_dir).mkdir(parents=True, exist_ok=True)
+
+    # Status of every input of this run, extracted or skipped as unchanged
+    statuses = {}
+
+    def source_status(xml_file):
+        if xml_file in run_files:
+            return statuses.get(xml_file)
+        status = (manifest.get(extraction_manifest.input_key(xml_file)) or {}).get('status')
+        return None if status == 'duplicate' else status
+
+    def chosen_source(candidates):
+        """First of a paper's inputs not known to lack methods text (None if all do)."""
+        for xml_file in candidates:
+            status = source_status(xml_file)
+            if status is None or status in METHODS_STATUSES:
+                return xml_file
+        return None
+
+    def pending_sources():
+        return sorted(xml_file for xml_file in map(chosen_source, groups.values())
+                      if xml_file in run_files and xml_file not in statuses)
+
+    by_status = {status: [] for status in _BATCH_LABELS}
+    if validators:
+        by_status['failed-validation'] = []
+
+    cache_entries = parse_cache.load_cache(parse_cache_path) if parse_cache_path else None
+    hints = parse_cache.parse_hints(cache_entries) if cache_entries else None
+
+    report_path = Path(report_path) if report_path else output_dir / 'extraction_report.jsonl'
+    report_file = open(report_path, 'w', encoding='utf-8')
+    dataset = methods_dataset.DatasetWriter(dataset_dir) if dataset_dir else None
+    profiles = [] if profile else None
+    report = _batch_recorder(by_status, report_file, cache_entries, dataset, profiles)
+    skipped = []
+    skipped_statuses = Counter()
+
+    def record(rec):
+        report(rec)
+        xml_file, status = rec['input'], rec['status']
+        statuses[xml_file] = status
+        sha1 = rec['parse']['sha1'] if rec['parse'] else None
+        details = {'format': rec['format'], 'word_count': rec['word_count'],
+                   'publisher': (rec['parse'] or {}).get('publisher')}
+        if 'validation' in rec:
+            details['validation'] = rec['validation']
+        extraction_manifest.record(manifest, xml_file, sha1 or _hash_file(xml_file), status,
+                                   rec['outputs'], EXTRACTOR_VERSION, options, details=details)
+
+    def skip(xml_file):
+        entry = manifest[extraction_manifest.input_key(xml_file)]
+        skipped.append(xml_file)
+        skipped_statuses[entry['status']] += 1
+        statuses[xml_file] = entry['status']
+        rec = {
+            'input': xml_file, 'status': entry['status'], 'format': entry.get('format'),
+            'word_count': entry.get('word_count'), 'outputs': entry['outputs'],
+            'parse': {'publisher': entry.get('publisher')},
+            'extractor_version': entry['extractor_version'], 'skipped': True,
+        }
+        if 'validation' in entry:
+            rec['validation'] = entry['validation']
+        report_file.write(json.dumps(rec) + '\n')
+
+    process_file = partial(_process_batch_file, output_dir=output_dir,
+                           split_bioc=split_bioc, parser=parser, parse_hints=hints,
+                           with_rows=dataset is not None, profile=profile,
+                           sections=sections, layout=layout, supplement_dir=supplement_dir,
+                           validators=validators, quarantine_dir=quarantine_dir)
+
+    def extract(files):
+        to_process = []
+        n_skipped = len(skipped)
+        for xml_file in files:
+            entry = manifest.get(extraction_manifest.input_key(xml_file))
+            if force or (supplement_dir and entry and entry['status'] == 'supplementary-only'):
+                to_process.append(xml_file)
+            elif extraction_manifest.is_current(entry, xml_file, EXTRACTOR_VERSION, options,
+                                                _hash_file):
+                skip(xml_file)
+            else:
+                to_process.append(xml_file)
+        if len(skipped) > n_skipped:
+            print(f"Skipping {len(skipped) - n_skipped} unchanged files (extraction manifest; "
+                  f"--force to redo)")
+            print("")
+        if workers == 1:
+            for xml_file in to_process:
+                record(process_file(xml_file))
+        elif to_process:
+            from concurrent.futures import ProcessPoolExecutor
+            n_workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                chunksize = max(1, min(64, len(to_process) // (n_workers * 4)))
+                for result in pool.map(process_file, to_process, chunksize=chunksize):
+                    record(result)
+
+    duplicates = []
+    n_fallbacks = 0
+    try:
+        files = sorted(xml_files + pending_sources())
+        while files:
+            extract(files)
+            files = pending_sources()
+
+        # The sources of a paper after the one its text came from (or that
+        # was never extracted) are duplicates; sources tried before it had
+        # no methods text and keep their own entries
+        for key, candidates in groups.items():
+            kept = chosen_source(candidates)
+            if kept is None:
+                continue
+            n_fallbacks += kept != candidates[0] and kept in statuses
+            duplicates.extend((key, kept, xml_file)
+                              for xml_file in candidates[candidates.index(kept) + 1:]
+                              if xml_file not in statuses)
+        duplicates.sort()
+        if source_preference:
+            source_resolver.write_duplicates(output_dir / DUPLICATES_LOG, duplicates)
+        for _, _, xml_file in duplicates:
+            entry = manifest.get(extraction_manifest.input_key(xml_file))
+            if extraction_manifest.mark_duplicate(manifest, xml_file) and dataset is not None:
+                dataset.add(dataset_row(output_name_for(xml_file), xml_file,
+                                        {'format': entry.get('format'), 'status': 'duplicate',
+                                         'word_count': 0}))
+    finally:
+        # Save what was done so far even if the run is interrupted
+        report_file.close()
+        if dataset is not None:
+            dataset.close()
+        stale = extraction_manifest.stale_outputs(manifest, input_dir)
+        extraction_manifest.save_manifest(output_dir, manifest)
+        if cache_entries is not None:
+            parse_cache.save_cache(parse_cache_path, cache_entries)
+
+    _print_batch_summary(by_status, len(statuses), output_dir, report_path, parse_cache_path,
+                         cache_entries, skipped_statuses=skipped_statuses, dataset=dataset,
+                         n_duplicates=len(duplicates), n_fallbacks=n_fallbacks,
+                         quarantine_dir=quarantine_dir)
+    if profiles:
+        _report_profile(profiles, output_dir, profile_top, parser=parser, parse_hints=hints,
+                        sections=sections, paragraphs=layout != 'flat',
+                        supplement_dir=supplement_dir, validators=validators)
+
+    stale_list = output_dir / 'stale_outputs.txt'
+    if stale:
+        stale_list.write_text(''.join(f"{path}\n" for path in stale), encoding='utf-8')
+        print("")
+        print(f"{len(stale)} stale outputs (input deleted, re-extracted under another "
+              f"name or now a duplicate source) listed in: {stale_list}")
+    elif stale_list.exists():
+        stale_list.unlink()
+
+    by_status['skipped'] = skipped
+    return by_status
+
+
+def iter_archive_members(archive_path, formats=None):
+    """
+    Yield (member name, content) for every *.xml / *.nxml file in a tar
+    archive (plain or compressed: PMC OA .tar.gz packages, a tarball of
+    GROBID .pdf.tei.xml output) or a zip bundle.
+
+    Members are read one at a time (tar archives as a stream), and other
+    members (PDFs, figures) are never read into memory.  `formats` keeps
+    only members of those sniffed formats.
+    """
+    def wanted(name, data):
+        return not formats or sniff_xml_format(name, head=data) in formats
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as bundle:
+            for member in bundle.infolist():
+                if member.is_dir() or not member.filename.endswith(ARCHIVE_MEMBER_SUFFIXES):
+                    continue
+                data = bundle.read(member)
+                if wanted(member.filename, data):
+                    yield member.filename, data
+        return
+
+    with tarfile.open(archive_path, 'r|*') as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.endswith(ARCHIVE_MEMBER_SUFFIXES):
+                continue
+            data = tar.extractfile(member).read()
+            if wanted(member.name, data):
+                yield member.name, data
+
+
+def process_archive(archive_path, output_dir, workers=None, formats=None, parser='auto',
+                    parse_cache_path=None, report_path=None, dataset_dir=None, profile=False,
+                    sections=None, layout='flat', supplement_dir=None, validators=None,
+                    quarantine_dir=None):
+    """
+    Extract methods sections from every *.xml / *.nxml member of a tar
+    archive or zip bundle (see iter_archive_members).
+
+    Like process_directory, but members are read from the archive in the
+    main process and handed to the workers as bytes, a few at a time, so
+    nothing is unpacked to disk.  Outputs are named after the article's
+    PMCID or PMID ({id}_methods.txt), or the member's file name if it has
+    neither; a member whose name is already taken gets a distinct one
+    (_name_archive_members) and a 'name_collision' in its report record.
+    Report records name inputs as '{archive}/{member}'.  There is
+    no extraction manifest (an archive is processed whole).  dataset_dir
+    is a Parquet methods dataset to add every member's row to; profile,
+    sections, layout, supplement_dir, validators and quarantine_dir work as
+    in process_directory (without the cProfile re-run, since members are
+    not kept).
+
+    Returns a dictionary of status -> list of inputs, or None if the
+    archive has no matching members.
+    """
+    archive_path = Path(archive_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Processing XML files in: {archive_path}")
+    print(f"Output will be saved to: {output_dir}")
+    print("")
+
+    by_status = {status: [] for status in _BATCH_LABELS}
+    if validators:
+        by_status['failed-validation'] = []
+    if quarantine_dir:
+        Path(quarantine_dir).mkdir(parents=True, exist_ok=True)
+    cache_entries = parse_cache.load_cache(parse_cache_path) if parse_cache_path else None
+    hints = parse_cache.parse_hints(cache_entries) if cache_entries else None
+    report_path = Path(report_path) if report_path else output_dir / 'extraction_report.jsonl'
+    report_file = open(report_path, 'w', encoding='utf-8')
+    dataset = methods_dataset.DatasetWriter(dataset_dir) if dataset_dir else None
+    profiles = [] if profile else None
+    report = _batch_recorder(by_status, report_file, cache_entries, dataset, profiles)
+
+    process_member = partial(_process_batch_member, output_dir=output_dir,
+                             parser=parser, parse_hints=hints, with_rows=dataset is not None,
+                             profile=profile, sections=sections, layout=layout,
+                             supplement_dir=supplement_dir, validators=validators,
+                             quarantine_dir=quarantine_dir)
+    n_files = 0
+    try:
+        members = _name_archive_members(iter_archive_members(archive_path, formats))
+        for rec in _map_bounded(process_member, members, workers):
+            rec['input'] = f"{archive_path}/{rec['input']}"
+            for row in rec.get('rows', ()):
+                row['input'] = rec['input']
+            report(rec)
+            n_files += 1
+    finally:
+        report_file.close()
+        if dataset is not None:
+            dataset.close()
+        if cache_entries is not None:
+            parse_cache.save_cache(parse_cache_path, cache_entries)
+
+    if not n_files:
+        print(f"No XML files found in {archive_path}")
+        return None
+
+    _print_batch_summary(by_status, n_files, output_dir, report_path, parse_cache_path,
+                         cache_entries, dataset=dataset, quarantine_dir=quarantine_dir)
+    if profiles:
+        _report_profile(profiles, output_dir)
+    return by_status
+
+
+def _hash_file(xml_file):
+    return parse_cache.content_hash(Path(xml_file).read_bytes())
+
+
+def _append_report(report_path, record):
+    with open(report_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def _write_single_file_sections(args, result, sections):
+    """Single-file --sections: write the views to the -o folder, or print them."""
+    output_paths = []
+    if args.output:
+        Path(args.output).mkdir(parents=True, exist_ok=True)
+        output_paths = write_sections(args.output, output_name_for(args.input_file), result,
+                                      sections, args.layout)
+        for output_path in output_paths:
+            print(f"Section extracted to: {output_path}")
+    else:
+        for name in sections:
+            text = result['sections'][name]
+            if text is not None:
+                paragraphs = result.get('section_paragraphs', {}).get(name)
+                print(f"## {name}\n{format_output(text, paragraphs, args.layout)}\n")
+    found = any(text is not None for text in result['sections'].values())
+    if args.report:
+        _append_report(args.report, run_report_record(args.input_file, result, output_paths))
+    if not found:
+        print("None of the requested sections found in the XML file.", file=sys.stderr)
+    sys.exit(0 if found else 1)
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description='Extract methods section from JATS XML files'
+        description='Extract methods section from JATS, TEI and BioC XML files'
     )
     parser.add_argument(
         'input_file',
-        help='Path to the input JATS XML file'
+        nargs='?',
+        help='Path to the input XML file'
     )
     parser.add_argument(
         '-o', '--output',
         help='Path to the output text file (if not specified, prints to stdout)'
     )
+    parser.add_argument(
+        '--input-dir',
+        help='Process every *.xml file in this folder (batch mode)'
+    )
+    parser.add_argument(
+        '--input-archive',
+        help='Process every *.xml / *.nxml member of this archive (.tar, .tar.gz, .tgz or '
+             '.zip; e.g. a PMC OA package) without unpacking it.  Outputs are named '
+             'after the PMCID / PMID'
+    )
+    parser.add_argument(
+        '--output-dir',
+        help='Folder for *_methods.txt outputs in batch mode'
+    )
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes in batch mode (default: one per CPU; 1 = no pool)'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=['auto', 'lxml', 'etree'],
+        default='auto',
+        help='XML parser: auto = ElementTree, then lxml recover for malformed files; '
+             'lxml = always lxml recover; etree = ElementTree with namespace repair only'
+    )
+    parser.add_argument(
+        '--parse-cache',
+        help='Parse strategy cache (JSON, keyed by file content hash); malformed files '
+             'listed there skip the failing strict parse.  Batch mode default: '
+             'OUTPUT_DIR/parse_cache.json'
+    )
+    parser.add_argument(
+        '--no-parse-cache',
+        action='store_true',
+        help='Batch mode: do not read or write a parse cache'
+    )
+    parser.add_argument(
+        '--report',
+        help='Write a JSON record per input (status, format, word count, timings) to this '
+             'JSONL file.  Batch mode default: OUTPUT_DIR/extraction_report.jsonl; in '
+             'single-file mode the record is appended'
+    )
+    parser.add_argument(
+        '--dataset',
+        help='Batch mode: also add one row per article (id, format, status, is_main, text) '
+             'to this Parquet methods dataset folder, readable by the downstream scripts '
+             'instead of the *_methods.txt files (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--source-preference',
+        default=','.join(source_resolver.DEFAULT_PREFERENCE),
+        help='Batch mode: when a paper is present in several sources ({pmid}.xml, '
+             '{pmid}_bioc.xml, {pmid}.pdf.tei.xml), extract only the one whose format comes '
+             'first in this list (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--id-mapping',
+        help='Batch mode: PMID to PMCID mapping CSV (columns PMID, pmcids, e.g. '
+             'output/fulltexts/pmid_to_pmcid_mapping.csv), so {pmcid}.xml files are '
+             'matched with {pmid} files of the same paper'
+    )
+    parser.add_argument(
+        '--all-sources',
+        action='store_true',
+        help='Batch mode: extract every input, even if the same paper is present in '
+             'a preferred source'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time each stage (read, detect, parse, repair, locate, serialize, clean, write) '
+             'and count bytes, elements and cleaning passes per file; batch mode adds them '
+             'to the run report and prints the slowest stages and files'
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Batch mode (folder input): re-run the N slowest files under cProfile '
+             '(implies --profile; dumps in OUTPUT_DIR/profiles)'
+    )
+    parser.add_argument(
+        '--sections',
+        help='Section views to write, comma-separated, from one parse per article: '
+             + ', '.join(SECTION_NAMES) + ' (default: methods).  Methods go to '
+             '{name}_methods.txt as usual, other views to a subfolder per section '
+             '(OUTPUT_DIR/results/{name}_results.txt); in single-file mode -o is then '
+             'an output folder, and without -o the views are printed.  The status, '
+             'summary and dataset rows are always about the methods'
+    )
+    parser.add_argument(
+        '--layout',
+        choices=LAYOUTS,
+        default='flat',
+        help='Output layout: flat = one run of text (default); paragraphs = one paragraph '
+             'per blank-line separated block, section titles on their own line; json = '
+             'a JSON list of {"section", "text"} paragraph records ({name}_methods.json)'
+    )
+    parser.add_argument(
+        '--supplement-dir',
+        help='Folder of supplements downloaded with download_pmc_supplements_aws.sh and '
+             f'converted to BioC with convert_supplements.sh (e.g. {SUPPLEMENT_DIR}): '
+             'when the methods are only in a supplementary file, extract them from '
+             '{PMCID}/{file}.xml there and write {name}_methods_supp.txt'
+    )
+    parser.add_argument(
+        '--validate',
+        action='store_true',
+        help='Run the check_methods_processing.py checks on each methods text before it '
+             'is written, in memory; results go to the run report (see check_results.py '
+             'for the corpus report)'
+    )
+    parser.add_argument(
+        '--quarantine',
+        metavar='DIR',
+        help='Batch mode: write the outputs of texts that fail validation to this folder '
+             'instead of the output folder, and leave their text out of --dataset '
+             '(implies --validate)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Batch mode: re-extract every file, even if the extraction manifest '
+             'shows it unchanged'
+    )
+    parser.add_argument(
+        '--formats',
+        help='Batch mode: only process these sniffed formats (comma-separated, '
+             'e.g. jats,tei)'
+    )
+    parser.add_argument(
+        '--sniff-only',
+        action='store_true',
+        help='Batch mode: list each file with its sniffed format and exit '
+             '(no XML parsing)'
+    )
+    parser.add_argument(
+        '--split-bioc',
+        action='store_true',
+        help='Stream BioC collections and write one {document id}_bioc_methods.txt '
+             'per <document> (-o is then an output folder)'
+    )
     
     args = parser.parse_args()
+    if args.profile_top:
+        args.profile = True
+    sections = None
+    if args.sections:
+        sections = tuple(args.sections.split(','))
+        unknown = [name for name in sections if name not in SECTION_NAMES]
+        if unknown:
+            parser.error(f"unknown sections: {', '.join(unknown)} "
+                         f"(choose from {', '.join(SECTION_NAMES)})")
+        if sections == ('methods',):
+            sections = None
+
+    if args.dataset and methods_dataset.pa is None:
+        print("Error: --dataset requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        sys.exit(1)
+
+    validators = None
+    if args.validate or args.quarantine:
+        validators = preprocessing_validators()
+        if args.split_bioc:
+            print("Warning: streamed BioC collections (--split-bioc) are written without "
+                  "validation", file=sys.stderr)
+
+    if args.input_archive:
+        if not Path(args.input_archive).is_file():
+            print(f"Error: Input archive '{args.input_archive}' does not exist", file=sys.stderr)
+            sys.exit(1)
+        if not args.output_dir:
+            parser.error('--input-archive requires --output-dir')
+        formats = set(args.formats.split(',')) if args.formats else None
+        parse_cache_path = None
+        if not args.no_parse_cache:
+            parse_cache_path = args.parse_cache or str(Path(args.output_dir) / 'parse_cache.json')
+        by_status = process_archive(args.input_archive, args.output_dir, workers=args.workers,
+                                    formats=formats, parser=args.parser,
+                                    parse_cache_path=parse_cache_path, report_path=args.report,
+                                    dataset_dir=args.dataset, profile=args.profile,
+                                    sections=sections, layout=args.layout,
+                                    supplement_dir=args.supplement_dir, validators=validators,
+                                    quarantine_dir=args.quarantine)
+        sys.exit(0 if by_status is not None else 1)
+
+    if args.input_dir:
+        if not Path(args.input_dir).is_dir():
+            print(f"Error: Input folder '{args.input_dir}' does not exist", file=sys.stderr)
+            sys.exit(1)
+        if args.sniff_only:
+            xml_files = sorted(str(f) for f in Path(args.input_dir).glob('*.xml'))
+            for fmt, files in sorted(bucket_by_format(xml_files).items()):
+                for xml_file in files:
+                    print(f"{fmt}\t{xml_file}")
+            sys.exit(0)
+        if not args.output_dir:
+            parser.error('--input-dir requires --output-dir')
+        formats = set(args.formats.split(',')) if args.formats else None
+        parse_cache_path = None
+        if not args.no_parse_cache:
+            parse_cache_path = args.parse_cache or str(Path(args.output_dir) / 'parse_cache.json')
+        source_preference = None if args.all_sources else args.source_preference.split(',')
+        id_mapping = None
+        if args.id_mapping:
+            if not Path(args.id_mapping).is_file():
+                print(f"Error: ID mapping file '{args.id_mapping}' does not exist", file=sys.stderr)
+                sys.exit(1)
+            id_mapping = source_resolver.load_id_mapping(args.id_mapping)
+        by_status = process_directory(args.input_dir, args.output_dir,
+                                      workers=args.workers, split_bioc=args.split_bioc,
+                                      formats=formats, parser=args.parser,
+                                      parse_cache_path=parse_cache_path, force=args.force,
+                                      report_path=args.report, dataset_dir=args.dataset,
+                                      source_preference=source_preference,
+                                      id_mapping=id_mapping, profile=args.profile,
+                                      profile_top=args.profile_top, sections=sections,
+                                      layout=args.layout, supplement_dir=args.supplement_dir,
+                                      validators=validators, quarantine_dir=args.quarantine)
+        sys.exit(0 if by_status is not None else 1)
+
+    if not args.input_file:
+        parser.error('an input file, --input-dir or --input-archive is required')
+
+    if args.split_bioc:
+        if not args.output:
+            parser.error('--split-bioc requires -o OUTPUT_FOLDER')
+        Path(args.output).mkdir(parents=True, exist_ok=True)
+        status, output_paths, _ = write_bioc_documents(args.input_file, args.output)
+        for output_path in output_paths:
+            print(f"Methods section extracted to: {output_path}")
+        if not output_paths:
+            print("No methods section found in the XML file.", file=sys.stderr)
+        sys.exit(0 if output_paths else 1)
     
     # Extract methods section
-    result = extract_methods_section(args.input_file)
+    if args.profile:
+        enable_profiling()
+    cache_entries = parse_cache.load_cache(args.parse_cache) if args.parse_cache else None
+    result = extract_methods_section(
+        args.input_file, parser=args.parser,
+        parse_hints=parse_cache.parse_hints(cache_entries) if cache_entries else None,
+        sections=sections, paragraphs=args.layout != 'flat',
+        supplement_dir=args.supplement_dir, validators=validators,
+    )
+    if args.profile:
+        print('\n'.join(profiling.summary_lines([run_report_record(args.input_file, result, [])])),
+              file=sys.stderr)
+    if cache_entries is not None:
+        parse_cache.record(cache_entries, result['parse'], args.input_file)
+        parse_cache.save_cache(args.parse_cache, cache_entries)
+    for name, outcome in result.get('validation', {}).items():
+        if not outcome['passed']:
+            print(f"Warning: methods text failed {name} validation: "
+                  f"{'; '.join(outcome.get('issues', []))}", file=sys.stderr)
+    if sections:
+        _write_single_file_sections(args, result, sections)
+
     methods_text = result['text']
     is_main = result['is_main']
     
+    if methods_text is not None:
+        methods_text = format_output(methods_text, result.get('paragraphs'), args.layout)
+
     if methods_text is None:
+        if args.report:
+            _append_report(args.report, run_report_record(args.input_file, result, []))
         print("No methods section found in the XML file.", file=sys.stderr)
         sys.exit(1)
         
@@ -1153,18 +3225,23 @@ def main():
         output_path = Path(args.output)
         # If this is Nature Genetics main fallback, add '_main' before file extension
         if is_main:
-            stem = output_path.stem
-            suffix = output_path.suffix
-            output_path = output_path.parent / f"{stem}_main{suffix}"
+            output_path = main_output_path(output_path)
+        elif result['status'] == 'supplementary-methods':
+            output_path = supp_output_path(output_path)
 
         # NOTE: naming for .pdf.tei.xml inputs (-> *_pdf_tei_methods.txt) is
-        # handled by the caller (batch_process_methods.sh). Keep the output
-        # path unchanged here so the caller can rely on what it passed in.
+        # handled by the caller (batch_process_methods.sh / output_name_for).
+        # Keep the output path unchanged here so the caller can rely on what
+        # it passed in.
 
         output_path.write_text(methods_text, encoding='utf-8')
         print(f"Methods section extracted to: {output_path}")
     else:
         print(methods_text)
+
+    if args.report:
+        output_paths = [output_path] if args.output else []
+        _append_report(args.report, run_report_record(args.input_file, result, output_paths))
         
 
 
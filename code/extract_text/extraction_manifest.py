@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Manifest of what a batch extraction run produced, kept in the output folder.
+
+For every input file (keyed by its resolved path) the manifest records the
+content hash, size and mtime, the status, the output path(s) written and the
+extractor version and options the outputs were produced with.  A later run
+over the same output folder skips inputs whose entry is still current:
+
+  - same extractor version (extract_methods.EXTRACTOR_VERSION) and options
+  - same content: size and mtime unchanged, or else the same SHA-1
+  - every recorded output still exists
+  - the extraction did not fail (status 'failed' may have been a transient
+    worker error, so failed inputs are retried on every run)
+
+Outputs that no longer correspond to an input (the input was deleted, a
+re-extraction wrote a different file name, or the input is now skipped as
+a duplicate of the same paper in another source) are reported as stale;
+they are listed, not deleted.
+
+Several input folders may share one output folder, so stale-input checks
+only look at entries from the input folder being processed.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+MANIFEST_NAME = 'extraction_manifest.json'
+
+# Statuses whose entries are never current: the input is extracted again
+RETRY_STATUSES = ('failed',)
+
+
+def manifest_path_for(output_dir):
+    return Path(output_dir) / MANIFEST_NAME
+
+
+def load_manifest(output_dir):
+    """Manifest entries by resolved input path ({} if there is no manifest)."""
+    path = manifest_path_for(output_dir)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['files']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: ignoring unreadable manifest {path} ({e})", file=sys.stderr)
+        return {}
+
+
+def save_manifest(output_dir, entries):
+    """Write the manifest atomically."""
+    path = manifest_path_for(output_dir)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'files': entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def input_key(xml_file):
+    return str(Path(xml_file).resolve())
+
+
+def is_current(entry, xml_file, version, options, hash_file):
+    """
+    True if `entry` still describes `xml_file` under this extractor version
+    and options, and its extraction did not fail (RETRY_STATUSES).  `hash_file(xml_file)` is only called when the size or
+    mtime changed; if the content is in fact unchanged, the entry's stat
+    fields are refreshed so the next run does not hash it again.
+    """
+    if not entry or entry.get('extractor_version') != version or entry.get('options') != options:
+        return False
+    if entry.get('status') in RETRY_STATUSES:
+        return False
+    if not all(Path(p).exists() for p in entry['outputs']):
+        return False
+    st = os.stat(xml_file)
+    if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return True
+    if hash_file(xml_file) != entry['sha1']:
+        return False
+    entry['size'], entry['mtime_ns'] = st.st_size, st.st_mtime_ns
+    return True
+
+
+def record(entries, xml_file, sha1, status, output_paths, version, options, details=None):
+    """
+    Store the result of extracting `xml_file`, plus any `details` (e.g.
+    format, publisher and word count, so unchanged files can still be
+    reported).
+
+    Outputs of the previous entry that this run did not rewrite (e.g. a
+    '_methods_main.txt' that is now a '_methods.txt') are kept in the
+    entry as 'stale_outputs'.
+    """
+    key = input_key(xml_file)
+    output_paths = [str(Path(p).resolve()) for p in output_paths]
+    previous = entries.get(key) or {}
+    stale = [
+        p for p in previous.get('outputs', []) + previous.get('stale_outputs', [])
+        if p not in output_paths
+    ]
+    st = os.stat(xml_file)
+    entries[key] = {
+        'sha1': sha1,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'status': status,
+        'outputs': output_paths,
+        'extractor_version': version,
+        'options': options,
+    }
+    if details:
+        entries[key].update(details)
+    if stale:
+        entries[key]['stale_outputs'] = stale
+
+
+def mark_duplicate(entries, xml_file):
+    """
+    Record that `xml_file` is now skipped as a duplicate of the same paper
+    in a preferred source: its outputs become stale, and the entry is no
+    longer current, so the file is extracted again if it becomes the
+    preferred source.  Returns False if the input has no entry to update.
+    """
+    entry = entries.get(input_key(xml_file))
+    if not entry or entry['status'] == 'duplicate':
+        return False
+    stale = entry['outputs'] + entry.get('stale_outputs', [])
+    entry.update(status='duplicate', outputs=[])
+    entry.pop('extractor_version', None)
+    if stale:
+        entry['stale_outputs'] = stale
+    return True
+
+
+def stale_outputs(entries, input_dir):
+    """
+    Existing output files from `input_dir` that no longer correspond to an
+    input: all outputs of deleted inputs, plus outputs replaced by a later
+    extraction.  Entries of deleted inputs whose outputs are all gone are
+    dropped from `entries`.
+    """
+    input_dir = Path(input_dir).resolve()
+    stale = []
+    for key in list(entries):
+        if Path(key).parent != input_dir:
+            continue
+        entry = entries[key]
+        candidates = entry.get('stale_outputs', [])
+        if not Path(key).exists():
+            candidates = entry['outputs'] + candidates
+        existing = [p for p in candidates if Path(p).exists()]
+        if not Path(key).exists() and not existing:
+            del entries[key]
+            continue
+        if 'stale_outputs' in entry:
+            entry['stale_outputs'] = [p for p in entry['stale_outputs'] if Path(p).exists()]
+            if not entry['stale_outputs']:
+                del entry['stale_outputs']
+        stale.extend(existing)
+    return sorted(stale)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Parquet dataset of extracted methods text, one row per article.
+
+An alternative to reading thousands of small *_methods.txt files: batch
+runs of extract_methods.py with --dataset DIR also append their results to
+DIR, and the downstream scripts (check_methods_processing.py,
+spacy_obtain_sentences.py) can read DIR directly.
+
+Each run writes one part file, DIR/part-<time>-<pid>.parquet, in row groups
+of ROW_GROUP_SIZE rows; the part is renamed into place when the run ends,
+so readers never see a half-written file.  Columns:
+  - id:        article name (PMCID / PMID for archive members, else the
+               input file name as in the *_methods.txt output; BioC
+               document id with --split-bioc)
+  - input:     input file (or '{archive}/{member}')
+  - format:    'jats', 'tei', 'bioc' or None
+  - status:    extract_methods_section status ('success', 'no-methods', ...),
+               or 'quarantined' if the text failed validation
+               (extract_methods.py --quarantine)
+  - is_main:   the text is the Nature Genetics body fallback
+  - word_count
+  - text:      methods text, or None if nothing was extracted or the text
+               was quarantined; readers skip rows without text
+  - extractor_version
+
+An incremental run only writes rows for the inputs it re-extracted, so
+iter_rows reads the newest part first and yields each (input, id) once:
+the latest row wins.
+
+Requires pyarrow (optional for extract_methods.py unless --dataset is used).
+
+Usage:
+  python3 methods_dataset.py <dataset_dir>      (row counts by status / format)
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for the dataset sink
+    pa = pq = None
+
+# Rows buffered before a row group is written
+ROW_GROUP_SIZE = 1000
+
+COLUMNS = ('id', 'input', 'format', 'status', 'is_main', 'word_count', 'text',
+           'extractor_version')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("the methods dataset requires pyarrow (pip install pyarrow)")
+
+
+def _schema():
+    return pa.schema([
+        ('id', pa.string()),
+        ('input', pa.string()),
+        ('format', pa.string()),
+        ('status', pa.string()),
+        ('is_main', pa.bool_()),
+        ('word_count', pa.int64()),
+        ('text', pa.large_string()),
+        ('extractor_version', pa.string()),
+    ])
+
+
+def part_files(dataset_dir):
+    """Part files of a dataset, oldest first."""
+    return sorted(Path(dataset_dir).glob('part-*.parquet'))
+
+
+class DatasetWriter:
+    """
+    Writes one run's rows to a new part file of `dataset_dir`, a row group
+    at a time.  Use as a context manager, or call close(); the part only
+    appears in the dataset once closed.
+    """
+
+    def __init__(self, dataset_dir, row_group_size=ROW_GROUP_SIZE):
+        _require_pyarrow()
+        dataset_dir = Path(dataset_dir)
+        dataset_dir.mkdir(parents=True, exist_ok=True)
+        name = f"part-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.parquet"
+        self.path = dataset_dir / name
+        self._tmp_path = dataset_dir / f".{name}.tmp"
+        self._schema = _schema()
+        self._writer = pq.ParquetWriter(self._tmp_path, self._schema)
+        self._rows = []
+        self.row_group_size = row_group_size
+        self.n_rows = 0
+
+    def add(self, row):
+        """Buffer one row (a dict with the COLUMNS keys)."""
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            table = pa.Table.from_pylist(
+                [{col: row.get(col) for col in COLUMNS} for row in self._rows],
+                schema=self._schema,
+            )
+            self._writer.write_table(table)
+            self.n_rows += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        """Write the last row group and move the part into the dataset."""
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        if self.n_rows:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_rows(dataset_dir, columns=None):
+    """
+    Yield the rows of a dataset as dicts, one row group in memory at a time.
+
+    Parts are read newest first and each (input, id) is yielded once, so
+    rows re-extracted by a later run replace the earlier ones.  `columns`
+    restricts the columns read (e.g. leave out 'text' for a quick count).
+    """
+    _require_pyarrow()
+    columns = list(columns or COLUMNS)
+    read_columns = columns + [c for c in ('input', 'id') if c not in columns]
+    seen = set()
+    for part in reversed(part_files(dataset_dir)):
+        for batch in pq.ParquetFile(part).iter_batches(columns=read_columns):
+            for row in batch.to_pylist():
+                key = (row['input'], row['id'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield {col: row[col] for col in columns}
+
+
+def iter_texts(dataset_dir):
+    """Yield (id, text) for every current row that has methods text."""
+    for row in iter_rows(dataset_dir, columns=['id', 'text']):
+        if row['text'] is not None:
+            yield row['id'], row['text']
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Summarise a methods dataset written by extract_methods.py --dataset'
+    )
+    parser.add_argument('dataset', help='Dataset folder')
+    args = parser.parse_args()
+
+    if not part_files(args.dataset):
+        print(f"Error: no dataset parts in '{args.dataset}'", file=sys.stderr)
+        sys.exit(1)
+
+    by_status = Counter()
+    by_format = Counter()
+    for row in iter_rows(args.dataset, columns=['status', 'format']):
+        by_status[row['status']] += 1
+        by_format[row['format'] or 'unknown'] += 1
+
+    print(f"Parts:    {len(part_files(args.dataset))}")
+    print(f"Articles: {sum(by_status.values())}")
+    print("By status: " + ", ".join(f"{s} {n}" for s, n in by_status.most_common()))
+    print("By format: " + ", ".join(f"{f} {n}" for f, n in by_format.most_common()))
+
+
+if __name__ == '__main__':
+    main()
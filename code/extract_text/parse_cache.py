@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of how each XML file had to be parsed.
+
+Entries are keyed by the SHA-1 of the file content, so a renamed or
+re-downloaded copy of the same file hits the same entry and an edited file
+does not.  Each entry records:
+  - strategy:  'etree' (strict parse worked), 'etree-repair' (undeclared
+               namespace prefixes injected, then ElementTree), 'lxml',
+               'lxml-recover' (lxml recovered from errors) or 'failed'
+  - prefixes:  namespace prefixes that were injected / undeclared
+  - unknown_prefixes: those of them with no URI in the file or in
+               extract_methods.DEFAULT_URIS (placeholder URIs were used)
+  - publisher: <publisher-name> (or journal title) from the file header
+  - file:      name of the file the entry was last seen as
+
+extract_methods.py uses the entries of malformed files as hints, so reruns
+go straight to the strategy that worked.  Run this script on a cache file
+to print failure rates per publisher and the prefixes most worth adding
+to DEFAULT_URIS.
+
+Usage:
+  python3 parse_cache.py <parse_cache.json>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Strategies that mean the file is not well-formed XML
+REPAIRED_STRATEGIES = ('etree-repair', 'lxml-recover')
+
+
+def content_hash(data):
+    """Cache key for a file's raw bytes."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def load_cache(cache_path):
+    """Load cache entries from `cache_path`; a missing file is an empty cache."""
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable parse cache {cache_path} ({e})", file=sys.stderr)
+        return {}
+
+
+def save_cache(cache_path, entries):
+    """Write cache entries atomically (a crash never leaves a truncated cache)."""
+    cache_path = Path(cache_path)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def record(entries, parse_info, xml_file):
+    """Add or update the entry for one parsed file."""
+    if not parse_info or not parse_info.get('sha1') or not parse_info.get('strategy'):
+        return
+    entries[parse_info['sha1']] = {
+        'strategy': parse_info['strategy'],
+        'prefixes': parse_info.get('prefixes', []),
+        'unknown_prefixes': parse_info.get('unknown_prefixes', []),
+        'publisher': parse_info.get('publisher'),
+        'file': Path(str(xml_file)).name,
+    }
+
+
+def parse_hints(entries):
+    """
+    The entries worth passing to extract_methods_section as hints: files
+    that needed repair or recovery (well-formed files need no hint).
+    """
+    return {
+        sha1: entry for sha1, entry in entries.items()
+        if entry['strategy'] in REPAIRED_STRATEGIES
+    }
+
+
+def publisher_report(entries):
+    """
+    Parse outcome counts per publisher.
+
+    Returns a list of (publisher, counts) sorted by the number of files
+    that were not well-formed; counts maps each strategy to a file count
+    and 'unknown_prefixes' to a Counter of prefixes that got placeholders.
+    """
+    by_publisher = {}
+    for entry in entries.values():
+        publisher = entry.get('publisher') or 'unknown'
+        counts = by_publisher.setdefault(publisher, {'unknown_prefixes': Counter()})
+        counts[entry['strategy']] = counts.get(entry['strategy'], 0) + 1
+        counts['unknown_prefixes'].update(entry.get('unknown_prefixes', []))
+
+    def bad(counts):
+        return sum(counts.get(s, 0) for s in REPAIRED_STRATEGIES + ('failed',))
+
+    return sorted(by_publisher.items(), key=lambda item: (-bad(item[1]), item[0]))
+
+
+def print_report(entries, file=None):
+    file = file or sys.stdout
+    rows = publisher_report(entries)
+    print(f"{'Publisher':<40} {'Files':>6} {'Repaired':>9} {'Failed':>7} {'Bad %':>6}", file=file)
+    print("-" * 72, file=file)
+    all_unknown = Counter()
+    for publisher, counts in rows:
+        total = sum(v for k, v in counts.items() if k != 'unknown_prefixes')
+        repaired = sum(counts.get(s, 0) for s in REPAIRED_STRATEGIES)
+        failed = counts.get('failed', 0)
+        rate = 100 * (repaired + failed) / total if total else 0
+        print(f"{publisher[:40]:<40} {total:>6} {repaired:>9} {failed:>7} {rate:>5.1f}%", file=file)
+        if counts['unknown_prefixes']:
+            prefixes = ', '.join(f"{p} ({n})" for p, n in counts['unknown_prefixes'].most_common())
+            print(f"    prefixes without a known URI: {prefixes}", file=file)
+        all_unknown.update(counts['unknown_prefixes'])
+
+    if all_unknown:
+        print("", file=file)
+        print("Candidates for DEFAULT_URIS (files using each prefix with no known URI):", file=file)
+        for prefix, n in all_unknown.most_common():
+            print(f"  {prefix}: {n}", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report per-publisher parse failure rates from a parse cache'
+    )
+    parser.add_argument('cache', help='Parse cache JSON written by extract_methods.py')
+    args = parser.parse_args()
+
+    if not Path(args.cache).exists():
+        print(f"Error: parse cache '{args.cache}' does not exist", file=sys.stderr)
+        sys.exit(1)
+    entries = load_cache(args.cache)
+    print(f"Files in cache: {len(entries)}")
+    print("")
+    print_report(entries)
+
+
+if __name__ == '__main__':
+    main()
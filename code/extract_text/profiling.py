@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-stage profiling of extract_methods_section.
+
+Nothing here runs unless extract_methods.enable_profiling() is called
+(extract_methods.py --profile): it replaces the stage functions of
+extract_methods with timing wrappers (install), so the normal code path
+carries no timers or counters.
+
+Stage times are exclusive: while a stage calls into another (e.g. the
+serializer calling the text cleaners), the time is charged to the inner
+stage only.  Stages:
+  - read:      reading the file and hashing it
+  - detect:    format sniffing / detection, publisher sniffing
+  - parse:     the strict ElementTree parse
+  - repair:    namespace repair and lxml (recovering) parses
+  - locate:    finding the methods section (JATS facts and section
+               locator, TEI div index, BioC passage fields)
+  - serialize: turning the located section into text
+  - clean:     text cleaning (clean_extracted_text, clean_element_text)
+  - write:     writing the output file (batch mode)
+  - other:     everything else, including the profiler's own bookkeeping
+
+Counters: bytes_read, elements (in the parsed tree), elements_serialized,
+clean_calls and regex_passes (cleaning calls whose text needed the
+substitution chain, rather than taking the already-clean fast path).
+
+summary_lines() builds the aggregate table printed after a batch run, and
+profile_slowest() re-runs the slowest files under cProfile.
+"""
+
+import cProfile
+import functools
+import pstats
+import time
+from collections import Counter
+from pathlib import Path
+
+STAGES = ('read', 'detect', 'parse', 'repair', 'locate', 'serialize', 'clean', 'write', 'other')
+
+
+class StageTimer:
+    """Exclusive time per stage plus counters, reset for every file."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.times = dict.fromkeys(STAGES, 0.0)
+        self.counts = Counter()
+        self._stack = []
+        self._mark = None
+
+    def enter(self, stage):
+        now = time.perf_counter()
+        if self._stack:
+            self.times[self._stack[-1]] += now - self._mark
+        self._stack.append(stage)
+        self._mark = now
+
+    def exit(self):
+        now = time.perf_counter()
+        self.times[self._stack.pop()] += now - self._mark
+        self._mark = now
+
+    def wrap(self, stage, func, count=None):
+        """
+        `func` timed as `stage`.  `count(counts, args, result)` updates the
+        counters after the call; its own time is not charged to any stage.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.enter(stage)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                self.exit()
+            if count is not None:
+                count(self.counts, args, result)
+                self._mark = time.perf_counter()
+            return result
+        wrapper.__wrapped_stage__ = stage
+        return wrapper
+
+    def snapshot(self, total):
+        """Stage times and counters for the file just processed."""
+        stages = dict(self.times)
+        stages['other'] = max(0.0, total - sum(stages.values()))
+        return {'stages': stages, 'counters': dict(self.counts)}
+
+
+def install(namespace, timer, stages, counters=None):
+    """
+    Replace the functions named in `stages` (stage -> function names) in
+    the module dict `namespace` with timer.wrap wrappers; `counters` maps a
+    function name to its count callback.  Installing twice is a no-op.
+    """
+    counters = counters or {}
+    for stage, names in stages.items():
+        for name in names:
+            func = namespace[name]
+            if hasattr(func, '__wrapped_stage__'):
+                continue
+            namespace[name] = timer.wrap(stage, func, counters.get(name))
+
+
+def _fmt_ms(seconds):
+    return f"{1000 * seconds:,.1f}"
+
+
+def summary_lines(records, top=10):
+    """
+    Aggregate table of per-file profiles: time per stage over all files,
+    the `top` slowest files with their slowest stage, and counter totals.
+    `records` are run report records carrying a 'profile'.
+    """
+    records = [r for r in records if r.get('profile')]
+    if not records:
+        return ["No profiled files."]
+
+    stage_totals = Counter()
+    stage_worst = {}
+    counter_totals = Counter()
+    for rec in records:
+        stages = rec['profile']['stages']
+        for stage, t in stages.items():
+            stage_totals[stage] += t
+            if t > stage_worst.get(stage, (0, None))[0]:
+                stage_worst[stage] = (t, rec['input'])
+        counter_totals.update(rec['profile']['counters'])
+    grand_total = sum(stage_totals.values()) or 1.0
+
+    lines = [f"PROFILE ({len(records)} files)", "",
+             f"{'Stage':<10} {'Total s':>9} {'%':>6} {'Mean ms':>9} {'Max ms':>9}  Slowest file"]
+    for stage in STAGES:
+        t = stage_totals.get(stage, 0.0)
+        worst_t, worst_file = stage_worst.get(stage, (0.0, None))
+        lines.append(f"{stage:<10} {t:>9.3f} {100 * t / grand_total:>5.1f}% "
+                     f"{_fmt_ms(t / len(records)):>9} {_fmt_ms(worst_t):>9}  "
+                     f"{Path(worst_file).name if worst_file else '-'}")
+
+    lines += ["", f"Slowest {min(top, len(records))} files:",
+              f"{'Total ms':>9} {'Slowest stage':<20} {'KB':>8} {'Elements':>9}  File"]
+    for rec in slowest(records, top):
+        stages = rec['profile']['stages']
+        stage = max(stages, key=stages.get)
+        counters = rec['profile']['counters']
+        lines.append(f"{_fmt_ms(sum(stages.values())):>9} "
+                     f"{f'{stage} {_fmt_ms(stages[stage])}':<20} "
+                     f"{counters.get('bytes_read', 0) / 1024:>8.1f} "
+                     f"{counters.get('elements', 0):>9}  {rec['input']}")
+
+    lines += ["", "Counters: " + ", ".join(f"{k} {v:,}" for k, v in sorted(counter_totals.items()))]
+    return lines
+
+
+def slowest(records, n):
+    """The `n` records with the largest total profiled time, slowest first."""
+    return sorted(records, key=lambda r: -sum(r['profile']['stages'].values()))[:n]
+
+
+def profile_slowest(func, xml_files, out_dir, n_functions=25):
+    """
+    Run func(xml_file) for each file under cProfile, dumping one
+    '{file name}.prof' per file into `out_dir`.  Returns the report lines:
+    the combined top `n_functions` functions by internal time.
+    """
+    import io
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    combined = None
+    for xml_file in xml_files:
+        profiler = cProfile.Profile()
+        profiler.runcall(func, xml_file)
+        prof_path = out_dir / f"{Path(xml_file).name}.prof"
+        profiler.dump_stats(prof_path)
+        if combined is None:
+            combined = pstats.Stats(str(prof_path))
+        else:
+            combined.add(str(prof_path))
+
+    if combined is None:
+        return []
+    buf = io.StringIO()
+    combined.stream = buf
+    combined.sort_stats('tottime').print_stats(n_functions)
+    return [f"cProfile of the {len(xml_files)} slowest files (dumps in {out_dir}):"] + \
+        buf.getvalue().rstrip().splitlines()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Pick one input per paper when the same paper is present in several sources.
+
+A paper often appears as JATS from PMC ({PMCID}.xml or {PMID}.xml), as
+BioC from Auto-CORPus ({PMID}_bioc.xml) and as GROBID TEI from the PDF
+({PMID}.pdf.tei.xml).  Inputs are grouped by the PMID in their file name;
+PMCIDs are mapped to PMIDs with the PMID -> PMCID mapping CSV (columns
+'PMID' and 'pmcids', as written for get_text_embeddings.py).  In each group
+the input whose sniffed format comes first in the preference order is kept
+and the others are skipped; extract_methods.py batch mode goes on to the
+next source of a paper when the kept one has no methods section.
+
+Inputs whose name is not a PMID / PMCID (with an optional _bioc / .pdf.tei
+source suffix) are never grouped.  A PMCID missing from the mapping groups
+only with itself.
+
+Usage:
+  python3 source_resolver.py <xml_dir> [--mapping CSV] [--preference jats,bioc,tei]
+"""
+
+import argparse
+import csv
+import re
+import sys
+from pathlib import Path
+
+# Default source preference: publisher JATS, then BioC, then GROBID TEI
+DEFAULT_PREFERENCE = ('jats', 'bioc', 'tei')
+
+# Source suffixes of output_name_for names ('12345_bioc', '12345_pdf_tei')
+_SOURCE_SUFFIXES = ('_bioc', '_pdf_tei')
+
+_PAPER_ID_RE = re.compile(r'(?:PMC)?\d+')
+
+
+def load_id_mapping(csv_path):
+    """PMCID -> PMID from the mapping CSV (rows without a PMCID are skipped)."""
+    mapping = {}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            pmcid = (row.get('pmcids') or '').strip()
+            pmid = (row.get('PMID') or '').strip()
+            if pmcid and pmid and pmcid not in ('NA', 'nan'):
+                mapping[pmcid] = pmid
+    return mapping
+
+
+def paper_key(name, mapping=None):
+    """
+    Paper a file belongs to, from its output name (output_name_for):
+    the PMID, or the PMCID if it is not in `mapping`.  None if the name is
+    not an ID.
+    """
+    for suffix in _SOURCE_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    if not _PAPER_ID_RE.fullmatch(name):
+        return None
+    if name.startswith('PMC') and mapping:
+        return mapping.get(name, name)
+    return name
+
+
+def ranked_groups(files_by_format, name_for, mapping=None, preference=DEFAULT_PREFERENCE):
+    """
+    Group inputs by paper.
+
+    Args: as for resolve.
+
+    Returns:
+        (ungrouped, groups): the inputs whose name is not a paper ID, and
+        paper -> its inputs, best source first (formats not in
+        `preference` rank after all listed ones; ties by file name)
+    """
+    rank = {fmt: i for i, fmt in enumerate(preference)}
+    groups = {}
+    ungrouped = []
+    for fmt, files in files_by_format.items():
+        for xml_file in files:
+            key = paper_key(name_for(xml_file), mapping)
+            if key is None:
+                ungrouped.append(xml_file)
+            else:
+                groups.setdefault(key, []).append((rank.get(fmt, len(rank)), xml_file))
+    return ungrouped, {key: [xml_file for _, xml_file in sorted(candidates)]
+                       for key, candidates in groups.items()}
+
+
+def resolve(files_by_format, name_for, mapping=None, preference=DEFAULT_PREFERENCE):
+    """
+    Choose one input per paper, by source alone (extract_methods.py batch
+    mode also falls back to the next source when the chosen one has no
+    methods section; see ranked_groups).
+
+    Args:
+        files_by_format: sniffed format -> list of input files
+            (bucket_by_format)
+        name_for: function giving a file's output name (output_name_for)
+        mapping: PMCID -> PMID (load_id_mapping), optional
+        preference: formats in order of preference; formats not listed
+            rank after all listed ones
+
+    Returns:
+        (kept, duplicates): the sorted inputs to extract, and a sorted list
+        of (paper, kept input, skipped input) for the inputs left out
+    """
+    kept, groups = ranked_groups(files_by_format, name_for, mapping, preference)
+    duplicates = []
+    for key, candidates in groups.items():
+        kept.append(candidates[0])
+        duplicates.extend((key, candidates[0], loser) for loser in candidates[1:])
+    return sorted(kept), sorted(duplicates)
+
+
+def write_duplicates(path, duplicates):
+    """Write (paper, kept, skipped) rows as a TSV log."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter='\t', lineterminator='\n')
+        writer.writerow(['paper', 'kept', 'skipped'])
+        writer.writerows(duplicates)
+
+
+def main():
+    import extract_methods
+
+    parser = argparse.ArgumentParser(
+        description='List the inputs that duplicate a paper already present in a preferred source'
+    )
+    parser.add_argument('xml_dir', help='Folder of XML files')
+    parser.add_argument('--mapping', help='PMID to PMCID mapping CSV (columns PMID, pmcids)')
+    parser.add_argument('--preference', default=','.join(DEFAULT_PREFERENCE),
+                        help='Source formats in order of preference (default: %(default)s)')
+    args = parser.parse_args()
+
+    xml_files = sorted(str(f) for f in Path(args.xml_dir).glob('*.xml'))
+    if not xml_files:
+        print(f"No XML files found in {args.xml_dir}", file=sys.stderr)
+        sys.exit(1)
+    mapping = load_id_mapping(args.mapping) if args.mapping else None
+    kept, duplicates = resolve(extract_methods.bucket_by_format(xml_files),
+                               extract_methods.output_name_for, mapping,
+                               args.preference.split(','))
+    print(f"Inputs: {len(xml_files)}, kept: {len(kept)}, duplicates: {len(duplicates)}")
+    for key, winner, loser in duplicates:
+        print(f"{key}\t{Path(winner).name}\t{Path(loser).name}")
+
+
+if __name__ == '__main__':
+    main()
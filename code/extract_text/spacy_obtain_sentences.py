@@ -22,7 +22,14 @@ parser = argparse.ArgumentParser(description="Break articles into sentences usin
 parser.add_argument(
     "--input_dir",
     type=str,
-    help="Input directory containing .txt article files"
+    help="Input directory containing .txt article files (or *_methods.json paragraph "
+         "records from extract_methods.py --layout json)"
+)
+parser.add_argument(
+    "--input_dataset",
+    type=str,
+    help="Read articles from this Parquet methods dataset (extract_methods.py --dataset) "
+         "instead of the .txt files in --input_dir"
 )
 parser.add_argument(
     "--output_dir",
@@ -616,25 +623,48 @@ def split_text_into_chunks(text: str, max_tokens: int = 400) -> List[str]:
     paragraphs = text.split("\n\n")
     return _pack(paragraphs)
 
-def break_text_into_sentences(input_dir: str, pubmed_id:str, output_dir: str) -> List[str]:
-    # Read the file
-    file_name = f"{input_dir}/{pubmed_id}.txt"
-    
-    # Check if file exists, 
-    # if doesn't exists, try bioC version of the file, or main methods
-    if not os.path.isfile(file_name):
-        file_name = f"{input_dir}/{pubmed_id}_bioc.txt"
+def paragraphs_to_text(records: List[Dict]) -> str:
+    """
+    Text of extract_methods.py --layout json paragraph records, laid out as
+    --layout paragraphs does: blank lines between paragraphs, and each
+    section title as its own paragraph where the section changes.
+    """
+    blocks = []
+    current = None
+    for record in records:
+        section = record.get("section")
+        if section and section != current:
+            blocks.append(section if section.endswith((".", ":", "?")) else section + ".")
+        current = section
+        blocks.append(record["text"])
+    return "\n\n".join(blocks)
+
+def break_text_into_sentences(input_dir: str, pubmed_id:str, output_dir: str,
+                              file_text: str = None) -> List[str]:
+    # Read the file (unless the text comes from a methods dataset)
+    if file_text is None and os.path.isfile(f"{input_dir}/{pubmed_id}.json"):
+        # extract_methods.py --layout json: paragraph records
+        with open(f"{input_dir}/{pubmed_id}.json", 'r', encoding='utf-8') as f:
+            file_text = paragraphs_to_text(json.load(f))
+
+    if file_text is None:
+        file_name = f"{input_dir}/{pubmed_id}.txt"
+        
+        # Check if file exists, 
+        # if doesn't exists, try bioC version of the file, or main methods
+        if not os.path.isfile(file_name):
+            file_name = f"{input_dir}/{pubmed_id}_bioc.txt"
+              
+        if not os.path.isfile(file_name):
+           file_name = f"{input_dir}/{pubmed_id}_main_methods.txt"
+        
+        if not os.path.isfile(file_name):
+            print(f"Warning: File not found for PMID {pubmed_id}: {file_name}")
+            return []
           
-    if not os.path.isfile(file_name):
-       file_name = f"{input_dir}/{pubmed_id}_main_methods.txt"
-    
-    if not os.path.isfile(file_name):
-        print(f"Warning: File not found for PMID {pubmed_id}: {file_name}")
-        return []
-      
-    
-    with open(file_name, 'r', encoding='utf-8') as f:
-        file_text = f.read()
+        
+        with open(file_name, 'r', encoding='utf-8') as f:
+            file_text = f.read()
         
     # remove space between cis and -eQTL in the text, as spacy often splits these into separate sentences
     file_text = re.sub(r'\bcis\s*-\s*eQTL\b', 'cis-eQTL', file_text)
@@ -645,8 +675,11 @@ def break_text_into_sentences(input_dir: str, pubmed_id:str, output_dir: str) ->
     # convert LaTeX math expressions to readable plain text.
     file_text = strip_latex(file_text)
     
-    # remove \n in sentences (spacy sometimes leaves these in)
-    file_text = file_text.replace("\n", " ")
+    # remove \n in sentences (spacy sometimes leaves these in), keeping the
+    # blank lines between paragraphs (extract_methods.py --layout paragraphs)
+    # so chunks follow paragraph boundaries
+    paragraphs = re.split(r'\n\s*\n', file_text)
+    file_text = "\n\n".join(p.replace("\n", " ") for p in paragraphs if p.strip())
     
     # remove □ character
     file_text = file_text.replace("□", " ")
@@ -658,7 +691,7 @@ def break_text_into_sentences(input_dir: str, pubmed_id:str, output_dir: str) ->
     for chunk in chunks:
         try:
             # Process text with spaCy
-            doc = nlp(chunk)
+            doc = nlp(chunk.replace("\n", " "))
             # Extract sentences
             sentences = [sent.text.strip() for sent in doc.sents]
             all_sentences.extend(sentences)
@@ -689,18 +722,51 @@ def break_text_into_sentences(input_dir: str, pubmed_id:str, output_dir: str) ->
     
 ############## Loading and processing files ##############
 
-# get all pubmed ids from texts directory
-texts_dir = args.input_dir
-pubmed_ids = [f.split(".")[0] for f in os.listdir(texts_dir) if f.endswith(".txt")]
-
-print(f"\n Processing {len(pubmed_ids)} files from {texts_dir}...")
-
 start_time = time.time()
-for pubmed_id in pubmed_ids:
-    try:
-        break_text_into_sentences(args.input_dir, pubmed_id, args.output_dir)
-    except Exception as e:
-        print(f"Error processing {pubmed_id}: {e}")
+if args.input_dataset:
+    # one row per article; named like the .txt outputs ({id}_methods,
+    # _methods_main or _methods_supp, as extract_methods.section_output_path
+    # names them) so the sentence files are the same as when reading --input_dir
+    import extract_methods
+    import methods_dataset
+
+    print(f"\n Processing articles from {args.input_dataset}...")
+    for row in methods_dataset.iter_rows(args.input_dataset,
+                                         columns=["id", "status", "is_main", "text"]):
+        if row["text"] is None:
+            continue
+        pubmed_id = extract_methods.section_output_path(
+            "", row["id"], "methods", row["is_main"],
+            is_supp=row["status"] == "supplementary-methods").stem
+        try:
+            break_text_into_sentences(None, pubmed_id, args.output_dir, file_text=row["text"])
+        except Exception as e:
+            print(f"Error processing {pubmed_id}: {e}")
+else:
+    # get all pubmed ids from texts directory, leaving out the outputs that
+    # extract_methods.py lists as stale (e.g. a paper's duplicate sources)
+    texts_dir = args.input_dir
+    stale_list = os.path.join(texts_dir, "stale_outputs.txt")
+    stale_files = set()
+    if os.path.isfile(stale_list):
+        with open(stale_list, encoding="utf-8") as f:
+            stale_files = {os.path.basename(line.strip()) for line in f if line.strip()}
+    # an id with both a .json and a .txt output is processed once (from the
+    # .json paragraph records, see break_text_into_sentences)
+    pubmed_ids = sorted({f.split(".")[0] for f in os.listdir(texts_dir)
+                         if (f.endswith(".txt") or f.endswith(("_methods.json", "_methods_main.json", "_methods_supp.json")))
+                         and f not in stale_files
+                         and f not in ("stale_outputs.txt", "failed_files.txt", "no_methods_files.txt")})
+    if stale_files:
+        print(f"Skipping {len(stale_files)} stale outputs listed in {stale_list}")
+
+    print(f"\n Processing {len(pubmed_ids)} files from {texts_dir}...")
+
+    for pubmed_id in pubmed_ids:
+        try:
+            break_text_into_sentences(args.input_dir, pubmed_id, args.output_dir)
+        except Exception as e:
+            print(f"Error processing {pubmed_id}: {e}")
 
 elapsed_minutes = (time.time() - start_time) / 60
 print(f"\n Completed in {elapsed_minutes:.2f} minutes \n\n")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic corpus of JATS, TEI and BioC articles for benchmarking
+extract_methods.py.
+
+Documents are built from random sentences with the markup the extractor has
+to deal with in real files (bibliography xrefs, author-year citations,
+inline formulas, tables, italic / superscript runs, numbered headings) and
+come in one of several layouts ("kinds"), each with the status
+extract_methods_section is expected to return:
+
+  jats-nested           body <sec> Methods with nested subsections     success
+  jats-abstract-methods structured abstract with its own "Methods"
+                        subsection, plus the body Methods section      success
+  jats-online-stub      Methods section that only points online       online-only
+  jats-main-fallback    Nature Genetics article with an online-only
+                        stub and the methods text unsectioned in the
+                        body                                           main-fallback
+  jats-undeclared       oasis:/xlink:/ali: prefixes used without
+                        xmlns declarations (needs namespace repair)    success
+  tei-flat              GROBID output: flat <div>s, a head-only
+                        "Methods" div followed by subsection divs      success
+  tei-no-methods-head   GROBID output without a "Methods" head, only
+                        subsection heads (keyword fallback)            success
+  bioc-labelled         BioC passages labelled "Methods"               success
+  bioc-broken-labels    BioC passages all mislabelled, with an inline
+                        "Materials and Methods" header                 success
+
+Size presets control the number of sections, paragraphs per section and
+sentences per paragraph.  The corpus folder gets a corpus.json listing every
+file with its kind, format and expected status.
+
+Usage:
+  python3 synthetic_corpus.py <output_dir> [--n 20] [--size medium] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# (sections, paragraphs per section, sentences per paragraph, subsection depth)
+SIZES = {
+    'small': (3, 2, 3, 1),
+    'medium': (6, 4, 5, 2),
+    'large': (12, 8, 8, 3),
+}
+
+_WORDS = (
+    'genome-wide association study cohort participants ancestry samples genotyped '
+    'imputation reference panel quality control variants SNPs minor allele frequency '
+    'Hardy-Weinberg equilibrium principal components logistic regression covariates '
+    'age sex phenotype cases controls meta-analysis fixed-effects heterogeneity '
+    'replication significance threshold linkage disequilibrium fine-mapping '
+    'heritability summary statistics European African East Asian admixed recruited '
+    'consent protocol approved ethics committee sequencing array platform'
+).split()
+
+_AUTHORS = ('Smith', 'Wang', 'Okafor', 'Garcia', 'Kim', 'Müller', 'Patel', 'Nakamura')
+
+_METHODS_SUBSECTIONS = (
+    'Study participants', 'Genotyping and quality control', 'Imputation',
+    'Statistical analysis', 'Phenotype definitions', 'Replication cohort',
+    'Meta-analysis', 'Fine-mapping',
+)
+
+KINDS = {
+    # kind: (format, expected status)
+    'jats-nested': ('jats', 'success'),
+    'jats-abstract-methods': ('jats', 'success'),
+    'jats-online-stub': ('jats', 'online-only'),
+    'jats-main-fallback': ('jats', 'main-fallback'),
+    'jats-undeclared': ('jats', 'success'),
+    'tei-flat': ('tei', 'success'),
+    'tei-no-methods-head': ('tei', 'success'),
+    'bioc-labelled': ('bioc', 'success'),
+    'bioc-broken-labels': ('bioc', 'success'),
+}
+
+TEI_NS = 'http://www.tei-c.org/ns/1.0'
+
+
+class _Writer:
+    """Random text and markup for one document."""
+
+    def __init__(self, rng, size):
+        self.rng = rng
+        self.n_sections, self.n_paragraphs, self.n_sentences, self.depth = SIZES[size]
+        self.n_refs = 0
+
+    def words(self, n):
+        return ' '.join(self.rng.choice(_WORDS) for _ in range(n))
+
+    def sentence(self, markup='jats'):
+        rng = self.rng
+        text = escape(self.words(rng.randint(8, 24)).capitalize())
+        roll = rng.random()
+        if roll < 0.25:
+            self.n_refs += 1
+            if markup == 'jats':
+                text += f' <xref ref-type="bibr" rid="B{self.n_refs}">{self.n_refs}</xref>'
+            elif markup == 'tei':
+                text += f' <ref type="bibr" target="#b{self.n_refs}">[{self.n_refs}]</ref>'
+            else:
+                text += f' [{self.n_refs}]'
+        elif roll < 0.4:
+            text += f' ({rng.choice(_AUTHORS)} et al., {rng.randint(1995, 2024)})'
+        elif roll < 0.5 and markup == 'jats':
+            text += (f' with <italic>{self.words(2)}</italic> at P &lt; 5 '
+                     f'&#x000d7; 10<sup>&#x02212;8</sup>')
+        elif roll < 0.55 and markup == 'jats':
+            text += (' <inline-formula><tex-math>\\beta = 0.{}</tex-math></inline-formula>'
+                     .format(rng.randint(1, 99)))
+        return text + rng.choice(('.', '.', '.', ' .', ';', '..'))
+
+    def paragraph_text(self, markup='jats'):
+        return ' '.join(self.sentence(markup) for _ in range(self.n_sentences))
+
+    def jats_paragraphs(self):
+        return ''.join(f'<p>{self.paragraph_text()}</p>\n' for _ in range(self.n_paragraphs))
+
+    def jats_sec(self, title, depth, number=''):
+        label = f'{number} ' if number and self.rng.random() < 0.5 else ''
+        parts = [f'<sec id="s{self.rng.randint(1, 10 ** 6)}"><title>{label}{escape(title)}</title>\n',
+                 self.jats_paragraphs()]
+        if self.rng.random() < 0.3:
+            parts.append('<table-wrap><label>Table 1</label><table><tr><td>'
+                         + self.words(3) + '</td></tr></table></table-wrap>\n')
+        if depth > 0:
+            for i in range(self.rng.randint(1, 3)):
+                sub_title = self.rng.choice(_METHODS_SUBSECTIONS)
+                sub_number = f'{number}.{i + 1}' if number else ''
+                parts.append(self.jats_sec(sub_title, depth - 1, sub_number))
+        parts.append('</sec>\n')
+        return ''.join(parts)
+
+
+def _jats_front(journal, publisher='Synthetic Press', abstract=''):
+    return (
+        '<front><journal-meta><journal-title-group>'
+        f'<journal-title>{journal}</journal-title></journal-title-group>'
+        f'<publisher><publisher-name>{publisher}</publisher-name></publisher></journal-meta>'
+        f'<article-meta><title-group><article-title>Synthetic article</article-title>'
+        f'</title-group>{abstract}</article-meta></front>\n'
+    )
+
+
+def _jats_back(w):
+    refs = ''.join(
+        f'<ref id="B{i}"><mixed-citation>{w.rng.choice(_AUTHORS)} et al. '
+        f'{escape(w.words(6))}.</mixed-citation></ref>'
+        for i in range(1, w.n_refs + 1)
+    )
+    return f'<back><ref-list>{refs}</ref-list></back>\n'
+
+
+def _jats_article(w, body, journal='Synthetic Genetics', abstract='', xmlns=True):
+    ns = (' xmlns:xlink="http://www.w3.org/1999/xlink"'
+          ' xmlns:mml="http://www.w3.org/1998/Math/MathML"') if xmlns else ''
+    front = _jats_front(journal, abstract=abstract)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<article{ns} article-type="research-article">\n{front}'
+            f'<body>\n{body}</body>\n{_jats_back(w)}</article>\n')
+
+
+def _standard_sections(w, methods):
+    """Introduction, the given methods section(s), then results and discussion."""
+    sections = [w.jats_sec('Introduction', 0, '1'), methods]
+    for i in range(max(0, w.n_sections - 3)):
+        sections.append(w.jats_sec(f'Results {i + 1}', 0, f'{i + 3}'))
+    sections.append(w.jats_sec('Discussion', 0))
+    return ''.join(sections)
+
+
+def jats_nested(w):
+    methods = w.jats_sec('Methods', w.depth, '2').replace('<sec ', '<sec sec-type="methods" ', 1)
+    return _jats_article(w, _standard_sections(w, methods))
+
+
+def jats_abstract_methods(w):
+    abstract = ('<abstract>' + ''.join(
+        f'<sec><title>{title}</title><p>{w.paragraph_text()}</p></sec>'
+        for title in ('Background', 'Methods', 'Results', 'Conclusions')
+    ) + '</abstract>')
+    methods = w.jats_sec('Materials and methods', w.depth, '2')
+    return _jats_article(w, _standard_sections(w, methods), abstract=abstract)
+
+
+_ONLINE_STUB = ('<sec sec-type="methods"><title>Methods</title><p>Methods and any associated '
+                'references are available in the online version of the paper.</p></sec>\n')
+
+
+def jats_online_stub(w):
+    return _jats_article(w, _standard_sections(w, _ONLINE_STUB), journal='Nature Communications')
+
+
+def jats_main_fallback(w):
+    # Letter-style article: unsectioned body paragraphs, then the stub
+    body = w.jats_paragraphs() + w.jats_paragraphs() + _ONLINE_STUB
+    return _jats_article(w, body, journal='Nature Genetics')
+
+
+def jats_undeclared(w):
+    methods = w.jats_sec('Methods', w.depth, '2')
+    table = ('<table-wrap><oasis:table frame="topbot"><oasis:tgroup cols="2"><oasis:tbody>'
+             '<oasis:row><oasis:entry>SNP</oasis:entry><oasis:entry>P</oasis:entry></oasis:row>'
+             '</oasis:tbody></oasis:tgroup></oasis:table></table-wrap>\n')
+    link = (f'<p>Summary statistics are at <ext-link ext-link-type="uri" '
+            f'xlink:href="https://example.org/{w.rng.randint(1, 999)}">the catalog</ext-link> '
+            f'<ali:free_to_read/>. {w.paragraph_text()}</p>\n')
+    methods = methods.replace('</sec>\n', table + link + '</sec>\n', 1)
+    return _jats_article(w, _standard_sections(w, methods), xmlns=False)
+
+
+def _tei_div(w, head=None, n=None, paragraphs=True):
+    parts = ['<div xmlns="%s">' % TEI_NS]
+    if head is not None:
+        attr = f' n="{n}"' if n else ''
+        parts.append(f'<head{attr}>{f"{n} " if n else ""}{escape(head)}</head>')
+    if paragraphs:
+        parts.extend(f'<p>{w.paragraph_text("tei")}</p>' for _ in range(w.n_paragraphs))
+    parts.append('</div>\n')
+    return ''.join(parts)
+
+
+def _tei_document(w, divs):
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<TEI xmlns="{TEI_NS}">'
+            '<teiHeader><fileDesc><publicationStmt><publisher>Synthetic Press</publisher>'
+            '</publicationStmt></fileDesc><profileDesc><abstract><div><p>'
+            f'{w.paragraph_text("tei")}</p></div></abstract></profileDesc></teiHeader>'
+            f'<text><body>\n{"".join(divs)}</body></text></TEI>\n')
+
+
+def tei_flat(w):
+    divs = [_tei_div(w, 'Introduction', '1'), _tei_div(w, 'Methods', '2', paragraphs=False)]
+    for i in range(w.n_sections):
+        divs.append(_tei_div(w, w.rng.choice(_METHODS_SUBSECTIONS), f'2.{i + 1}'))
+        if w.rng.random() < 0.3:
+            divs.append(_tei_div(w))  # headless continuation div
+    divs += [_tei_div(w, 'Results', '3'), _tei_div(w, 'Discussion', '4'),
+             _tei_div(w, 'Acknowledgements')]
+    return _tei_document(w, divs)
+
+
+def tei_no_methods_head(w):
+    divs = [_tei_div(w, 'Introduction')]
+    divs += [_tei_div(w, title) for title in w.rng.sample(_METHODS_SUBSECTIONS, 3)]
+    divs += [_tei_div(w, 'Results'), _tei_div(w, 'Discussion')]
+    return _tei_document(w, divs)
+
+
+def _bioc_passage(label, text):
+    return (f'<passage><infon key="section_title_1">{escape(label)}</infon>'
+            f'<text>{text}</text></passage>\n')
+
+
+def _bioc_document(doc_id, passages):
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<collection><source>Auto-CORPus</source>'
+            f'<document><id>{doc_id}</id>\n{"".join(passages)}</document></collection>\n')
+
+
+def _bioc_sections(w):
+    sections = [('Abstract', 1), ('Introduction', w.n_paragraphs),
+                ('Materials and Methods', w.n_sections * w.n_paragraphs),
+                ('Results', w.n_paragraphs), ('Discussion', w.n_paragraphs)]
+    return [(label, w.paragraph_text('bioc')) for label, n in sections for _ in range(n)]
+
+
+def bioc_labelled(w, doc_id):
+    return _bioc_document(doc_id, [_bioc_passage(label, text) for label, text in _bioc_sections(w)])
+
+
+def bioc_broken_labels(w, doc_id):
+    passages = []
+    previous = None
+    for label, text in _bioc_sections(w):
+        if label != previous and label != 'Abstract':
+            text = f'{label} {text}'  # inline header at the start of the section
+        previous = label
+        passages.append(_bioc_passage(w.rng.choice(('Author notes', 'document part')), text))
+    return _bioc_document(doc_id, passages)
+
+
+_GENERATORS = {
+    'jats-nested': jats_nested,
+    'jats-abstract-methods': jats_abstract_methods,
+    'jats-online-stub': jats_online_stub,
+    'jats-main-fallback': jats_main_fallback,
+    'jats-undeclared': jats_undeclared,
+    'tei-flat': tei_flat,
+    'tei-no-methods-head': tei_no_methods_head,
+    'bioc-labelled': bioc_labelled,
+    'bioc-broken-labels': bioc_broken_labels,
+}
+
+
+def file_name(kind, i):
+    fmt = KINDS[kind][0]
+    stem = f"{kind.replace('-', '_')}_{i:04d}"
+    if fmt == 'tei':
+        return f'{stem}.pdf.tei.xml'
+    if fmt == 'bioc':
+        return f'{stem}_bioc.xml'
+    return f'{stem}.xml'
+
+
+def generate_corpus(output_dir, n=20, size='medium', seed=0, kinds=None):
+    """
+    Write `n` documents of each kind to output_dir and a corpus.json
+    listing them.  Returns the corpus.json entries.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    entries = []
+    for kind in kinds or KINDS:
+        fmt, expected = KINDS[kind]
+        for i in range(n):
+            w = _Writer(rng, size)
+            name = file_name(kind, i)
+            if fmt == 'bioc':
+                text = _GENERATORS[kind](w, doc_id=f'{kind}-{i}')
+            else:
+                text = _GENERATORS[kind](w)
+            (output_dir / name).write_text(text, encoding='utf-8')
+            entries.append({'file': name, 'kind': kind, 'format': fmt, 'expected_status': expected})
+
+    with open(output_dir / 'corpus.json', 'w', encoding='utf-8') as f:
+        json.dump({'size': size, 'seed': seed, 'n': n, 'files': entries}, f, indent=1)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic JATS / TEI / BioC corpus for benchmarking'
+    )
+    parser.add_argument('output_dir', help='Folder to write the corpus to')
+    parser.add_argument('--n', type=int, default=20, help='Documents per kind (default: 20)')
+    parser.add_argument('--size', choices=sorted(SIZES), default='medium',
+                        help='Document size preset (default: medium)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--kinds', help=f"Comma-separated subset of: {', '.join(KINDS)}")
+    args = parser.parse_args()
+
+    kinds = args.kinds.split(',') if args.kinds else None
+    if kinds:
+        unknown = [k for k in kinds if k not in KINDS]
+        if unknown:
+            parser.error(f"unknown kinds: {', '.join(unknown)}")
+    entries = generate_corpus(args.output_dir, args.n, args.size, args.seed, kinds)
+    print(f"Wrote {len(entries)} documents to {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
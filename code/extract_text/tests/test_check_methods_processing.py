@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+import check_methods_processing as checks
+
+# Texts where the patterns overlap or touch: the single-pass scanner must
+# count every check exactly like one re.findall per pattern
+TEXTS = [
+    '',
+    'Samples were genotyped on an array and imputed.',
+    'as described ( Smith et al., 2019 ) and ( ) [ ] [1, 2] [ 3 ]',
+    'Cells were cultured ,, for 2 days -- , then spun.. ... . ; ,',
+    '(Jones et al.) (Smith et al, ) ( A et al ;) (et al)',
+    '\\usepackage{x}\\documentclass{article}\\begin{document} \\begin{documents}',
+    ' 2.1 Methods. 3. Results 12.3.4 Data 1. a',
+    'a  b   c    d\n\n  e . f , g ; h',
+    '–, —, -, - , ( ( ) ) [[]] [,] (\t)',
+]
+
+# Pieces the randomized texts are built from: characters and words the
+# patterns look for
+FUZZ_PIECES = list(' \n\t.,;!?()[]-–—\\12Ax') + [
+    'et al', 'Smith et al., ', 'usepackage', 'documentclass', 'begin{document}',
+    ' 2.1 Methods', '. 3. Results', '[1, 2]', '( ', ' )', '  ', '..', ',,',
+]
+
+
+def fuzz_texts(n, seed=0, max_pieces=30):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(FUZZ_PIECES) for _ in range(rnd.randint(0, max_pieces)))
+            for _ in range(n)]
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_scanner_matches_findall(text):
+    assert checks.scan_counts(text) == checks.findall_counts(text)
+
+
+def test_scanner_matches_findall_on_random_texts():
+    mismatches = [text for text in fuzz_texts(5000)
+                  if checks.scan_counts(text) != checks.findall_counts(text)]
+    assert mismatches == []
+
+
+# An extraction output folder: a methods text that --repair fixes, and the
+# extractor's file lists and reports, whose '../' paths look like double
+# periods to the checks
+OUTPUT_FOLDER = {
+    'bad_methods.txt': "Cells were cultured ( ) for 2 days .. Samples were washed , then spun .\n",
+    'failed_files.txt': "../xml2/bad1.xml\n",
+    'no_methods_files.txt': "../xml2/nometh.xml\n",
+    'stale_outputs.txt': "../old/gone_methods.txt\n",
+    'profile_summary.txt': "Stage  Total (s)\n..\n",
+}
+
+
+def test_repair_rewrites_only_methods_texts(tmp_path, capsys):
+    for name, text in OUTPUT_FOLDER.items():
+        (tmp_path / name).write_text(text, encoding='utf-8')
+    failed = checks.check_dir(tmp_path, workers=1, repair=True,
+                              failed_list=tmp_path / 'failed.lst',
+                              passed_list=tmp_path / 'passed.lst',
+                              results_path=tmp_path / 'results.csv')
+    assert failed == []
+    assert (tmp_path / 'passed.lst').read_text(encoding='utf-8') == 'bad_methods.txt\n'
+    expected = dict(OUTPUT_FOLDER, **{
+        'bad_methods.txt': "Cells were cultured for 2 days. Samples were washed, then spun.\n"})
+    assert {name: (tmp_path / name).read_text(encoding='utf-8')
+            for name in OUTPUT_FOLDER} == expected
@@ -0,0 +1,25 @@
+import check_results
+import extract_methods
+
+JATS = """<?xml version="1.0" encoding="UTF-8"?>
+<article><front><journal-meta><publisher><publisher-name>Synthetic Press</publisher-name>
+</publisher></journal-meta></front><body>
+<sec sec-type="methods"><title>Methods</title>
+<p>Samples were genotyped on a genome-wide array and imputed to a reference panel.</p></sec>
+</body></article>
+"""
+
+
+def test_skipped_inputs_keep_their_source_in_the_run_report(tmp_path):
+    (tmp_path / 'in').mkdir()
+    (tmp_path / 'in' / 'paper.xml').write_text(JATS, encoding='utf-8')
+    out = tmp_path / 'out'
+    extract_methods.process_directory(tmp_path / 'in', out, workers=1)
+    first = check_results.load_sources(out / 'extraction_report.jsonl')
+
+    by_status = extract_methods.process_directory(tmp_path / 'in', out, workers=1)
+    assert by_status['skipped'] == [str(tmp_path / 'in' / 'paper.xml')]
+    second = check_results.load_sources(out / 'extraction_report.jsonl')
+    assert second == first
+    assert second['paper_methods.txt']['publisher'] == 'Synthetic Press'
+    assert second['paper_methods.txt']['extractor_version'] == extract_methods.EXTRACTOR_VERSION
@@ -0,0 +1,193 @@
+"""
+Golden outputs of the JATS methods locator, the text cleaning and
+extract_methods_section on small inline documents, output naming of
+archive members and the options of the profiling re-run.
+
+The expected values are those of the extractor before the performance
+rewrites (the baseline revision), so a rewrite that changes what is
+extracted fails here.  With EXTRACTOR_REF set to a git revision, the
+same documents are also compared against that revision's
+extract_methods.py (compare_extractor_versions.py).
+"""
+
+import json
+import os
+import tarfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import compare_extractor_versions
+import extract_methods
+import text_cleaning
+
+JATS = {
+    # methods with subsections: only the top-level section is a candidate
+    'nested': """<article><front><article-meta><abstract><p>We studied risk.</p></abstract>
+</article-meta></front><body>
+<sec><title>Introduction</title><p>Background on the trait.</p></sec>
+<sec sec-type="methods"><title>Materials and Methods</title>
+<sec><title>Study population</title><p>Cases were recruited from clinics (see Table 1).</p></sec>
+<sec><title>Genotyping</title><p>Samples were genotyped  on an array [ ] and imputed .</p></sec>
+</sec>
+<sec><title>Results</title><p>Ten loci were found.</p></sec>
+</body></article>""",
+    # a structured abstract with a Methods part is not the methods section
+    'abstract_methods': """<article><front><article-meta><abstract>
+<sec><title>Background</title><p>Short background.</p></sec>
+<sec><title>Methods</title><p>Abstract methods summary.</p></sec>
+</abstract></article-meta></front><body>
+<sec><title>Introduction</title><p>Background on the trait.</p></sec>
+<sec><title>Methods</title><p>Full methods: association tests used logistic regression.</p></sec>
+</body></article>""",
+    # an online-only stub ahead of a second methods section
+    'online_stub': """<article><body>
+<sec><title>Introduction</title><p>Background.</p></sec>
+<sec sec-type="methods"><title>Methods</title>
+<p>Methods are available in the online version of the paper.</p></sec>
+<sec><title>Online Methods</title>
+<p>Subjects. All participants gave informed consent and were genotyped.</p>
+<sec><title>Statistics</title><p>Associations were tested with PLINK.</p></sec></sec>
+</body></article>""",
+    'no_methods': """<article><body>
+<sec><title>Introduction</title><p>Background.</p></sec>
+<sec><title>Results</title><p>Findings.</p></sec>
+</body></article>""",
+    # main journal without methods sections: the whole body
+    'main_fallback': """<article><front><journal-meta><journal-title-group>
+<journal-title>Nature Genetics</journal-title></journal-title-group></journal-meta></front><body>
+<p>We performed a genome-wide association study of height in 5,000 individuals.</p>
+<p>Twelve loci reached genome-wide significance .</p>
+</body></article>""",
+}
+
+OTHER = {
+    'tei': """<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body>
+<div><head n="1">1 Introduction</head><p>Background.</p></div>
+<div><head n="2">2 Methods</head></div>
+<div><head n="2.1">2.1 Study design</head><p>Participants were enrolled ( ) in 2010 .</p></div>
+<div><p>Headless continuation of the design.</p></div>
+<div><head n="3">3 Results</head><p>Findings.</p></div>
+</body></text></TEI>""",
+    'bioc': """<collection><source>Auto-CORPus</source><document><id>123</id>
+<passage><infon key="section_title_1">Introduction</infon><text>Background.</text></passage>
+<passage><infon key="section_title_1">Materials and Methods</infon>
+<text>Cases and controls were genotyped , and tested [1, 2].</text></passage>
+<passage><infon key="section_title_1">Results</infon><text>Findings.</text></passage>
+</document></collection>""",
+}
+
+# document -> titles of find_all_methods_sections, in priority order
+LOCATED = {
+    'nested': ['Materials and Methods'],
+    'abstract_methods': ['Methods'],
+    'online_stub': ['Methods', 'Online Methods'],
+    'no_methods': [],
+    'main_fallback': [],
+}
+
+# document -> (status, is_main, text) of extract_methods_section
+EXTRACTED = {
+    'nested': ('success', False,
+               'Materials and Methods. Study population. Cases were recruited from clinics '
+               '(see Table 1). Genotyping. Samples were genotyped on an array and imputed.'),
+    'abstract_methods': ('success', False,
+                         'Methods. Full methods: association tests used logistic regression.'),
+    'online_stub': ('online-only', False, None),
+    'no_methods': ('no-methods', False, None),
+    'main_fallback': ('main-fallback', True,
+                      'We performed a genome-wide association study of height in 5,000 '
+                      'individuals. Twelve loci reached genome-wide significance.'),
+    'tei': ('success', False,
+            'Methods.  Study design.  Participants were enrolled in 2010.  '
+            'Headless continuation of the design.  Results.  Findings.'),
+    'bioc': ('success', False, 'Cases and controls were genotyped, and tested [1, 2].'),
+}
+
+# raw text -> (clean_extracted_text, clean_element_text)
+CLEANED = {
+    'Samples were genotyped  on an array [ ] and imputed .':
+        ('Samples were genotyped on an array and imputed.',
+         'Samples were genotyped on an array and imputed.'),
+    'as described ( Smith et al., 2019 ) and ( )':
+        ('as described (Smith et al, 2019) and', 'as described and'),
+    'Cells were cultured ,, for 2 days -- , then spun..':
+        ('Cells were cultured, for 2 days -. then spun.',
+         'Cells were cultured, for 2 days --, then spun.'),
+    'ﬁltered reads (n = 10 ; see [1, 2 ]) were kept .':
+        ('filtered reads (n = 10; see [1, 2]) were kept.',
+         'filtered reads (n = 10; see [1, 2 ]) were kept.'),
+    '2.1 Study design The cohort&amp;controls':
+        ('Study design The cohort&controls', '2.1 Study design The cohort&amp;controls'),
+    'See Table 1\xa0for details ;and Fig . 2':
+        ('See Table 1 for details;and Fig. 2', 'See Table 1 for details;and Fig. 2'),
+}
+
+
+@pytest.fixture
+def xml_dir(tmp_path):
+    for name, xml in {**JATS, **OTHER}.items():
+        (tmp_path / f'{name}.xml').write_text(xml, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.parametrize('name', sorted(LOCATED))
+def test_locator(name):
+    sections = extract_methods.find_all_methods_sections(ET.fromstring(JATS[name]))
+    assert [sec.findtext('title') for sec in sections] == LOCATED[name]
+
+
+@pytest.mark.parametrize('text', sorted(CLEANED))
+def test_cleaning(text):
+    paragraph, element = CLEANED[text]
+    assert text_cleaning.clean_extracted_text(text) == paragraph
+    assert text_cleaning.clean_element_text(text.strip()) == element
+
+
+@pytest.mark.parametrize('name', sorted(EXTRACTED))
+def test_outputs(xml_dir, name):
+    result = extract_methods.extract_methods_section(str(xml_dir / f'{name}.xml'))
+    assert (result['status'], result['is_main'], result['text']) == EXTRACTED[name]
+
+
+def test_archive_name_collision(tmp_path):
+    archive = tmp_path / 'package.tar'
+    with tarfile.open(archive, 'w') as tar:
+        for pmc in ('PMC1', 'PMC2'):
+            path = tmp_path / f'{pmc}.xml'
+            path.write_text(JATS['nested'], encoding='utf-8')
+            tar.add(path, arcname=f'{pmc}/article.nxml')
+    output_dir = tmp_path / 'out'
+    extract_methods.process_archive(archive, output_dir, workers=1)
+
+    assert sorted(p.name for p in output_dir.glob('*.txt')) == [
+        'PMC2_article_methods.txt', 'article_methods.txt']
+    with open(output_dir / 'extraction_report.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [rec.get('name_collision') for rec in records] == [None, 'article']
+
+
+def test_profile_rerun_options(xml_dir, tmp_path, monkeypatch):
+    reruns = []
+    monkeypatch.setattr(extract_methods.profiling, 'profile_slowest',
+                        lambda func, xml_files, out_dir: reruns.append(func.keywords) or [])
+    validators = {'ok': lambda text: {'passed': True}}
+    extract_methods.process_directory(xml_dir, tmp_path / 'out', workers=1, profile=True,
+                                      profile_top=1, sections=('methods', 'results'),
+                                      layout='paragraphs', validators=validators)
+    assert len(reruns) == 1
+    assert reruns[0]['sections'] == ('methods', 'results')
+    assert reruns[0]['paragraphs'] is True
+    assert reruns[0]['validators'] is validators
+
+
+@pytest.mark.skipif(not os.environ.get('EXTRACTOR_REF'),
+                    reason='set EXTRACTOR_REF to a git revision to compare against')
+@pytest.mark.parametrize('compare', [compare_extractor_versions.compare_locator,
+                                     compare_extractor_versions.compare_outputs,
+                                     compare_extractor_versions.compare_cleaning])
+def test_matches_reference_revision(xml_dir, compare):
+    reference = compare_extractor_versions.load_reference(os.environ['EXTRACTOR_REF'])
+    xml_files = compare_extractor_versions.xml_files_in(xml_dir)
+    _, mismatches, _, _ = compare(reference, xml_files)
+    assert mismatches == []
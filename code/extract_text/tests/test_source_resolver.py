@@ -0,0 +1,62 @@
+import extract_methods
+import source_resolver
+
+JATS_NO_METHODS = """<?xml version="1.0" encoding="UTF-8"?>
+<article><body>
+<sec><title>Introduction</title><p>Genetic studies of disease risk are reviewed here.</p></sec>
+<sec><title>Results</title><p>We report the association of many loci with the trait.</p></sec>
+</body></article>
+"""
+
+JATS_METHODS = """<?xml version="1.0" encoding="UTF-8"?>
+<article><body>
+<sec sec-type="methods"><title>Methods</title>
+<p>Samples were genotyped on a genome-wide array and imputed to a reference panel.</p></sec>
+</body></article>
+"""
+
+BIOC_METHODS = """<?xml version="1.0" encoding="UTF-8"?>
+<collection><source>Auto-CORPus</source><document><id>123</id>
+<passage><infon key="section_title_1">Introduction</infon><text>Genetic studies are reviewed.</text></passage>
+<passage><infon key="section_title_1">Methods</infon><text>Cases and controls were genotyped and associations were tested with logistic regression.</text></passage>
+</document></collection>
+"""
+
+
+def write(folder, files):
+    folder.mkdir()
+    for name, text in files.items():
+        (folder / name).write_text(text, encoding='utf-8')
+
+
+def test_ranked_groups_orders_sources_by_preference(tmp_path):
+    files = {'jats': ['in/123.xml'], 'bioc': ['in/123_bioc.xml'],
+             'tei': ['in/123.pdf.tei.xml', 'in/notanid.pdf.tei.xml']}
+    ungrouped, groups = source_resolver.ranked_groups(files, extract_methods.output_name_for)
+    assert ungrouped == ['in/notanid.pdf.tei.xml']
+    assert groups == {'123': ['in/123.xml', 'in/123_bioc.xml', 'in/123.pdf.tei.xml']}
+
+
+def test_falls_back_to_bioc_when_jats_has_no_methods(tmp_path):
+    write(tmp_path / 'in', {'123.xml': JATS_NO_METHODS, '123_bioc.xml': BIOC_METHODS})
+    out = tmp_path / 'out'
+    by_status = extract_methods.process_directory(tmp_path / 'in', out, workers=1)
+    assert by_status['no-methods'] == [str(tmp_path / 'in' / '123.xml')]
+    assert by_status['success'] == [str(tmp_path / 'in' / '123_bioc.xml')]
+    assert 'logistic regression' in (out / '123_bioc_methods.txt').read_text(encoding='utf-8')
+
+    # an incremental run keeps the fallback's output and lists nothing as stale
+    by_status = extract_methods.process_directory(tmp_path / 'in', out, workers=1)
+    assert len(by_status['skipped']) == 2
+    assert (out / '123_bioc_methods.txt').exists()
+    assert not (out / 'stale_outputs.txt').exists()
+
+
+def test_preferred_source_with_methods_skips_the_others(tmp_path):
+    write(tmp_path / 'in', {'123.xml': JATS_METHODS, '123_bioc.xml': BIOC_METHODS})
+    out = tmp_path / 'out'
+    by_status = extract_methods.process_directory(tmp_path / 'in', out, workers=1)
+    assert by_status['success'] == [str(tmp_path / 'in' / '123.xml')]
+    assert not (out / '123_bioc_methods.txt').exists()
+    log = (out / extract_methods.DUPLICATES_LOG).read_text(encoding='utf-8').splitlines()
+    assert log[1].split('\t')[2].endswith('123_bioc.xml')
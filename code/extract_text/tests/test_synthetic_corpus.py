@@ -0,0 +1,82 @@
+"""
+Correctness and golden outputs of extract_methods_section on the synthetic
+corpus (synthetic_corpus.py); throughput is benchmarked by
+benchmark_extractor.py.
+"""
+
+import hashlib
+import tracemalloc
+
+import pytest
+
+import benchmark_extractor
+import extract_methods
+import synthetic_corpus
+
+# kind -> (word count, SHA-1 prefix) of the extracted text of the one
+# document per kind of the 'small' corpus with seed 0; after an intended
+# change in the extractor or the generator, regenerate with the loop in
+# test_golden_outputs
+GOLDEN = {
+    'jats-nested': (414, '2913e2286169957f'),
+    'jats-abstract-methods': (204, '02ecb2060fe8b925'),
+    'jats-online-stub': (0, 'da39a3ee5e6b4b0d'),
+    'jats-main-fallback': (203, '7f3b9b4384ae55ac'),
+    'jats-undeclared': (397, '26a487c9fc3f3501'),
+    'tei-flat': (468, '740d972ad31b7e05'),
+    'tei-no-methods-head': (312, 'ef27dd83ee36ac3e'),
+    'bioc-labelled': (308, 'f1784bd2474752da'),
+    'bioc-broken-labels': (270, '55b94f155ab317d0'),
+}
+
+# Largest tracemalloc peak of one extraction, per format, on 'medium'
+# documents; loose, to catch order-of-magnitude regressions
+MAX_PEAK_MB = {'jats': 16, 'tei': 16, 'bioc': 16}
+
+
+def corpus(tmp_path_factory, n, size):
+    corpus_dir = tmp_path_factory.mktemp(f'corpus_{size}')
+    synthetic_corpus.generate_corpus(corpus_dir, n, size, seed=0)
+    return benchmark_extractor.load_corpus(corpus_dir)
+
+
+@pytest.fixture(scope='module')
+def small_corpus(tmp_path_factory):
+    return corpus(tmp_path_factory, 1, 'small')
+
+
+@pytest.fixture(scope='module')
+def medium_corpus(tmp_path_factory):
+    return corpus(tmp_path_factory, 1, 'medium')
+
+
+def test_expected_statuses(small_corpus):
+    unexpected = [(entry['file'], entry['expected_status'], result['status'])
+                  for entries in small_corpus.values() for entry in entries
+                  for result in [extract_methods.extract_methods_section(entry['path'])]
+                  if result['status'] != entry['expected_status']]
+    assert unexpected == []
+
+
+def test_golden_outputs(small_corpus):
+    got = {}
+    for entries in small_corpus.values():
+        for entry in entries:
+            text = extract_methods.extract_methods_section(entry['path'])['text'] or ''
+            got[entry['kind']] = (len(text.split()),
+                                  hashlib.sha1(text.encode('utf-8')).hexdigest()[:16])
+    assert got == GOLDEN
+
+
+@pytest.mark.parametrize('fmt', sorted(MAX_PEAK_MB))
+def test_peak_memory(medium_corpus, fmt):
+    tracemalloc.start()
+    try:
+        peaks = {}
+        for entry in medium_corpus[fmt]:
+            tracemalloc.reset_peak()
+            extract_methods.extract_methods_section(entry['path'])
+            peaks[entry['file']] = tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+    assert max(peaks.values()) <= MAX_PEAK_MB[fmt], peaks
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Text cleaning shared by the JATS, TEI and BioC methods extractors.
+
+All patterns are compiled once at import time.  Substitutions that are
+independent of each other are fused into a single pass, and steps that
+cannot change the text (e.g. bracket fixes on text without brackets) are
+skipped with cheap substring checks.  The output is byte-identical to the
+original step-by-step `re.sub` chains in extract_methods.py.
+
+Entry points:
+  - clean_extracted_text(text): per-paragraph cleaning (all formats)
+  - clean_element_text(text):   final normalisation of the text joined
+                                from a JATS element and its children
+  - strip_section_number(title): drop "2.1 "-style numbering from a title
+  - needs_cleaning(text):       False if the cleaners would return text as is
+"""
+
+import html as htmlmod
+import re
+import unicodedata
+
+
+# ---------------------------------------------------------------------------
+# Compiled patterns
+# ---------------------------------------------------------------------------
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Section numbering at start of paragraphs ("2.1", "2.3.1") and after a period
+_LEADING_SECTION_NUMBER_RE = re.compile(r'^(\d+\.)+\d*\s*')
+_INLINE_SECTION_NUMBER_RE = re.compile(r'\.\s+(\d+\.)+\d*\s+')
+
+# Leading numbering of a section title ("2.1 GWAS" -> "GWAS")
+_TITLE_SECTION_NUMBER_RE = re.compile(r'^(\d+\.)*\d+\s+')
+
+# Punctuation artifacts from removed citations
+_REPEATED_PUNCT_RE = re.compile(r'([,;.])\s*([,;.])')
+_SPACE_BEFORE_STOP_RE = re.compile(r'\s+([,;.])')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([,;.:!?])')
+
+# Author citations
+_ET_AL_CITATION_RE = re.compile(r'\([A-Z][a-zA-Z\s&,;.]+et al[,;\s.]*\)')
+_ET_AL_PAREN_RE = re.compile(r'\(\s*(?:[^()]*?et al[.,;]\s*[^()]*)\)')
+_ND_PAREN_RE = re.compile(r'\(\s*(?:[^()]*?n.d.\s*[^()]*)\)')
+_AMPERSAND_AUTHORS_RE = re.compile(
+    r'\(\s*[A-Z][A-Za-z-]+(?:\s*&\s*[A-Z][A-Za-z-]+)+\s*,?\s*\)'
+)
+_AUTHOR_YEAR_RE = re.compile(
+    r'\(\s*(?:[A-Z][A-Za-z-]+(?:\s*&\s*[A-Z][A-Za-z-]+)?,\s*(?:n\.d\.|\d{4})\s*;?\s*)+\)'
+)
+
+# Empty brackets left by citations: [ ] or [, ] or ( , ) or [, – ]
+_EMPTY_SQUARE_RE = re.compile(r'\[\s*[,;–—\-\s]*\s*\]')
+_EMPTY_ROUND_RE = re.compile(r'\(\s*[,;–—\-\s]*\s*\)')
+
+# Trailing punctuation artifacts like ", –." or "–,"
+_COMMA_DASH_PUNCT_RE = re.compile(r'[,;]\s*[–—\-]\s*[,;.]')
+_COMMA_DASH_END_RE = re.compile(r'[,;]\s*[–—\-]\s*$')
+_DASH_PUNCT_RE = re.compile(r'[–—\-]\s*[,;.]')
+
+# Bracket spacing: "( " / " )" / "[ " / " ]" in one pass
+_BRACKET_SPACING_RE = re.compile(r'([(\[])\s+|\s+([)\]])')
+_PAREN_SPACING_RE = re.compile(r'(\()\s+|\s+(\))')
+
+# Repeated periods / commas: ".." -> "." and ",," -> "," in one pass
+_REPEATED_STOP_RE = re.compile(r'([.,])\1+')
+
+# Text made only of these characters (single spaces, no leading/trailing
+# space) is already clean: no cleaning step can change it.
+_NEUTRAL_CHARS = ''.join(
+    chr(c) for c in range(0x21, 0x7f) if chr(c) not in '()[].,;:!?&'
+)
+_NEEDS_CLEANING_RE = re.compile(
+    '[^ ' + re.escape(_NEUTRAL_CHARS) + ']|  |^ | $'
+)
+
+_DASHES = ('–', '—', '-')
+
+
+# ---------------------------------------------------------------------------
+# Cleaning functions
+# ---------------------------------------------------------------------------
+
+def _normalize_whitespace(text):
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _nfkc(text):
+    if unicodedata.is_normalized('NFKC', text):
+        return text
+    return unicodedata.normalize('NFKC', text)
+
+
+def needs_cleaning(text):
+    """False if no cleaning step can change `text` (the cleaners' fast path)."""
+    return _NEEDS_CLEANING_RE.search(text) is not None
+
+
+def strip_section_number(title):
+    """Remove leading section numbers from a title ("2.1 GWAS" -> "GWAS")."""
+    return _TITLE_SECTION_NUMBER_RE.sub('', title)
+
+
+def clean_extracted_text(text):
+    """
+    Apply standard text cleaning to extracted methods text.
+    Shared across all XML formats.
+    """
+    if not _NEEDS_CLEANING_RE.search(text):
+        return text
+
+    text = _nfkc(text)
+    if '&' in text:
+        text = htmlmod.unescape(text)
+    text = _normalize_whitespace(text.replace('\xa0', ' '))
+
+    # Remove section numbering at start of paragraphs
+    text = _LEADING_SECTION_NUMBER_RE.sub('', text)
+    text = _INLINE_SECTION_NUMBER_RE.sub('. ', text)
+
+    # Clean up punctuation artifacts from removed citations
+    text = _REPEATED_PUNCT_RE.sub(r'\2', text)
+    text = _SPACE_BEFORE_STOP_RE.sub(r'\1', text)
+
+    # Remove author citations
+    if 'et al' in text:
+        text = _ET_AL_CITATION_RE.sub('', text)
+
+    # Remove empty brackets
+    if '[' in text:
+        text = _EMPTY_SQUARE_RE.sub('', text)
+    if '(' in text:
+        text = _EMPTY_ROUND_RE.sub('', text)
+    text = _normalize_whitespace(text)
+
+    # Clean trailing punctuation artifacts
+    if any(dash in text for dash in _DASHES):
+        text = _COMMA_DASH_PUNCT_RE.sub('.', text)
+        text = _COMMA_DASH_END_RE.sub('.', text)
+        text = _DASH_PUNCT_RE.sub('.', text)
+
+    # Fix bracket spacing
+    text = _BRACKET_SPACING_RE.sub(r'\1\2', text)
+
+    # Final cleanup
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+    text = _normalize_whitespace(text)
+    text = _REPEATED_STOP_RE.sub(r'\1', text)
+
+    return text
+
+
+def clean_element_text(text):
+    """
+    Final normalisation of the text joined from a JATS element's parts.
+
+    Removes any author-year citations that survived paragraph cleaning,
+    fixes parenthesis spacing and drops empty brackets.
+    """
+    if not _NEEDS_CLEANING_RE.search(text):
+        return text
+
+    text = _nfkc(text)
+    text = _normalize_whitespace(text.replace('\xa0', ' '))
+
+    # remove et al. citations globally (in case any remain)
+    if '(' in text:
+        if 'et al' in text:
+            text = _ET_AL_PAREN_RE.sub('', text)
+        text = _ND_PAREN_RE.sub('', text)
+        if '&' in text:
+            text = _AMPERSAND_AUTHORS_RE.sub('', text)
+        text = _AUTHOR_YEAR_RE.sub('', text)
+
+    # Fix bracket spacing LAST
+    text = _PAREN_SPACING_RE.sub(r'\1\2', text)
+
+    # Replace repeated periods / commas with a single one
+    text = _REPEATED_STOP_RE.sub(r'\1', text)
+
+    # Remove empty brackets left by citations
+    if '[' in text:
+        text = _EMPTY_SQUARE_RE.sub('', text)
+    if '(' in text:
+        text = _EMPTY_ROUND_RE.sub('', text)
+    text = _normalize_whitespace(text)
+
+    # remove spaces before punctuation
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+
+    return text
@@ -9,6 +9,7 @@ Outputs (default: output/clustering/):
 from __future__ import annotations
 
 import json
+import sys
 from optparse import OptionParser
 from pathlib import Path
 
@@ -19,6 +20,10 @@ import os
 from pyprojroot import here
 from transformers import AutoModel, AutoTokenizer
 
+# source preference shared with extract_methods.py (jats, bioc, tei)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extract_text"))
+from source_resolver import DEFAULT_PREFERENCE  # noqa: E402
+
 
 # ---------------------------------------------------------------------------
 # CLI
@@ -129,10 +134,39 @@ def load_study_pmids(gwas_csv: Path) -> set[str]:
     return {str(p) for p in df["PUBMED_ID"].dropna().unique()}
 
 
+def text_source(file_name: str) -> str:
+    """
+    Source format of a sentences file, from its name: {id}_bioc_... is
+    BioC, {id}_pdf_tei_... GROBID TEI, anything else publisher JATS.
+    """
+    rest = file_name.split("_", 1)[1] if "_" in file_name else ""
+    if rest.startswith("bioc_"):
+        return "bioc"
+    if rest.startswith("pdf_tei_"):
+        return "tei"
+    return "jats"
+
+
+def read_sentences(jf: Path) -> list[str] | None:
+    try:
+        with open(jf) as fh:
+            sentences = json.load(fh)
+    except Exception as e:
+        print(f"  ! could not parse {jf.name}: {e}")
+        return None
+    if not isinstance(sentences, list):
+        return None
+    return [s for s in sentences if isinstance(s, str) and s.strip()] or None
+
+
 def load_text(
     text_dir: Path, study_pmids: set[str]
 ) -> tuple[list[str], list[str]]:
-    pmids, texts = [], []
+    # one text per paper: a PMCID and a PMID file (or two sources) of the
+    # same paper would otherwise be embedded twice; the candidates of a
+    # PMID are tried in source preference order (DEFAULT_PREFERENCE)
+    rank = {fmt: i for i, fmt in enumerate(DEFAULT_PREFERENCE)}
+    candidates: dict[str, list[tuple[int, str, Path]]] = {}
     for jf in sorted(text_dir.glob("*_sentences.json")):
         article_id = jf.name.split("_", 1)[0]
         
@@ -143,19 +177,21 @@ def load_text(
         
         if pmid not in study_pmids:
             continue
-        try:
-            with open(jf) as fh:
-                sentences = json.load(fh)
-        except Exception as e:
-            print(f"  ! could not parse {jf.name}: {e}")
-            continue
-        if not isinstance(sentences, list):
-            continue
-        sentences = [s for s in sentences if isinstance(s, str) and s.strip()]
-        if not sentences:
-            continue
-        pmids.append(pmid)
-        texts.append(" ".join(sentences))
+        source_rank = rank.get(text_source(jf.name), len(rank))
+        candidates.setdefault(pmid, []).append((source_rank, jf.name, jf))
+
+    pmids, texts = [], []
+    for pmid, files in candidates.items():
+        kept = None
+        for _, _, jf in sorted(files):
+            if kept is not None:
+                print(f"  ! skipping {jf.name}: PMID {pmid} already loaded from {kept.name}")
+                continue
+            sentences = read_sentences(jf)
+            if sentences:
+                kept = jf
+                pmids.append(pmid)
+                texts.append(" ".join(sentences))
     return pmids, texts
 
 